@@ -0,0 +1,91 @@
+"""
+Benchmark: confidence-gated cascade vs sending the whole transcript to Bedrock
+
+Builds exams with a growing share of ambiguous declarations (a test named
+without the wording the taxonomy patterns expect). The cascade decides clear
+and empty segments locally and sends only the ambiguous band to a stub
+Bedrock client with fixed per-call latency. Run from the repo root:
+
+    python backend/benchmarks/bench_ai_cascade.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda_functions'))
+
+import cme_nlp_processor  # noqa: E402
+from result_cache import ResultCache  # noqa: E402
+from stub_clients import StubBedrockClient  # noqa: E402
+from transcript_index import TranscriptIndex  # noqa: E402
+
+CLEAR = [
+    'straight leg raise was positive on the left at forty degrees',
+    "i'm going to check your deep tendon reflexes, patellar reflex first",
+]
+AMBIGUOUS = [
+    "i'm going to do the straight leg raise test now",
+    "let's check your reflexes",
+    "we're going to test your grip strength",
+]
+FILLER = [
+    'how long have you had this pain', 'tell me about the accident', 'please sit on the edge of the table',
+    'does it hurt when you do that', 'okay relax for a moment', 'any numbness or tingling in the feet',
+]
+LABELS = {'straight leg': 'straight_leg_raise', 'reflex': 'deep_tendon_reflexes', 'grip': 'manual_muscle_testing'}
+
+
+def label_line(text: str) -> list:
+    return [label for phrase, label in LABELS.items() if phrase in text]
+
+
+def make_index(n_segments: int, ambiguous_share: float, seed: int) -> TranscriptIndex:
+    rng = random.Random(seed)
+    words, starts, ends, speakers, seg_starts, seg_ends = [], [], [], [], [], []
+    t = 0.0
+    for i in range(n_segments):
+        roll = rng.random()
+        sentence = rng.choice(AMBIGUOUS if roll < ambiguous_share else CLEAR if roll < ambiguous_share + 0.03 else FILLER)
+        seg_starts.append(t)
+        for word in sentence.split():
+            words.append(word)
+            starts.append(t)
+            ends.append(t + 0.3)
+            t += 0.35
+        seg_ends.append(t - 0.05)
+        speakers.append(f'spk_{i % 2}')
+        t += 1.0
+    return TranscriptIndex(starts, ends, words, speakers, seg_starts, seg_ends)
+
+
+def main():
+    latency = 0.2
+    print(f"{'ambiguous':>9} {'escalated':>9} {'batches':>8} {'full':>5} {'cascade_s':>10} "
+          f"{'full_s':>7} {'est_saved_s':>11} {'calls':>6}")
+    for share in (0.01, 0.05, 0.15, 0.30):
+        index = make_index(2000, share, seed=int(share * 100))
+
+        client = StubBedrockClient(label_line, latency=latency)
+        cme_nlp_processor.bedrock_client = client
+        cme_nlp_processor.BEDROCK_CACHE = ResultCache()
+        processor = cme_nlp_processor.CMENLPProcessor()
+        start = time.perf_counter()
+        processor.detect_declared_tests_cascade(index)
+        cascade_seconds = time.perf_counter() - start
+        metrics = processor.cascade_metrics
+        cascade_calls = client.calls
+
+        cme_nlp_processor.BEDROCK_CACHE = ResultCache()
+        start = time.perf_counter()
+        cme_nlp_processor.windowed_test_detection_with_ai(index, float('inf'), 0.0)
+        full_seconds = time.perf_counter() - start
+
+        print(f"{share:9.2f} {metrics['escalated_fraction']:9.3f} {metrics['model_batches']:8d} "
+              f"{metrics['full_transcript_batches']:5d} {cascade_seconds:10.2f} {full_seconds:7.2f} "
+              f"{metrics['estimated_seconds_saved']:11.2f} {cascade_calls:6d}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark: cold-start cost of the taxonomy, prebuilt artifact vs in-process build
+
+Each sample is a fresh interpreter, so nothing is cached between runs. Two
+numbers are taken per mode: setting up the test matcher and demeanor lexicon
+alone (after their modules are imported), and the full `import
+cme_nlp_processor` the Lambda runtime performs. The build mode points
+CME_TAXONOMY_ARTIFACT at a missing file, which is the fallback path. Run from
+the repo root:
+
+    python backend/benchmarks/bench_cold_start.py [--runs 15]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+LAMBDA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lambda_functions')
+sys.path.insert(0, LAMBDA_DIR)
+
+
+def child(what: str) -> None:
+    """Print the seconds spent on one cold setup"""
+    if what == 'setup':
+        from taxonomy_artifact import TaxonomyArtifact
+        start = time.perf_counter()
+        TaxonomyArtifact.load(os.environ['CME_TAXONOMY_ARTIFACT'])
+    else:
+        start = time.perf_counter()
+        import cme_nlp_processor  # noqa: F401
+    print(time.perf_counter() - start)
+
+
+def sample(what: str, artifact_path: str, runs: int) -> float:
+    env = dict(os.environ, CME_TAXONOMY_ARTIFACT=artifact_path, CME_RESULT_CACHE='false',
+               CME_CACHE_DIR=tempfile.mkdtemp(prefix='cme-bench-'), AWS_DEFAULT_REGION='us-east-1')
+    env.pop('S3_BUCKET', None)
+    times = [
+        float(subprocess.run([sys.executable, __file__, '--child', what], env=env,
+                             capture_output=True, text=True, check=True).stdout.split()[-1])
+        for _ in range(runs)
+    ]
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=15)
+    args = parser.parse_args()
+
+    from taxonomy_artifact import TaxonomyArtifact
+    with tempfile.TemporaryDirectory() as tmp:
+        artifact_path = os.path.join(tmp, 'taxonomy_artifact.json')
+        size = TaxonomyArtifact.build().save(artifact_path)
+        missing_path = os.path.join(tmp, 'missing.json')
+
+        print(f"{'mode':>9} {'setup_ms':>9} {'import_ms':>10}   (median of {args.runs} fresh interpreters, "
+              f'artifact {size / 1024:.0f} KiB)')
+        for mode, path in (('build', missing_path), ('artifact', artifact_path)):
+            setup = sample('setup', path, args.runs)
+            full = sample('import', path, args.runs)
+            print(f'{mode:>9} {setup * 1000:9.1f} {full * 1000:10.1f}')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 3 and sys.argv[1] == '--child':
+        child(sys.argv[2])
+    else:
+        main()
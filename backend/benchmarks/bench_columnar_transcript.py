@@ -0,0 +1,85 @@
+"""
+Benchmark: load time and peak RSS, Transcribe JSON vs columnar transcript
+
+Writes a synthetic Transcribe JSON file and its columnar form for several exam
+lengths, checks that both load to the same transcript, then loads each one in
+a fresh subprocess so the peak RSS reflects a single load. Run from the repo
+root:
+
+    python backend/benchmarks/bench_columnar_transcript.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+LAMBDA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lambda_functions')
+sys.path.insert(0, LAMBDA_DIR)
+
+from bench_transcript_stream import peak_rss_kb  # noqa: E402
+from transcript_generator import EXAM_LENGTHS, write_transcript  # noqa: E402
+
+
+def child(mode: str, path: str) -> None:
+    """Load once, touch every segment's text, and print 'load_s touch_s peak_kb'"""
+    from transcript_columnar import load_columnar
+    from transcript_index import TranscriptIndex
+    from transcript_stream import parse_transcript_stream
+    start = time.perf_counter()
+    if mode == 'json':
+        with open(path, 'rb') as f:
+            index = TranscriptIndex.from_transcript(json.loads(f.read().decode('utf-8')))
+    elif mode == 'stream':
+        with open(path, 'rb') as f:
+            index = parse_transcript_stream(f)
+    else:
+        index = load_columnar(path)
+    loaded = time.perf_counter()
+    chars = sum(len(index.segment_text(i)) for i in range(len(index)))
+    touched = time.perf_counter()
+    assert chars > 0
+    print(f'{loaded - start} {touched - loaded} {peak_rss_kb()}')
+
+
+def run_child(mode: str, path: str):
+    output = subprocess.run(
+        [sys.executable, __file__, '--child', mode, path], capture_output=True, text=True, check=True
+    ).stdout.split()
+    return float(output[0]), float(output[1]), int(output[2]) / 1024
+
+
+def main():
+    from transcript_columnar import load_columnar, write_columnar
+    from transcript_stream import parse_transcript_stream
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'minutes':>8} {'mode':>9} {'file_mb':>8} {'load_ms':>8} {'touch_ms':>9} {'rss_mb':>7}")
+        for minutes in EXAM_LENGTHS.values():
+            json_path = os.path.join(tmp, f'{minutes}.json')
+            columnar_path = os.path.join(tmp, f'{minutes}.cmecol')
+            json_mb = write_transcript(json_path, minutes) / 1e6
+            with open(json_path, 'rb') as f:
+                parsed = parse_transcript_stream(f)
+            columnar_mb = write_columnar(parsed, columnar_path) / 1e6
+            mapped = load_columnar(columnar_path)
+            assert mapped.content_hash() == parsed.content_hash()
+            assert [mapped.segment_text(i) for i in range(len(mapped))] == \
+                [parsed.segment_text(i) for i in range(len(parsed))]
+            del mapped, parsed
+
+            for mode, path, size_mb in (('json', json_path, json_mb), ('stream', json_path, json_mb),
+                                        ('columnar', columnar_path, columnar_mb)):
+                load_s, touch_s, rss_mb = run_child(mode, path)
+                print(f'{minutes:8d} {mode:>9} {size_mb:8.2f} {load_s * 1000:8.1f} {touch_s * 1000:9.1f} {rss_mb:7.1f}')
+            os.remove(json_path)
+            os.remove(columnar_path)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4 and sys.argv[1] == '--child':
+        child(sys.argv[2], sys.argv[3])
+    else:
+        main()
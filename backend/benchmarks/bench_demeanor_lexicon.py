@@ -0,0 +1,78 @@
+"""
+Benchmark: demeanor tone scanning cost as the lexicon grows
+
+Compares the legacy `_analyze_tone` (substring scan per phrase plus
+`re.search` per pattern) with the compiled DemeanorLexicon on the built-in
+lexicon padded with synthetic phrases and patterns. Run from the repo root:
+
+    python backend/benchmarks/bench_demeanor_lexicon.py
+"""
+
+import copy
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda_functions'))
+
+from cme_nlp_processor import DEFAULT_DEMEANOR_LEXICON  # noqa: E402
+from demeanor_lexicon import DemeanorLexicon  # noqa: E402
+
+WORDS = ['stop', 'whining', 'nonsense', 'hurry', 'pathetic', 'excuse', 'faking', 'drama', 'quit', 'moaning']
+
+
+def synthetic_lexicon(n_terms: int) -> dict:
+    rng = random.Random(n_terms)
+    lexicon = copy.deepcopy(DEFAULT_DEMEANOR_LEXICON)
+    categories = lexicon['categories']
+    while sum(len(c.get('phrases', [])) + len(c.get('patterns', [])) for c in categories.values()) < n_terms:
+        a, b = rng.choice(WORDS), rng.choice(WORDS)
+        categories['negative_tone']['phrases'].append(f'{a} {b} {rng.randint(0, 999)}')
+        categories['dismissive']['patterns'].append(rf'{a}\s+(?:your|the)\s+{b}{rng.randint(0, 999)}')
+    return lexicon
+
+
+def legacy_tone(lexicon: dict, text: str) -> list:
+    """Pre-engine `_analyze_tone`: one scan per phrase and per pattern"""
+    text_lower = text.lower()
+    flags = []
+    for flag_type, category in lexicon['categories'].items():
+        for phrase in category.get('phrases', []):
+            if phrase in text_lower:
+                flags.append(flag_type)
+        for pattern in category.get('patterns', []):
+            if re.search(pattern, text_lower):
+                flags.append(flag_type)
+    return flags
+
+
+def per_segment_us(fn, texts) -> float:
+    start = time.perf_counter()
+    for text in texts:
+        fn(text)
+    return (time.perf_counter() - start) / len(texts) * 1e6
+
+
+def main():
+    rng = random.Random(11)
+    sentences = [
+        "okay now lift your arm as high as you can", "that's ridiculous you can move more than that",
+        'it does not matter what you felt yesterday', 'please sit back down on the table',
+        'let me speak for a second', 'describe the pain for me on a scale of one to ten'
+    ]
+    texts = [' '.join(rng.choice(sentences) for _ in range(rng.randint(1, 3))) for _ in range(2000)]
+    print(f"{'terms':>6} {'legacy_us/seg':>14} {'lexicon_us/seg':>15}")
+    for n_terms in (18, 100, 250, 500):
+        config = synthetic_lexicon(n_terms)
+        lexicon = DemeanorLexicon(config)
+        for text in texts[:200]:
+            assert legacy_tone(config, text) == [flag['flag_type'] for flag in lexicon.flags(text, 0.0)]
+        legacy = per_segment_us(lambda text: legacy_tone(config, text), texts[:500])
+        compiled = per_segment_us(lambda text: lexicon.flags(text, 0.0), texts)
+        print(f'{lexicon.term_count:6d} {legacy:14.1f} {compiled:15.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark: declared-step write throughput, per-item put_item vs batch_writer
+
+The legacy loop issued one put_item per item with time-based IDs (and raw
+floats, which DynamoDB rejects, so it is timed here with Decimal(str(x))
+conversion added). The batched path marshals the whole list in one pass and
+writes 25 items per request. Both sessions are written twice to show which
+path stays idempotent. Run from the repo root:
+
+    python backend/benchmarks/bench_dynamo_persistence.py
+"""
+
+import os
+import random
+import sys
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda_functions'))
+
+from dynamo_persistence import persist_declared_steps  # noqa: E402
+from stub_clients import StubDynamoTable  # noqa: E402
+
+LABELS = ['straight_leg_raise', 'lumbar_rom', 'deep_tendon_reflexes', 'gait', 'manual_muscle_testing']
+
+
+def make_tests(n: int) -> list:
+    rng = random.Random(n)
+    return [{
+        'label': rng.choice(LABELS), 'timestamp': round(i * 7.3 + rng.random(), 2),
+        'confidence': round(rng.uniform(0.5, 1.0), 3), 'matched_text': 'straight leg raise was positive'
+    } for i in range(n)]
+
+
+def legacy_persist(table: StubDynamoTable, session_id: str, tests: list) -> None:
+    for n, test in enumerate(tests):
+        table.put_item(Item={
+            'declared_step_id': f'step_{int(time.time())}_{n}',
+            'session_id': session_id,
+            'timestamp': Decimal(str(test['timestamp'])),
+            'label': test['label'],
+            'transcript_text': test['matched_text'],
+            'confidence': Decimal(str(test['confidence'])),
+            'video_snippet_uri': '',
+            'created_at': int(time.time())
+        })
+
+
+def main():
+    print(f"{'items':>6} {'mode':>8} {'requests':>9} {'items/s':>9} {'stored_after_2_runs':>20}")
+    for n in (100, 500, 2000):
+        tests = make_tests(n)
+        for mode in ('legacy', 'batched'):
+            table = StubDynamoTable(latency=0.005, unprocessed_rate=0.02)
+            start = time.perf_counter()
+            for run in range(2):
+                if mode == 'legacy':
+                    legacy_persist(table, 'session-1', tests)
+                    time.sleep(1.0 if run == 0 else 0)  # a retry lands in a later second
+                else:
+                    persist_declared_steps(table, 'session-1', [dict(test) for test in tests])
+            wall = time.perf_counter() - start - (1.0 if mode == 'legacy' else 0)
+            print(f'{n:6d} {mode:>8} {table.requests:9d} {2 * n / wall:9.0f} {len(table.items):20d}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark: local intent classifier throughput in examiner segments per second
+
+Classifies every examiner segment of a synthetic exam with IntentClassifier
+across thread counts, minibatch sizes and with/without int8 dynamic
+quantization. Without --model a small BERT-style checkpoint (4 layers, hidden
+256) with random weights and a vocabulary built from the transcript is written
+to a temp directory: its predictions are meaningless, but its cost per segment
+is that of a real model of the same shape. Needs torch and transformers. Run
+from the repo root:
+
+    python backend/benchmarks/bench_intent_classifier.py [--model DIR] [--minutes 60] [--threads 1,2]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda_functions'))
+
+from intent_classifier import IntentClassifier, NO_TEST_LABEL, TORCH_AVAILABLE  # noqa: E402
+from test_taxonomy import TEST_TAXONOMY  # noqa: E402
+from transcript_generator import generate_transcript  # noqa: E402
+from transcript_index import TranscriptIndex  # noqa: E402
+
+
+def write_random_model(directory: str, texts) -> str:
+    """Save an untrained multi-label BERT classifier and a word-level tokenizer"""
+    from transformers import BertConfig, BertForSequenceClassification, BertTokenizerFast
+
+    words = sorted({word for text in texts for word in text.lower().split()})
+    vocab_path = os.path.join(directory, 'vocab.txt')
+    with open(vocab_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(['[PAD]', '[UNK]', '[CLS]', '[SEP]', '[MASK]'] + words))
+    tokenizer = BertTokenizerFast(vocab_file=vocab_path, do_lower_case=True)
+
+    labels = list(TEST_TAXONOMY) + [NO_TEST_LABEL]
+    config = BertConfig(
+        vocab_size=tokenizer.vocab_size, hidden_size=256, num_hidden_layers=4, num_attention_heads=4,
+        intermediate_size=1024, max_position_embeddings=256, num_labels=len(labels),
+        id2label=dict(enumerate(labels)), label2id={label: i for i, label in enumerate(labels)},
+        problem_type='multi_label_classification'
+    )
+    BertForSequenceClassification(config).save_pretrained(directory)
+    tokenizer.save_pretrained(directory)
+    return directory
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--model', help='Fine-tuned checkpoint directory (default: random small BERT)')
+    parser.add_argument('--minutes', type=int, default=60)
+    parser.add_argument('--threads', default='1,2')
+    parser.add_argument('--batch-sizes', default='1,8,32')
+    args = parser.parse_args()
+    if not TORCH_AVAILABLE:
+        sys.exit('torch and transformers are required')
+
+    index = TranscriptIndex.from_transcript(generate_transcript(args.minutes))
+    texts = [index.segment_text(i) for i in index.segments_for_speaker('spk_0') if index.segment_text(i)]
+    print(f'{len(texts)} examiner segments from a {args.minutes} min exam, {os.cpu_count()} CPUs visible')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = args.model or write_random_model(tmp, texts)
+        print(f"{'quantized':>9} {'threads':>7} {'batch':>5} {'seconds':>8} {'seg/s':>8} {'pad_eff':>7}")
+        for quantize in (False, True):
+            for threads in [int(n) for n in args.threads.split(',')]:
+                for batch_size in [int(n) for n in args.batch_sizes.split(',')]:
+                    classifier = IntentClassifier(
+                        model_path, num_threads=threads, batch_size=batch_size, quantize=quantize
+                    )
+                    classifier.predict(texts[:batch_size])  # warm-up
+                    classifier.stats.update(segments=0, batches=0, padded_tokens=0, tokens=0, seconds=0.0)
+                    start = time.perf_counter()
+                    classifier.predict(texts)
+                    elapsed = time.perf_counter() - start
+                    stats = classifier.stats
+                    print(f'{str(quantize):>9} {threads:7d} {batch_size:5d} {elapsed:8.2f} '
+                          f"{len(texts) / elapsed:8.0f} {stats['tokens'] / stats['padded_tokens']:7.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark: exact re-encoding vs keyframe-snapped stream-copy segmentation
+
+Renders synthetic recordings (ffmpeg testsrc + tone) with several keyframe
+intervals and cuts the same test windows with `video_segmenter.segment_session`
+in 'encode' mode (every window re-encoded with libx264/aac) and 'copy' mode
+(windows snapped back to the preceding keyframe and stream-copied, re-encoding
+only windows that would drift past the snap tolerance). Reports ffmpeg CPU
+seconds, wall time, how many clips were copied, the keyframe drift and the
+largest difference between a clip's probed duration and its manifest
+duration. Needs ffmpeg and ffprobe on PATH or CME_FFMPEG_PATH/CME_FFPROBE_PATH.
+Run from the repo root:
+
+    python backend/benchmarks/bench_keyframe_segmentation.py [--minutes 20] [--tests 25] [--gops 2,10,40]
+"""
+
+import argparse
+import os
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda_functions'))
+
+import video_segmenter  # noqa: E402
+from bench_video_segmentation import BUCKET, VIDEO_KEY, render_test_video, test_episodes  # noqa: E402
+from stub_clients import StubS3Client  # noqa: E402
+
+
+def children_cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def clip_duration_error(ffprobe: str, data: bytes, expected: float, work_dir: str) -> float:
+    path = os.path.join(work_dir, 'clip.mp4')
+    with open(path, 'wb') as f:
+        f.write(data)
+    result = subprocess.run(
+        [ffprobe, '-v', 'error', '-show_entries', 'format=duration', '-of', 'csv=p=0', path],
+        capture_output=True, text=True
+    )
+    return abs(float(result.stdout.strip()) - expected)
+
+
+def run(mode: str, source: bytes, episodes: list, ffprobe: str, work_dir: str) -> dict:
+    stub = StubS3Client(latency=0.0)
+    stub.objects[(BUCKET, VIDEO_KEY)] = source
+    video_segmenter.s3_client = stub
+    video_segmenter.SEGMENT_MODE = mode
+    cpu = children_cpu_seconds()
+    start = time.perf_counter()
+    manifest = video_segmenter.segment_session('bench', VIDEO_KEY, episodes, BUCKET)
+    wall = time.perf_counter() - start
+    cpu = children_cpu_seconds() - cpu
+
+    segments = [segment for segment in manifest['segments'] if segment['segment_key']]
+    # A clip starts with its first test's window; snapping moves it back by the drift
+    drifts = [segment['tests'][0]['test_offset'] for segment in segments]
+    errors = [
+        clip_duration_error(ffprobe, stub.objects[(BUCKET, segment['segment_key'])], segment['segment_duration'], work_dir)
+        for segment in segments
+    ]
+    return {
+        'cpu': cpu,
+        'wall': wall,
+        'copied': manifest['stats']['stream_copied'],
+        'clips': manifest['stats']['extracted'],
+        'mean_drift': statistics.mean(abs(drift) for drift in drifts) if drifts else 0.0,
+        'max_error': max(errors, default=0.0),
+        'uploaded': stub.bytes_uploaded
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--minutes', type=float, default=20)
+    parser.add_argument('--tests', type=int, default=25)
+    parser.add_argument('--gops', default='2,10,40', help='Keyframe intervals to render, in seconds')
+    parser.add_argument('--rate', type=int, default=15)
+    args = parser.parse_args()
+
+    ffmpeg, ffprobe = video_segmenter.find_ffmpeg(), video_segmenter.find_ffprobe()
+    if not ffmpeg or not ffprobe:
+        print('ffmpeg and ffprobe are required: put them on PATH or set CME_FFMPEG_PATH/CME_FFPROBE_PATH')
+        return 1
+
+    seconds = args.minutes * 60
+    episodes = test_episodes(args.tests, seconds)
+    print(f'{args.tests} tests, {args.minutes:g} min 640x360 recordings, '
+          f'snap tolerance {video_segmenter.SNAP_TOLERANCE_SECONDS:g}s')
+    print(f"{'gop s':>5} {'mode':>6} {'copied':>6} {'cpu s':>7} {'wall s':>7} {'drift s':>7} {'dur err':>7} {'up MB':>6}")
+    work_dir = tempfile.mkdtemp(prefix='bench-keyframes-')
+    try:
+        for gop in (float(value) for value in args.gops.split(',')):
+            source_path = os.path.join(work_dir, 'source.mp4')
+            render_test_video(ffmpeg, source_path, seconds, rate=args.rate, gop=int(gop * args.rate))
+            with open(source_path, 'rb') as f:
+                source = f.read()
+            for mode in ('encode', 'copy'):
+                result = run(mode, source, episodes, ffprobe, work_dir)
+                print(f"{gop:5g} {mode:>6} {result['copied']:3d}/{result['clips']:<2d} {result['cpu']:7.2f} "
+                      f"{result['wall']:7.2f} {result['mean_drift']:7.2f} {result['max_error']:7.2f} "
+                      f"{result['uploaded'] / 1e6:6.1f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Benchmark suite: NLP stage wall time, peak memory and items/s per exam length
+
+Generates synthetic Transcribe Medical documents (15 min to 8 h) and times
+detect_declared_tests, analyze_examiner_demeanor and the full
+process_transcript_for_cme_analysis with every AWS client replaced by the
+stubs in stub_clients.py. Peak memory is the tracemalloc peak of a second,
+untimed run of each stage. Run from the repo root:
+
+    python backend/benchmarks/bench_nlp_pipeline.py [--lengths 15m,1h] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda_functions'))
+
+# Settings are read at import; keep the run offline and uncached
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ['CME_RESULT_CACHE'] = 'false'
+os.environ['CME_CACHE_DIR'] = tempfile.mkdtemp(prefix='cme-bench-')
+os.environ['S3_BUCKET'] = 'bench-bucket'
+
+import aws_clients  # noqa: E402
+import cme_nlp_processor  # noqa: E402
+from result_cache import ResultCache  # noqa: E402
+from stub_clients import (  # noqa: E402
+    StubComprehendClient, StubComprehendMedicalClient, StubDynamoResource, StubS3Client
+)
+from transcript_generator import EXAM_LENGTHS, generate_transcript  # noqa: E402
+
+
+def install_stubs() -> None:
+    """Point every AWS client the NLP Lambda uses at an offline stand-in, so boto3 is never imported"""
+    aws_clients.reset()
+    aws_clients.install('resource', 'dynamodb', StubDynamoResource(latency=0.002))
+    aws_clients.install('client', 's3', StubS3Client(latency=0.005))
+    aws_clients.install('client', 'comprehend', StubComprehendClient(latency=0.01))
+    aws_clients.install('client', 'comprehendmedical', StubComprehendMedicalClient(latency=0.02))
+
+
+def stage_functions() -> dict:
+    def detect(transcript):
+        return cme_nlp_processor.CMENLPProcessor().detect_declared_tests(transcript)
+
+    def demeanor(transcript):
+        return cme_nlp_processor.CMENLPProcessor().analyze_examiner_demeanor(transcript)
+
+    def full(transcript):
+        # Entity results are cached by chunk content; start cold every run
+        cme_nlp_processor.ENTITY_CACHE = ResultCache()
+        return cme_nlp_processor.process_transcript_for_cme_analysis('bench-session', transcript)
+
+    return {'detect_declared_tests': detect, 'analyze_examiner_demeanor': demeanor, 'process_transcript': full}
+
+
+def measure(fn, transcript) -> tuple:
+    start = time.perf_counter()
+    fn(transcript)
+    wall = time.perf_counter() - start
+    tracemalloc.start()
+    fn(transcript)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return wall, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--lengths', default=','.join(EXAM_LENGTHS))
+    parser.add_argument('--json', help='Also write the results to this file')
+    args = parser.parse_args()
+
+    install_stubs()
+    stages = stage_functions()
+    results = []
+    print(f"{'length':>6} {'items':>7} {'stage':>26} {'wall_s':>7} {'peak_mb':>8} {'items/s':>9}")
+    for name in args.lengths.split(','):
+        transcript = generate_transcript(EXAM_LENGTHS[name], test_hit_rate=0.05, demeanor_rate=0.02)
+        n_items = sum(item['type'] == 'pronunciation' for item in transcript['results']['items'])
+        for stage, fn in stages.items():
+            wall, peak_mb = measure(fn, transcript)
+            results.append({'length': name, 'items': n_items, 'stage': stage,
+                            'wall_s': round(wall, 4), 'peak_mb': round(peak_mb, 2), 'items_per_s': round(n_items / wall)})
+            print(f'{name:>6} {n_items:7d} {stage:>26} {wall:7.2f} {peak_mb:8.1f} {n_items / wall:9.0f}')
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
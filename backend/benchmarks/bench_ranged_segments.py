@@ -0,0 +1,134 @@
+"""
+Benchmark: S3 bytes per segment, full download vs ranged MP4 reads
+
+Renders a synthetic recording (ffmpeg testsrc + tone) with the moov atom at
+the front (faststart) and at the end (the usual camera layout), stores it in
+the in-memory S3 stand-in and measures:
+
+  - per segment: bytes a single 60 s window fetches through RangedMp4Reader
+    (moov probe + sample ranges) against the full object
+  - per session: `video_segmenter.segment_session` with ranged reads off and
+    on, and whether both produce byte-identical clips
+
+Needs ffmpeg (and ffprobe for the full-download path) on PATH or
+CME_FFMPEG_PATH/CME_FFPROBE_PATH. Run from the repo root:
+
+    python backend/benchmarks/bench_ranged_segments.py [--minutes 30] [--tests 5,25] [--mode copy|encode]
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda_functions'))
+
+import video_segmenter  # noqa: E402
+from bench_video_segmentation import BUCKET, VIDEO_KEY, render_test_video, test_episodes  # noqa: E402
+from ranged_mp4 import RangedMp4Reader  # noqa: E402
+from stub_clients import StubS3Client  # noqa: E402
+
+
+def per_segment(source: bytes, episodes: list, work_dir: str) -> dict:
+    """Bytes and GETs for each window fetched on its own, as the per-test path does"""
+    stub = StubS3Client(latency=0.0)
+    stub.objects[(BUCKET, VIDEO_KEY)] = source
+    fetched, requests, seconds = [], [], []
+    # One 60 s window per test, not the shared clips overlapping windows merge into
+    max_merged, video_segmenter.MAX_MERGED_SECONDS = video_segmenter.MAX_MERGED_SECONDS, 0
+    windows = video_segmenter.plan_segments(episodes, 'bench')
+    video_segmenter.MAX_MERGED_SECONDS = max_merged
+    for window in windows:
+        start = time.perf_counter()
+        reader = RangedMp4Reader(stub, BUCKET, VIDEO_KEY)
+        fetched.append(reader.materialize(
+            os.path.join(work_dir, 'sparse.mp4'), [(window['start'], window['start'] + window['duration'])]
+        ))
+        requests.append(reader.requests)
+        seconds.append(time.perf_counter() - start)
+    return {
+        'mean_bytes': statistics.mean(fetched),
+        'mean_requests': statistics.mean(requests),
+        'mean_seconds': statistics.mean(seconds)
+    }
+
+
+def session(source: bytes, episodes: list, ranged: bool) -> dict:
+    stub = StubS3Client(latency=0.0)
+    stub.objects[(BUCKET, VIDEO_KEY)] = source
+    video_segmenter.s3_client = stub
+    video_segmenter.RANGED_READS = ranged
+    start = time.perf_counter()
+    manifest = video_segmenter.segment_session('bench', VIDEO_KEY, episodes, BUCKET)
+    return {
+        'seconds': time.perf_counter() - start,
+        'downloaded': stub.bytes_downloaded,
+        'requests': stub.range_requests,
+        'clips': {
+            segment['segment_key']: stub.objects.get((BUCKET, segment['segment_key']))
+            for segment in manifest['segments']
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--minutes', type=float, default=30)
+    parser.add_argument('--tests', default='5,25')
+    parser.add_argument('--mode', default='copy', choices=('copy', 'encode'), help='Segment mode for the session runs')
+    args = parser.parse_args()
+    video_segmenter.SEGMENT_MODE = args.mode
+
+    ffmpeg = video_segmenter.find_ffmpeg()
+    if not ffmpeg:
+        print('ffmpeg not found: put it on PATH or set CME_FFMPEG_PATH')
+        return 1
+
+    seconds = args.minutes * 60
+    work_dir = tempfile.mkdtemp(prefix='bench-ranged-')
+    try:
+        source_path = os.path.join(work_dir, 'source.mp4')
+        render_test_video(ffmpeg, source_path, seconds)
+        end_path = os.path.join(work_dir, 'moov_at_end.mp4')
+        subprocess.run([ffmpeg, '-hide_banner', '-loglevel', 'error', '-y', '-i', source_path,
+                        '-c', 'copy', end_path], check=True)
+        layouts = {}
+        for layout, path in (('faststart', source_path), ('moov-end', end_path)):
+            with open(path, 'rb') as f:
+                layouts[layout] = f.read()
+        print(f'recording: {args.minutes:g} min 640x360, {len(layouts["faststart"]) / 1e6:.1f} MB')
+
+        print('\nper segment (one 60 s window, fetched alone)')
+        print(f"{'layout':>9} {'object MB':>9} {'ranged MB':>9} {'share':>6} {'GETs':>5} {'fetch ms':>8}")
+        episodes = test_episodes(10, seconds)
+        for layout, source in layouts.items():
+            result = per_segment(source, episodes, work_dir)
+            print(f"{layout:>9} {len(source) / 1e6:9.2f} {result['mean_bytes'] / 1e6:9.2f} "
+                  f"{result['mean_bytes'] / len(source):6.1%} {result['mean_requests']:5.1f} "
+                  f"{result['mean_seconds'] * 1000:8.1f}")
+
+        print(f'\nper session (segment_session, {args.mode} mode)')
+        print(f"{'layout':>9} {'tests':>5} {'full MB':>8} {'ranged MB':>9} {'GETs':>5} "
+              f"{'full s':>7} {'ranged s':>8} {'identical':>9}")
+        for layout, source in layouts.items():
+            for count in (int(value) for value in args.tests.split(',')):
+                episodes = test_episodes(count, seconds)
+                full = session(source, episodes, ranged=False)
+                ranged = session(source, episodes, ranged=True)
+                identical = sum(
+                    data is not None and ranged['clips'].get(key) == data for key, data in full['clips'].items()
+                )
+                print(f"{layout:>9} {count:5d} {full['downloaded'] / 1e6:8.1f} {ranged['downloaded'] / 1e6:9.1f} "
+                      f"{ranged['requests']:5d} {full['seconds']:7.2f} {ranged['seconds']:8.2f} "
+                      f"{identical:4d}/{len(full['clips']):<4d}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+Benchmark: one clip per test episode vs overlapping windows merged into shared clips
+
+Runs test detection on synthetic exams, consolidates the declarations into
+episodes and plans the session's clips with `video_segmenter.plan_segments`
+twice: one ±30 s clip per episode (CME_SEGMENT_MAX_MERGED_SECONDS=0) and with
+overlapping windows unioned into shared clips. Reports video Map iterations,
+Rekognition jobs (two per clip) and the minutes of video those jobs process.
+
+With --minutes, also renders a synthetic recording (ffmpeg testsrc + tone) and
+cuts N evenly spaced tests with `segment_session` both ways in encode mode,
+reporting ffmpeg CPU seconds, wall time and clip bytes uploaded (needs ffmpeg).
+Run from the repo root:
+
+    python backend/benchmarks/bench_segment_merging.py [--spacing 10,20,45] [--minutes 10 --tests 25]
+"""
+
+import argparse
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda_functions'))
+
+import cme_nlp_processor  # noqa: E402
+import video_segmenter  # noqa: E402
+from bench_video_segmentation import BUCKET, VIDEO_KEY, render_test_video  # noqa: E402
+from stub_clients import StubS3Client  # noqa: E402
+from test_episodes import consolidate_declared_tests  # noqa: E402
+from transcript_generator import EXAM_LENGTHS, generate_transcript  # noqa: E402
+
+
+def plan(episodes: list, max_merged: float) -> dict:
+    video_segmenter.MAX_MERGED_SECONDS = max_merged
+    clips = video_segmenter.plan_segments(episodes, 'bench')
+    return {
+        'clips': len(clips),
+        'jobs': 2 * len(clips),
+        'minutes': sum(clip['duration'] for clip in clips) / 60,
+        'widest': max((len(clip['tests']) for clip in clips), default=0)
+    }
+
+
+def spaced_episodes(count: int, spacing: float) -> list:
+    """`count` single-mention episodes `spacing` seconds apart"""
+    return [
+        {'label': f'test_{i}', 'timestamp': round(30 + spacing * i, 3), 'declared_step_id': f'step_{i}'}
+        for i in range(count)
+    ]
+
+
+def children_cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def session(source: bytes, episodes: list, max_merged: float) -> dict:
+    stub = StubS3Client(latency=0.0)
+    stub.objects[(BUCKET, VIDEO_KEY)] = source
+    video_segmenter.s3_client = stub
+    video_segmenter.MAX_MERGED_SECONDS = max_merged
+    cpu = children_cpu_seconds()
+    start = time.perf_counter()
+    manifest = video_segmenter.segment_session('bench', VIDEO_KEY, episodes, BUCKET)
+    return {
+        'clips': manifest['stats']['extracted'],
+        'cpu': children_cpu_seconds() - cpu,
+        'wall': time.perf_counter() - start,
+        'uploaded': stub.bytes_uploaded
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--spacing', default='10,20,45', help='Seconds between evenly spaced tests')
+    parser.add_argument('--tests', type=int, default=25)
+    parser.add_argument('--minutes', type=float, default=0, help='Also cut a rendered recording of this length')
+    args = parser.parse_args()
+    merged_cap = video_segmenter.MAX_MERGED_SECONDS
+
+    print(f'planned clips, one per episode vs merged (cap {merged_cap:g}s)')
+    print(f"{'exam':>10} {'episodes':>8} {'clips':>5} {'merged':>6} {'jobs':>5} {'merged':>6} "
+          f"{'video min':>9} {'merged':>6} {'widest':>6}")
+    exams = []
+    for name, minutes in EXAM_LENGTHS.items():
+        transcript = generate_transcript(minutes)
+        declared = cme_nlp_processor.CMENLPProcessor().detect_declared_tests(transcript, 'spk_0')
+        exams.append((name, consolidate_declared_tests(
+            declared, cme_nlp_processor.EPISODE_TOLERANCE_SECONDS, cme_nlp_processor.EPISODE_MAX_SECONDS
+        )))
+    for spacing in (float(value) for value in args.spacing.split(',')):
+        exams.append((f'{args.tests}@{spacing:g}s', spaced_episodes(args.tests, spacing)))
+    for name, episodes in exams:
+        single, merged = plan(episodes, 0), plan(episodes, merged_cap)
+        print(f"{name:>10} {len(episodes):8d} {single['clips']:5d} {merged['clips']:6d} {single['jobs']:5d} "
+              f"{merged['jobs']:6d} {single['minutes']:9.1f} {merged['minutes']:6.1f} {merged['widest']:6d}")
+
+    if not args.minutes:
+        return 0
+    ffmpeg = video_segmenter.find_ffmpeg()
+    if not ffmpeg:
+        print('ffmpeg not found: put it on PATH or set CME_FFMPEG_PATH')
+        return 1
+
+    video_segmenter.SEGMENT_MODE = 'encode'
+    seconds = args.minutes * 60
+    work_dir = tempfile.mkdtemp(prefix='bench-merging-')
+    try:
+        source_path = os.path.join(work_dir, 'source.mp4')
+        render_test_video(ffmpeg, source_path, seconds)
+        with open(source_path, 'rb') as f:
+            source = f.read()
+        print(f'\nsegment_session, encode mode, {args.tests} tests in a {args.minutes:g} min 640x360 recording')
+        print(f"{'spacing':>7} {'mode':>7} {'clips':>5} {'cpu s':>7} {'wall s':>7} {'up MB':>6}")
+        for spacing in (float(value) for value in args.spacing.split(',')):
+            episodes = [
+                episode for episode in spaced_episodes(args.tests, spacing) if episode['timestamp'] + 30 <= seconds
+            ]
+            for mode, cap in (('single', 0), ('merged', merged_cap)):
+                result = session(source, episodes, cap)
+                print(f"{spacing:7g} {mode:>7} {result['clips']:5d} {result['cpu']:7.2f} "
+                      f"{result['wall']:7.2f} {result['uploaded'] / 1e6:6.1f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
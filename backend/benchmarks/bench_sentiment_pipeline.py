@@ -0,0 +1,50 @@
+"""
+Benchmark: examiner sentiment coverage and throughput against a stub Comprehend
+
+The legacy path scored one joined document built from the first 10 examiner
+segments; SentimentPipeline scores every segment in 25-document batches sent
+concurrently. The stub adds per-request latency, throttling and transient
+per-document errors. Run from the repo root:
+
+    python backend/benchmarks/bench_sentiment_pipeline.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda_functions'))
+
+from sentiment_pipeline import SentimentPipeline  # noqa: E402
+from stub_clients import StubComprehendClient  # noqa: E402
+
+SENTENCES = [
+    'okay now lift your leg for me', "that's ridiculous you can bend further", 'describe where it hurts',
+    'stop talking and let me finish', 'good now the other side please', "i think you're exaggerating this"
+]
+
+
+def main():
+    rng = random.Random(5)
+    segments = [' '.join(rng.choice(SENTENCES) for _ in range(rng.randint(1, 4))) for _ in range(1500)]
+
+    client = StubComprehendClient(latency=0.05)
+    start = time.perf_counter()
+    client.detect_sentiment(Text=' '.join(segments[:10])[:5000], LanguageCode='en')
+    print(f'legacy: 10/{len(segments)} segments covered (as one document) in {time.perf_counter() - start:.2f}s')
+
+    print(f"{'workers':>8} {'wall_s':>7} {'docs/s':>8} {'covered':>8} {'requests':>9} {'retries':>8}")
+    for workers in (1, 2, 4, 8):
+        client = StubComprehendClient(latency=0.05, throttle_rate=0.05, document_error_rate=0.01, seed=workers)
+        pipeline = SentimentPipeline(client, max_workers=workers, base_delay=0.05)
+        start = time.perf_counter()
+        results = pipeline.score(segments)
+        wall = time.perf_counter() - start
+        covered = sum(result is not None for result in results)
+        print(f'{workers:8d} {wall:7.2f} {covered / wall:8.0f} {covered:8d} '
+              f"{pipeline.stats['requests']:9d} {pipeline.stats['retries']:8d}")
+
+
+if __name__ == '__main__':
+    main()
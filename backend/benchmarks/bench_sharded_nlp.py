@@ -0,0 +1,54 @@
+"""
+Benchmark: sharded test detection + tone analysis vs worker count
+
+Runs CMENLPProcessor.analyze_sharded on a synthetic 8 h exam at 1, 2, 4 and
+6 workers, checks the output equals the sequential detect_declared_tests +
+analyze_examiner_demeanor, and reports speedup. Speedup is bounded by the
+vCPUs this machine (or Lambda memory size) provides. Run from the repo root:
+
+    python backend/benchmarks/bench_sharded_nlp.py [--minutes 480]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda_functions'))
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+import cme_nlp_processor  # noqa: E402
+from stub_clients import StubComprehendClient  # noqa: E402
+from transcript_generator import generate_transcript  # noqa: E402
+from transcript_index import TranscriptIndex  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--minutes', type=float, default=480)
+    args = parser.parse_args()
+
+    # Sentiment is I/O-bound and stays in the parent; keep it out of the timing
+    cme_nlp_processor.comprehend_client = StubComprehendClient(latency=0.0)
+    index = TranscriptIndex.from_transcript(
+        generate_transcript(args.minutes, examiner_share=0.6, test_hit_rate=0.1, demeanor_rate=0.05)
+    )
+
+    processor = cme_nlp_processor.CMENLPProcessor()
+    start = time.perf_counter()
+    expected = (processor.detect_declared_tests(index, 'spk_0'), processor.analyze_examiner_demeanor(index, 'spk_0'))
+    sequential = time.perf_counter() - start
+
+    print(f'{len(index.words)} words, {len(index)} segments, {cme_nlp_processor.AVAILABLE_VCPUS} vCPUs available')
+    print(f"{'workers':>8} {'wall_s':>7} {'speedup':>8} {'equal':>6}")
+    print(f"{'seq':>8} {sequential:7.2f} {1.0:7.2f}x {'-':>6}")
+    for workers in (1, 2, 4, 6):
+        start = time.perf_counter()
+        result = cme_nlp_processor.CMENLPProcessor().analyze_sharded(index, 'spk_0', workers)
+        wall = time.perf_counter() - start
+        print(f'{workers:8d} {wall:7.2f} {sequential / wall:7.2f}x {str(result == expected):>6}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark: per-segment test scanning cost as the taxonomy grows
+
+Compares the legacy loop (substring scan per keyword and `re.search` per
+pattern for every taxonomy entry) with the precompiled TaxonomyMatcher on the
+real TEST_TAXONOMY padded with synthetic tests. Run from the repo root:
+
+    python backend/benchmarks/bench_taxonomy_matcher.py
+"""
+
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda_functions'))
+
+from cme_nlp_processor import TEST_TAXONOMY, DECLARATION_PHRASES  # noqa: E402
+from text_matcher import TaxonomyMatcher  # noqa: E402
+
+SYLLABLES = ['ka', 'lo', 'mi', 'ser', 'ton', 'vel', 'dra', 'pin', 'cor', 'lax']
+CATEGORIES = ['orthopedic', 'neurological', 'simulation', 'MMT', 'functional', 'cardiac']
+
+
+def synthetic_taxonomy(n_tests: int) -> dict:
+    """The real taxonomy padded with made-up tests of the same shape"""
+    rng = random.Random(n_tests)
+    taxonomy = dict(TEST_TAXONOMY)
+    while len(taxonomy) < n_tests:
+        name = ''.join(rng.choice(SYLLABLES) for _ in range(3))
+        taxonomy[f'{name}_test_{len(taxonomy)}'] = {
+            'keywords': [name, f'{name} sign', f'{rng.choice(SYLLABLES)}{name}', f'{name} maneuver'],
+            'patterns': [rf'{name}[\'s]*\s+(?:test|sign)', rf'positive\s+{name}', rf'{name}\s+(?:was\s+)?negative'],
+            'category': rng.choice(CATEGORIES),
+            'priority': 'medium'
+        }
+    return taxonomy
+
+
+def legacy_analyze(taxonomy: dict, text: str) -> list:
+    """Pre-matcher `_analyze_text_for_tests` scoring loop"""
+    detected = []
+    text_lower = text.lower()
+    for test_label, test_config in taxonomy.items():
+        confidence = 0.0
+        keyword_matches = sum(1 for kw in test_config['keywords'] if kw in text_lower)
+        if keyword_matches > 0:
+            confidence += 0.3 * min(keyword_matches / len(test_config['keywords']), 1.0)
+        pattern_matches = 0
+        for pattern in test_config['patterns']:
+            if re.search(pattern, text_lower, re.IGNORECASE):
+                pattern_matches += 1
+        if pattern_matches > 0:
+            confidence += 0.7
+        declaration_phrases = list(DECLARATION_PHRASES)
+        has_declaration = any(phrase in text_lower for phrase in declaration_phrases)
+        if has_declaration and confidence > 0:
+            confidence += 0.2
+        if confidence >= 0.5:
+            detected.append((test_label, min(confidence, 1.0)))
+    return detected
+
+
+def matcher_analyze(matcher: TaxonomyMatcher, text: str) -> list:
+    return [
+        (matcher.labels[i], min(confidence, 1.0))
+        for i, confidence in matcher.score(text.lower()) if confidence >= 0.5
+    ]
+
+
+def segments(n: int) -> list:
+    rng = random.Random(7)
+    phrases = [
+        "now we're going to do the straight leg raise", 'okay and does that hurt',
+        'flexion was limited to about forty degrees', "i'm checking your reflexes on this side",
+        'can you walk to the end of the hall for me', 'tell me when you feel the pain start'
+    ]
+    return [' '.join(rng.choice(phrases) for _ in range(rng.randint(1, 3))) for _ in range(n)]
+
+
+def per_segment_us(fn, texts) -> float:
+    start = time.perf_counter()
+    for text in texts:
+        fn(text)
+    return (time.perf_counter() - start) / len(texts) * 1e6
+
+
+def main():
+    texts = segments(2000)
+    print(f"{'tests':>6} {'legacy_us/seg':>14} {'matcher_us/seg':>15} {'build_ms':>9}")
+    for n_tests in (30, 60, 120, 240):
+        taxonomy = synthetic_taxonomy(n_tests)
+        start = time.perf_counter()
+        matcher = TaxonomyMatcher(taxonomy, DECLARATION_PHRASES)
+        build_ms = (time.perf_counter() - start) * 1e3
+        for text in texts[:200]:
+            assert legacy_analyze(taxonomy, text) == matcher_analyze(matcher, text)
+        # Past ~120 tests the legacy patterns overflow re's compile cache, so
+        # time it on a smaller sample to keep the run short
+        legacy = per_segment_us(lambda text: legacy_analyze(taxonomy, text), texts[:300])
+        compiled = per_segment_us(lambda text: matcher_analyze(matcher, text), texts)
+        print(f'{len(taxonomy):6d} {legacy:14.1f} {compiled:15.1f} {build_ms:9.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Benchmark: video jobs avoided by consolidating declared tests into episodes
+
+Runs test detection on synthetic exams and reports how many declarations
+collapse into test episodes, i.e. how many ProcessSingleTest Map iterations
+(full-video download, ffmpeg encode, two Rekognition jobs each) are no longer
+started, across episode tolerances. Run from the repo root:
+
+    python backend/benchmarks/bench_test_episodes.py [--tolerances 30,60,120]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda_functions'))
+
+import cme_nlp_processor  # noqa: E402
+from test_episodes import consolidate_declared_tests, episode_metrics  # noqa: E402
+from transcript_generator import EXAM_LENGTHS, generate_transcript  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tolerances', default='30,60,120')
+    parser.add_argument('--repeat-rate', type=float, default=0.6,
+                        help='Chance a declared test is named again in the next examiner turn')
+    args = parser.parse_args()
+    tolerances = [float(value) for value in args.tolerances.split(',')]
+
+    print(f"{'length':>6} {'declared':>8} " + ' '.join(f"{f'eps@{t:g}s':>9} {'avoided':>7}" for t in tolerances))
+    for name, minutes in EXAM_LENGTHS.items():
+        transcript = generate_transcript(minutes, repeat_rate=args.repeat_rate)
+        declared = cme_nlp_processor.CMENLPProcessor().detect_declared_tests(transcript, 'spk_0')
+        row = f'{name:>6} {len(declared):8d} '
+        for tolerance in tolerances:
+            metrics = episode_metrics(declared, consolidate_declared_tests(
+                declared, tolerance, cme_nlp_processor.EPISODE_MAX_SECONDS
+            ))
+            row += f"{metrics['test_episodes']:9d} {metrics['video_jobs_avoided']:7d} "
+        print(row.rstrip())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark: segment text extraction, legacy full scan vs TranscriptIndex
+
+The legacy path walked every transcript item for every speaker segment
+(O(segments x words)); the index does two bisects per segment after a single
+O(words log words) build. Run from the repo root:
+
+    python backend/benchmarks/bench_transcript_index.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda_functions'))
+
+from transcript_generator import generate_transcript  # noqa: E402
+from transcript_index import TranscriptIndex  # noqa: E402
+
+
+def legacy_segment_texts(transcript: dict) -> list:
+    """The pre-index `_get_segment_text` loop, kept here as the baseline"""
+    results = transcript['results']
+    items = results['items']
+    texts = []
+    for segment in results['speaker_labels']['segments']:
+        segment_start = float(segment.get('start_time', 0))
+        segment_end = float(segment.get('end_time', 0))
+        words = []
+        for item in items:
+            if item.get('type') == 'pronunciation':
+                item_start = float(item.get('start_time', 0))
+                if segment_start <= item_start <= segment_end:
+                    words.append(item.get('alternatives', [{}])[0].get('content', ''))
+        texts.append(' '.join(words))
+    return texts
+
+
+def indexed_segment_texts(transcript: dict) -> list:
+    index = TranscriptIndex.from_transcript(transcript)
+    return [index.segment_text(i) for i in range(len(index))]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    print(f"{'minutes':>8} {'words':>8} {'segments':>9} {'legacy_s':>10} {'index_s':>9} {'index_us/word':>14}")
+    for minutes in (5, 15, 30, 60, 120, 240):
+        transcript = generate_transcript(minutes)
+        n_words = sum(item['type'] == 'pronunciation' for item in transcript['results']['items'])
+        n_segments = len(transcript['results']['speaker_labels']['segments'])
+        indexed, index_s = timed(indexed_segment_texts, transcript)
+        # The quadratic baseline is only run where it finishes in reasonable time
+        if minutes <= 60:
+            legacy, legacy_s = timed(legacy_segment_texts, transcript)
+            assert legacy == indexed, 'index output diverged from legacy extraction'
+            legacy_col = f'{legacy_s:10.3f}'
+        else:
+            legacy_col = f"{'skipped':>10}"
+        print(f'{minutes:8d} {n_words:8d} {n_segments:9d} {legacy_col} {index_s:9.4f} {index_s / n_words * 1e6:14.2f}')
+
+if __name__ == '__main__':
+    main()
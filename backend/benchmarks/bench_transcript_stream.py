@@ -0,0 +1,92 @@
+"""
+Benchmark: peak RSS and parse time, json.loads vs streaming transcript parser
+
+Writes synthetic Transcribe JSON files for several exam lengths, then parses each
+one in a fresh subprocess so ru_maxrss reflects a single parse. Run from the
+repo root:
+
+    python backend/benchmarks/bench_transcript_stream.py
+"""
+
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+LAMBDA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lambda_functions')
+sys.path.insert(0, LAMBDA_DIR)
+
+from transcript_generator import EXAM_LENGTHS, write_transcript  # noqa: E402
+
+
+def peak_rss_kb() -> int:
+    """
+    Peak resident set of this process image
+
+    VmHWM is preferred because ru_maxrss survives exec on Linux and would
+    report the parent's peak (the parent builds the test documents).
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def child(mode: str, path: str) -> None:
+    """Parse once and print 'seconds peak_kb' for the parent"""
+    from transcript_index import TranscriptIndex
+    from transcript_stream import parse_transcript_stream
+    start = time.perf_counter()
+    with open(path, 'rb') as f:
+        if mode == 'json':
+            index = TranscriptIndex.from_transcript(json.loads(f.read().decode('utf-8')))
+        else:
+            index = parse_transcript_stream(f)
+    elapsed = time.perf_counter() - start
+    assert len(index) > 0
+    print(f'{elapsed} {peak_rss_kb()}')
+
+
+def run_child(mode: str, path: str):
+    output = subprocess.run(
+        [sys.executable, __file__, '--child', mode, path], capture_output=True, text=True, check=True
+    ).stdout.split()
+    return float(output[0]), int(output[1]) / 1024
+
+
+def main():
+    from transcript_index import TranscriptIndex
+    from transcript_stream import parse_transcript_stream
+
+    with tempfile.TemporaryDirectory() as tmp:
+        check = os.path.join(tmp, 'check.json')
+        write_transcript(check, 5)
+        with open(check, 'rb') as f:
+            streamed = parse_transcript_stream(f, chunk_size=4096)
+        with open(check) as f:
+            loaded = TranscriptIndex.from_transcript(json.load(f))
+        assert [streamed.segment_text(i) for i in range(len(streamed))] == \
+            [loaded.segment_text(i) for i in range(len(loaded))]
+
+        print(f"{'minutes':>8} {'file_mb':>8} {'json_s':>7} {'json_rss_mb':>12} {'stream_s':>9} {'stream_rss_mb':>14}")
+        for minutes in EXAM_LENGTHS.values():
+            path = os.path.join(tmp, f'{minutes}.json')
+            size_mb = write_transcript(path, minutes) / 1e6
+            json_s, json_mb = run_child('json', path)
+            stream_s, stream_mb = run_child('stream', path)
+            print(f'{minutes:8d} {size_mb:8.1f} {json_s:7.2f} {json_mb:12.1f} {stream_s:9.2f} {stream_mb:14.1f}')
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4 and sys.argv[1] == '--child':
+        child(sys.argv[2], sys.argv[3])
+    else:
+        main()
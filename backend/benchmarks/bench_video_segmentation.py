@@ -0,0 +1,124 @@
+"""
+Benchmark: per-test segment extraction vs one session-level segmentation pass
+
+Renders a synthetic recording (ffmpeg testsrc + tone), stores it in the
+in-memory S3 stand-in and cuts N test windows two ways: the per-test path
+(`CMEVideoProcessor.extract_video_segment` once per test, each downloading the
+whole recording) and `video_segmenter.segment_session` (one download, one
+ffmpeg invocation with an output per window, parallel uploads). Reports S3
+bytes transferred, ffmpeg invocations and wall time. Needs ffmpeg on PATH or
+CME_FFMPEG_PATH. Run from the repo root:
+
+    python backend/benchmarks/bench_video_segmentation.py [--minutes 20] [--tests 5,10,25]
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda_functions'))
+
+import cme_video_processor  # noqa: E402
+import video_segmenter  # noqa: E402
+from stub_clients import StubS3Client  # noqa: E402
+
+BUCKET = 'bench-bucket'
+VIDEO_KEY = 'cme-recordings/bench/session.mp4'
+
+
+def render_test_video(ffmpeg: str, path: str, seconds: float, size: str = '640x360', rate: int = 15, gop: int = 150) -> int:
+    """Write an H.264/AAC test pattern recording; returns its size in bytes"""
+    subprocess.run([
+        ffmpeg, '-hide_banner', '-loglevel', 'error', '-y',
+        '-f', 'lavfi', '-i', f'testsrc=size={size}:rate={rate}',
+        '-f', 'lavfi', '-i', 'sine=frequency=440:sample_rate=44100',
+        '-t', str(seconds),
+        '-c:v', 'libx264', '-preset', 'ultrafast', '-g', str(gop), '-pix_fmt', 'yuv420p',
+        '-c:a', 'aac', '-movflags', '+faststart',
+        path
+    ], check=True)
+    return os.path.getsize(path)
+
+
+def test_episodes(count: int, seconds: float) -> list:
+    """`count` single-mention episodes spread evenly over the recording"""
+    step = (seconds - 60) / max(count, 1)
+    return [
+        {'label': f'test_{i}', 'timestamp': round(30 + step * (i + 0.5), 3), 'declared_step_id': f'step_{i}'}
+        for i in range(count)
+    ]
+
+
+def per_test(source: bytes, episodes: list, work_dir: str) -> dict:
+    stub = StubS3Client(latency=0.0)
+    stub.objects[(BUCKET, VIDEO_KEY)] = source
+    cme_video_processor.s3_client = stub
+    processor = cme_video_processor.CMEVideoProcessor(BUCKET)
+    processor.temp_dir = work_dir
+    start = time.perf_counter()
+    keys = [
+        processor.extract_video_segment(VIDEO_KEY, episode['timestamp'], 60.0, 'cme-segments/bench')
+        for episode in episodes
+    ]
+    return {
+        'seconds': time.perf_counter() - start,
+        'ffmpeg_runs': len(episodes),
+        'clips': sum(key is not None for key in keys),
+        'downloaded': stub.bytes_downloaded,
+        'uploaded': stub.bytes_uploaded
+    }
+
+
+def session(source: bytes, episodes: list) -> dict:
+    stub = StubS3Client(latency=0.0)
+    stub.objects[(BUCKET, VIDEO_KEY)] = source
+    video_segmenter.s3_client = stub
+    start = time.perf_counter()
+    manifest = video_segmenter.segment_session('bench', VIDEO_KEY, episodes, BUCKET)
+    return {
+        'seconds': time.perf_counter() - start,
+        'ffmpeg_runs': manifest['stats']['ffmpeg_runs'],
+        'clips': manifest['stats']['extracted'],
+        'downloaded': stub.bytes_downloaded,
+        'uploaded': stub.bytes_uploaded
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--minutes', type=float, default=20)
+    parser.add_argument('--tests', default='5,10,25')
+    parser.add_argument('--size', default='640x360')
+    args = parser.parse_args()
+
+    ffmpeg = video_segmenter.find_ffmpeg()
+    if not ffmpeg:
+        print('ffmpeg not found: put it on PATH or set CME_FFMPEG_PATH')
+        return 1
+
+    work_dir = tempfile.mkdtemp(prefix='bench-segments-')
+    try:
+        seconds = args.minutes * 60
+        source_path = os.path.join(work_dir, 'source.mp4')
+        size = render_test_video(ffmpeg, source_path, seconds, args.size)
+        with open(source_path, 'rb') as f:
+            source = f.read()
+        print(f'recording: {args.minutes:g} min {args.size}, {size / 1e6:.1f} MB')
+
+        print(f"{'tests':>5} {'mode':>8} {'ffmpeg':>6} {'clips':>5} {'down MB':>8} {'up MB':>7} {'wall s':>7}")
+        for count in (int(value) for value in args.tests.split(',')):
+            episodes = test_episodes(count, seconds)
+            for mode, result in (('per-test', per_test(source, episodes, work_dir)), ('session', session(source, episodes))):
+                print(f"{count:5d} {mode:>8} {result['ffmpeg_runs']:6d} {result['clips']:5d} "
+                      f"{result['downloaded'] / 1e6:8.1f} {result['uploaded'] / 1e6:7.1f} {result['seconds']:7.2f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+Import-time profile of every Lambda entry module
+
+Imports each handler module in a fresh interpreter under `python -X importtime`
+and reports its total import time, the slowest modules by self time, and
+whether boto3 was loaded at import (it should not be: clients come from the
+lazy registry in aws_clients.py). Totals are the median over several runs and
+are checked against per-Lambda budgets, so a cold-start regression fails with
+a number. Run from the repo root:
+
+    python backend/benchmarks/profile_imports.py [--runs 5] [--top 8] [--no-budget]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+LAMBDA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lambda_functions')
+
+# Import budget per Lambda entry module in milliseconds (median of the runs),
+# set with headroom over a 1-vCPU measurement; the NLP processor's share is
+# mostly numpy
+IMPORT_BUDGETS_MS = {
+    'cme_handler': 80,
+    'transcription_waiter': 80,
+    'cme_nlp_processor': 250,
+    'video_segmenter': 80,
+    'cme_video_processor': 80,
+    'cme_report_generator': 80,
+}
+
+EAGER_MODULES = ('boto3', 'botocore')
+
+
+def profile(module: str) -> dict:
+    """One `-X importtime` run: {'total_ms', 'self_ms': {name: ms}, 'eager': [...]}"""
+    env = dict(os.environ, AWS_DEFAULT_REGION=os.environ.get('AWS_DEFAULT_REGION', 'us-east-1'))
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=LAMBDA_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f'import {module} failed:\n{result.stderr[-2000:]}')
+
+    self_ms = {}
+    total_ms = 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        self_ms[name] = self_ms.get(name, 0.0) + int(self_us) / 1000
+        if name == module:
+            total_ms = int(cumulative_us) / 1000
+    eager = sorted({name.split('.')[0] for name in self_ms if name.split('.')[0] in EAGER_MODULES})
+    return {'total_ms': total_ms, 'self_ms': self_ms, 'eager': eager}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=8)
+    parser.add_argument('--no-budget', action='store_true', help='Report only, never fail')
+    args = parser.parse_args()
+
+    over_budget = []
+    print(f"{'lambda module':<22} {'import_ms':>9} {'budget_ms':>9}  eager AWS SDK")
+    reports = {}
+    for module, budget in IMPORT_BUDGETS_MS.items():
+        runs = [profile(module) for _ in range(args.runs)]
+        total = statistics.median(run['total_ms'] for run in runs)
+        eager = runs[0]['eager']
+        reports[module] = runs[len(runs) // 2]
+        flag = '' if total <= budget else '  OVER BUDGET'
+        print(f"{module:<22} {total:9.1f} {budget:9d}  {', '.join(eager) or 'none'}{flag}")
+        if total > budget or eager:
+            over_budget.append(module)
+
+    for module, report in reports.items():
+        print(f'\n{module}: slowest modules by self time')
+        slowest = sorted(report['self_ms'].items(), key=lambda item: -item[1])[:args.top]
+        for name, ms in slowest:
+            print(f'  {ms:8.2f} ms  {name}')
+
+    if over_budget and not args.no_budget:
+        print(f"\nImport budget exceeded (or AWS SDK imported eagerly) by: {', '.join(over_budget)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
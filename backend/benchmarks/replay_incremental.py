@@ -0,0 +1,98 @@
+"""
+Replay driver: feed a saved transcript to the incremental NLP mode in chunks
+
+Splits a Transcribe JSON document into time-ordered fragments of
+`--chunk-seconds`, feeds them to CMENLPProcessor.incremental, and checks that
+the concatenated output equals batch detect_declared_tests and
+analyze_examiner_demeanor on the whole document. Comprehend is stubbed.
+Run from the repo root:
+
+    python backend/benchmarks/replay_incremental.py [--transcript exam.json] [--chunk-seconds 30]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda_functions'))
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+import cme_nlp_processor  # noqa: E402
+from stub_clients import StubComprehendClient  # noqa: E402
+from transcript_generator import generate_transcript  # noqa: E402
+
+
+def fragments(transcript: dict, chunk_seconds: float):
+    """Yield Transcribe-shaped fragments holding consecutive time slices"""
+    results = transcript['results']
+    items = results['items']
+    segments = results['speaker_labels']['segments']
+    item_pos = segment_pos = 0
+    chunk_end = chunk_seconds
+    while item_pos < len(items) or segment_pos < len(segments):
+        chunk_items, chunk_segments = [], []
+        # Punctuation has no timing and travels with the word before it
+        while item_pos < len(items) and float(items[item_pos].get('start_time', -1)) < chunk_end:
+            chunk_items.append(items[item_pos])
+            item_pos += 1
+        while segment_pos < len(segments) and float(segments[segment_pos]['start_time']) < chunk_end:
+            chunk_segments.append(segments[segment_pos])
+            segment_pos += 1
+        chunk_end += chunk_seconds
+        if chunk_items or chunk_segments:
+            yield {'results': {'items': chunk_items, 'speaker_labels': {'segments': chunk_segments}}}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--transcript', help='Transcribe JSON file (default: a generated 1 h exam)')
+    parser.add_argument('--chunk-seconds', type=float, default=30.0)
+    parser.add_argument('--examiner', default='spk_0')
+    args = parser.parse_args()
+
+    if args.transcript:
+        with open(args.transcript) as f:
+            transcript = json.load(f)
+    else:
+        transcript = generate_transcript(60, test_hit_rate=0.1, demeanor_rate=0.05)
+
+    cme_nlp_processor.comprehend_client = StubComprehendClient(latency=0.0)
+
+    batch = cme_nlp_processor.CMENLPProcessor()
+    batch_tests = batch.detect_declared_tests(transcript, args.examiner)
+    batch_flags = batch.analyze_examiner_demeanor(transcript, args.examiner)
+
+    session = cme_nlp_processor.CMENLPProcessor().incremental(args.examiner)
+    emitted_tests, emitted_flags = [], []
+    n_fragments = 0
+    worst_call = 0.0
+    for fragment in fragments(transcript, args.chunk_seconds):
+        start = time.perf_counter()
+        new = session.add(fragment)
+        worst_call = max(worst_call, time.perf_counter() - start)
+        emitted_tests.extend(new['declared_tests'])
+        emitted_flags.extend(new['demeanor_flags'])
+        n_fragments += 1
+    new = session.finish()
+    emitted_tests.extend(new['declared_tests'])
+    emitted_flags.extend(new['demeanor_flags'])
+
+    def flag_key(flag):
+        return flag['timestamp'], flag['flag_type'], flag['description']
+
+    results = session.results()
+    tests_match = emitted_tests == batch_tests and results['declared_tests'] == batch_tests
+    flags_match = sorted(emitted_flags, key=flag_key) == sorted(batch_flags, key=flag_key) \
+        and results['demeanor_flags'] == batch_flags
+    print(f'fragments: {n_fragments} of {args.chunk_seconds:g}s, slowest add(): {worst_call * 1000:.1f} ms')
+    print(f'declared tests: batch {len(batch_tests)}, incremental {len(emitted_tests)}, equal: {tests_match}')
+    print(f'demeanor flags: batch {len(batch_flags)}, incremental {len(emitted_flags)}, equal: {flags_match}')
+    if not (tests_match and flags_match):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,272 @@
+"""
+Local stand-ins for the AWS clients used by the NLP Lambda
+
+They implement only the calls the pipeline makes, return responses shaped
+like boto3's, and simulate per-request latency and throttling so throughput
+can be measured offline.
+"""
+
+import io
+import json
+import random
+import re
+import threading
+import time
+
+
+class StubClientError(Exception):
+    """Mimics botocore.exceptions.ClientError's `response` attribute"""
+
+    def __init__(self, code: str, operation: str):
+        super().__init__(f'An error occurred ({code}) when calling the {operation} operation')
+        self.response = {'Error': {'Code': code, 'Message': code}}
+
+
+class StubComprehendClient:
+    """Comprehend stand-in with latency, request-level throttles and per-document errors"""
+
+    NEGATIVE_WORDS = ('ridiculous', 'lying', 'exaggerating', 'impossible', 'quiet', 'stop')
+
+    def __init__(self, latency: float = 0.05, throttle_rate: float = 0.0, document_error_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.document_error_rate = document_error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = {'detect_sentiment': 0, 'batch_detect_sentiment': 0}
+        self.documents_scored = 0
+
+    def _roll(self) -> float:
+        with self._lock:
+            return self._rng.random()
+
+    def _sentiment(self, text: str) -> dict:
+        negative = sum(word in text.lower() for word in self.NEGATIVE_WORDS) / 2
+        negative = min(negative, 0.95)
+        sentiment = 'NEGATIVE' if negative > 0.5 else 'NEUTRAL'
+        return {
+            'Sentiment': sentiment,
+            'SentimentScore': {'Positive': 0.02, 'Negative': negative, 'Neutral': 0.98 - negative, 'Mixed': 0.0}
+        }
+
+    def detect_sentiment(self, Text: str, LanguageCode: str) -> dict:
+        with self._lock:
+            self.calls['detect_sentiment'] += 1
+        time.sleep(self.latency)
+        if len(Text.encode('utf-8')) > 5000:
+            raise StubClientError('TextSizeLimitExceededException', 'DetectSentiment')
+        with self._lock:
+            self.documents_scored += 1
+        return self._sentiment(Text)
+
+    def batch_detect_sentiment(self, TextList: list, LanguageCode: str) -> dict:
+        with self._lock:
+            self.calls['batch_detect_sentiment'] += 1
+        time.sleep(self.latency)
+        if len(TextList) > 25:
+            raise StubClientError('BatchSizeLimitExceededException', 'BatchDetectSentiment')
+        if self._roll() < self.throttle_rate:
+            raise StubClientError('ThrottlingException', 'BatchDetectSentiment')
+        results, errors = [], []
+        for i, text in enumerate(TextList):
+            if len(text.encode('utf-8')) > 5000:
+                errors.append({'Index': i, 'ErrorCode': 'TextSizeLimitExceededException', 'ErrorMessage': 'too long'})
+            elif self._roll() < self.document_error_rate:
+                errors.append({'Index': i, 'ErrorCode': 'InternalServerException', 'ErrorMessage': 'transient'})
+            else:
+                results.append({'Index': i, **self._sentiment(text)})
+        with self._lock:
+            self.documents_scored += len(results)
+        return {'ResultList': results, 'ErrorList': errors}
+
+
+class StubBedrockClient:
+    """
+    Bedrock runtime stand-in for the test detection prompts
+
+    `labeler(text)` returns the test types to report for one transcript line;
+    the stub answers with a JSON array citing each line's segment id.
+    """
+
+    LINE = re.compile(r'^\[S(\d+) @ [\d.]+s\] [^:]*: (.*)$', re.MULTILINE)
+
+    def __init__(self, labeler, latency: float = 0.5):
+        self.labeler = labeler
+        self.latency = latency
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.prompt_chars = 0
+
+    def invoke_model(self, modelId: str, body: str) -> dict:
+        prompt = json.loads(body)['messages'][0]['content']
+        with self._lock:
+            self.calls += 1
+            self.prompt_chars += len(prompt)
+        time.sleep(self.latency)
+        answers = []
+        for segment_id, text in self.LINE.findall(prompt):
+            for test_type in self.labeler(text):
+                answers.append({'test_type': test_type, 'declaration': text[:80], 'segment_id': int(segment_id)})
+        payload = {'content': [{'type': 'text', 'text': json.dumps(answers)}]}
+        return {'body': io.BytesIO(json.dumps(payload).encode('utf-8'))}
+
+
+class StubDynamoTable:
+    """
+    DynamoDB Table resource stand-in with per-request latency
+
+    batch_writer mirrors boto3's: 25-item requests, resubmission of the
+    UnprocessedItems returned for a fraction of writes, and overwrite_by_pkeys
+    de-duplication within a buffer.
+    """
+
+    def __init__(self, latency: float = 0.01, unprocessed_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.unprocessed_rate = unprocessed_rate
+        self._rng = random.Random(seed)
+        self.items = {}
+        self.requests = 0
+
+    def _store(self, item: dict, key_name: str) -> None:
+        for value in item.values():
+            if isinstance(value, float):
+                raise TypeError('Float types are not supported. Use Decimal types instead.')
+        self.items[item[key_name]] = item
+
+    def put_item(self, Item: dict) -> dict:
+        self.requests += 1
+        time.sleep(self.latency)
+        self._store(Item, next(iter(Item)))
+        return {}
+
+    def update_item(self, **kwargs) -> dict:
+        self.requests += 1
+        time.sleep(self.latency)
+        return {}
+
+    def batch_writer(self, overwrite_by_pkeys: list = None):
+        return _StubBatchWriter(self, (overwrite_by_pkeys or [None])[0])
+
+
+class _StubBatchWriter:
+    def __init__(self, table: StubDynamoTable, key_name: str):
+        self._table = table
+        self._key_name = key_name
+        self._buffer = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        while self._buffer:
+            self._flush()
+
+    def put_item(self, Item: dict) -> None:
+        if self._key_name:
+            self._buffer = [item for item in self._buffer if item[self._key_name] != Item[self._key_name]]
+        self._buffer.append(Item)
+        if len(self._buffer) >= 25:
+            self._flush()
+
+    def _flush(self) -> None:
+        table = self._table
+        batch, self._buffer = self._buffer[:25], self._buffer[25:]
+        table.requests += 1
+        time.sleep(table.latency)
+        for item in batch:
+            if table._rng.random() < table.unprocessed_rate:
+                self._buffer.append(item)
+            else:
+                table._store(item, self._key_name or next(iter(item)))
+
+
+class StubDynamoResource:
+    """boto3.resource('dynamodb') stand-in handing out StubDynamoTable objects by name"""
+
+    def __init__(self, latency: float = 0.01):
+        self.latency = latency
+        self.tables = {}
+
+    def Table(self, name: str) -> StubDynamoTable:
+        if name not in self.tables:
+            self.tables[name] = StubDynamoTable(latency=self.latency)
+        return self.tables[name]
+
+
+class StubS3Client:
+    """In-memory S3 stand-in for get_object (including ranged GETs), put_object and the file transfer helpers"""
+
+    def __init__(self, latency: float = 0.02):
+        self.latency = latency
+        self.objects = {}
+        self.bytes_downloaded = 0
+        self.bytes_uploaded = 0
+        self.range_requests = 0
+        self._lock = threading.Lock()
+
+    def put_object(self, Bucket: str, Key: str, Body: bytes, **kwargs) -> dict:
+        time.sleep(self.latency)
+        self.objects[(Bucket, Key)] = Body if isinstance(Body, bytes) else Body.encode('utf-8')
+        return {}
+
+    def get_object(self, Bucket: str, Key: str, Range: str = None, **kwargs) -> dict:
+        time.sleep(self.latency)
+        if (Bucket, Key) not in self.objects:
+            raise StubClientError('NoSuchKey', 'GetObject')
+        data = self.objects[(Bucket, Key)]
+        if Range is None:
+            with self._lock:
+                self.bytes_downloaded += len(data)
+            return {'Body': io.BytesIO(data), 'ContentLength': len(data)}
+        first, last = Range.replace('bytes=', '').split('-')
+        first, last = int(first), min(int(last), len(data) - 1)
+        with self._lock:
+            self.bytes_downloaded += last + 1 - first
+            self.range_requests += 1
+        return {
+            'Body': io.BytesIO(data[first:last + 1]),
+            'ContentLength': last + 1 - first,
+            'ContentRange': f'bytes {first}-{last}/{len(data)}'
+        }
+
+    def download_file(self, Bucket: str, Key: str, Filename: str, **kwargs) -> None:
+        time.sleep(self.latency)
+        if (Bucket, Key) not in self.objects:
+            raise StubClientError('404', 'HeadObject')
+        data = self.objects[(Bucket, Key)]
+        with open(Filename, 'wb') as f:
+            f.write(data)
+        self.bytes_downloaded += len(data)
+
+    def upload_file(self, Filename: str, Bucket: str, Key: str, **kwargs) -> None:
+        time.sleep(self.latency)
+        with open(Filename, 'rb') as f:
+            data = f.read()
+        self.objects[(Bucket, Key)] = data
+        self.bytes_uploaded += len(data)
+
+
+class StubComprehendMedicalClient:
+    """Comprehend Medical stand-in tagging a few anatomy and condition terms"""
+
+    TERMS = {'back': 'ANATOMY', 'leg': 'ANATOMY', 'knee': 'ANATOMY', 'toes': 'ANATOMY',
+             'pain': 'MEDICAL_CONDITION', 'tingling': 'MEDICAL_CONDITION', 'ibuprofen': 'MEDICATION'}
+
+    def __init__(self, latency: float = 0.1):
+        self.latency = latency
+        self.calls = 0
+
+    def detect_entities_v2(self, Text: str) -> dict:
+        self.calls += 1
+        time.sleep(self.latency)
+        if len(Text.encode('utf-8')) > 20000:
+            raise StubClientError('TextSizeLimitExceededException', 'DetectEntitiesV2')
+        entities = []
+        for match in re.finditer(r'[a-z]+', Text):
+            category = self.TERMS.get(match.group())
+            if category:
+                entities.append({
+                    'Text': match.group(), 'Category': category, 'Type': category,
+                    'Score': 0.95, 'BeginOffset': match.start(), 'EndOffset': match.end()
+                })
+        return {'Entities': entities}
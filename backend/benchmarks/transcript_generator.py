@@ -0,0 +1,164 @@
+"""
+Synthetic AWS Transcribe Medical output for benchmarks
+
+Writes documents with the same shape as a real Transcribe job result
+(`results.transcripts`, `results.items` with `alternatives` and speaker
+labels, `results.speaker_labels.segments`) so the NLP stage can be measured
+without PHI. Exam length, speaker mix, declared-test rate and demeanor-flag
+rate are all parameters. Run from the repo root to write a file:
+
+    python backend/benchmarks/transcript_generator.py --minutes 60 --out exam.json
+"""
+
+import argparse
+import json
+import os
+import random
+from typing import Dict, Any, Optional, Sequence
+
+WORDS_PER_MINUTE = 150
+WORD_SECONDS = 60.0 / WORDS_PER_MINUTE
+
+# Named exam lengths used across the benchmark suite
+EXAM_LENGTHS = {'15m': 15, '1h': 60, '4h': 240, '8h': 480}
+
+# Examiner sentences the taxonomy detects (confidence >= 0.5), by test label
+DECLARATIONS = {
+    'straight_leg_raise': ["i'm going to do the straight leg raise now and straight leg raise was positive at forty degrees"],
+    'deep_tendon_reflexes': ["i'm going to check your deep tendon reflexes, patellar reflex first"],
+    'range_of_motion': ["now we check range of motion, flexion was limited and extension was limited"],
+    'lachman_test': ["i'm going to do the lachman test on the knee, no anterior translation"],
+    'romberg_test': ["i need you to stand for the romberg test, balance with eyes closed"],
+    'gait_observation': ["let's watch you walk, gait was antalgic and limping noted"],
+}
+EXAMINER_FILLER = [
+    'please sit on the edge of the table', 'okay relax for a moment', 'does it hurt when i press here',
+    'tell me about the accident', 'any numbness or tingling in the feet', 'how long have you had this pain',
+    'can you point to where it hurts the most', 'we are almost done with this part',
+]
+EXAMINEE_FILLER = [
+    'it hurts right here in my lower back', 'about two years now since the accident',
+    'yes it goes down my left leg', 'i can not bend that far', 'it is worse in the morning',
+    'sometimes i feel tingling in my toes', 'i take ibuprofen for it', 'no that does not hurt',
+]
+OTHER_FILLER = [
+    'the interpreter repeated the question', 'counsel noted the time for the record', 'okay',
+]
+DEMEANOR_PHRASES = [
+    "come on that's ridiculous", "i think you're exaggerating", "stop talking and let me finish",
+    "that's not important right now", "seriously? you can do better than that",
+]
+
+
+def generate_transcript(
+    minutes: float,
+    n_speakers: int = 2,
+    examiner_share: float = 0.5,
+    test_hit_rate: float = 0.05,
+    demeanor_rate: float = 0.02,
+    seed: int = 0,
+    labels: Optional[Sequence[str]] = None,
+    repeat_rate: float = 0.0
+) -> Dict[str, Any]:
+    """
+    Build a Transcribe Medical style document of about `minutes` of speech
+
+    Args:
+        minutes: Length of the exam audio
+        n_speakers: spk_0 is the examiner, spk_1 the examinee, any others
+            (interpreter, counsel) share the remaining turns
+        examiner_share: Fraction of segments spoken by spk_0
+        test_hit_rate: Fraction of examiner segments that declare a test
+        demeanor_rate: Fraction of examiner segments with demeanor language
+        seed: Random seed
+        labels: Test labels to draw declarations from (default: all)
+        repeat_rate: Chance that a declared test is named again in the
+            examiner's next turn, as examiners do while performing a test
+    """
+    rng = random.Random(seed)
+    pools = [DECLARATIONS[label] for label in (labels or DECLARATIONS)]
+    duration = minutes * 60.0
+
+    items, segments, transcript_words = [], [], []
+    t = 0.0
+    repeat = None
+    while t < duration:
+        roll = rng.random()
+        if roll < examiner_share:
+            speaker = 'spk_0'
+            kind = rng.random()
+            if repeat is not None:
+                sentence, repeat = repeat, None
+                if rng.random() < repeat_rate:
+                    repeat = sentence
+            elif kind < test_hit_rate:
+                sentence = rng.choice(rng.choice(pools))
+                if repeat_rate and rng.random() < repeat_rate:
+                    repeat = sentence
+            elif kind < test_hit_rate + demeanor_rate:
+                sentence = f'{rng.choice(DEMEANOR_PHRASES)} {rng.choice(EXAMINER_FILLER)}'
+            else:
+                sentence = rng.choice(EXAMINER_FILLER)
+        elif n_speakers <= 2 or roll < examiner_share + (1 - examiner_share) * 0.8:
+            speaker = 'spk_1'
+            sentence = rng.choice(EXAMINEE_FILLER)
+        else:
+            speaker = f'spk_{rng.randint(2, n_speakers - 1)}'
+            sentence = rng.choice(OTHER_FILLER)
+
+        seg_start, seg_items = t, []
+        for word in sentence.split():
+            item = {
+                'start_time': f'{t:.3f}', 'end_time': f'{t + WORD_SECONDS - 0.05:.3f}',
+                'alternatives': [{'confidence': f'{rng.uniform(0.8, 1):.4f}', 'content': word}],
+                'type': 'pronunciation', 'speaker_label': speaker
+            }
+            items.append(item)
+            seg_items.append({'start_time': item['start_time'], 'end_time': item['end_time'], 'speaker_label': speaker})
+            transcript_words.append(word)
+            t += WORD_SECONDS
+        items.append({'alternatives': [{'confidence': '0.0', 'content': '.'}], 'type': 'punctuation', 'speaker_label': speaker})
+        segments.append({
+            'start_time': f'{seg_start:.3f}', 'end_time': f'{t - 0.05:.3f}',
+            'speaker_label': speaker, 'items': seg_items
+        })
+        t += rng.uniform(0.3, 1.5)
+
+    return {
+        'jobName': f'synthetic-{minutes}m', 'accountId': '000000000000', 'status': 'COMPLETED',
+        'results': {
+            'transcripts': [{'transcript': ' '.join(transcript_words)}],
+            'speaker_labels': {'speakers': n_speakers, 'segments': segments},
+            'items': items
+        }
+    }
+
+
+def write_transcript(path: str, minutes: float, **kwargs: Any) -> int:
+    """Write a generated document to `path`; returns the file size in bytes"""
+    with open(path, 'w') as f:
+        json.dump(generate_transcript(minutes, **kwargs), f)
+    return os.path.getsize(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a synthetic Transcribe Medical JSON document')
+    parser.add_argument('--minutes', type=float, default=60)
+    parser.add_argument('--speakers', type=int, default=2)
+    parser.add_argument('--examiner-share', type=float, default=0.5)
+    parser.add_argument('--hit-rate', type=float, default=0.05)
+    parser.add_argument('--demeanor-rate', type=float, default=0.02)
+    parser.add_argument('--repeat-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', required=True)
+    args = parser.parse_args()
+    size = write_transcript(
+        args.out, args.minutes, n_speakers=args.speakers, examiner_share=args.examiner_share,
+        test_hit_rate=args.hit_rate, demeanor_rate=args.demeanor_rate, seed=args.seed,
+        repeat_rate=args.repeat_rate
+    )
+    print(f'Wrote {args.out} ({size / 1e6:.1f} MB)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+AWS Clients - Shared registry of lazily created boto3 clients and resources
+Nothing is constructed (or even imported) until a Lambda first calls the
+service, and each client is then reused for the life of the container
+"""
+
+import logging
+import os
+import threading
+from typing import Dict, Any, Tuple
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# One pooled connection per concurrent request: the widest fan-out in these
+# Lambdas is the sentiment/entity/Bedrock thread pools plus DynamoDB writes
+MAX_POOL_CONNECTIONS = int(os.environ.get('CME_AWS_MAX_POOL_CONNECTIONS', '16'))
+
+_registry: Dict[Tuple[str, str], Any] = {}
+_lock = threading.Lock()
+
+
+def client_config() -> Any:
+    """botocore Config shared by every client: pool size and TCP keepalive for reused connections"""
+    from botocore.config import Config
+    return Config(max_pool_connections=MAX_POOL_CONNECTIONS, tcp_keepalive=True)
+
+
+def _create(kind: str, service: str) -> Any:
+    key = (kind, service)
+    instance = _registry.get(key)
+    if instance is not None:
+        return instance
+    with _lock:
+        # Client creation on boto3's default session is not thread-safe
+        instance = _registry.get(key)
+        if instance is None:
+            import boto3
+            factory = boto3.client if kind == 'client' else boto3.resource
+            instance = factory(service, config=client_config())
+            _registry[key] = instance
+            logger.info(f"Created boto3 {kind} for {service}")
+    return instance
+
+
+def get_client(service: str) -> Any:
+    """The shared boto3 client for `service`, created on first call"""
+    return _create('client', service)
+
+
+def get_resource(service: str) -> Any:
+    """The shared boto3 resource for `service`, created on first call"""
+    return _create('resource', service)
+
+
+def reset() -> None:
+    """Forget every created client (for benchmarks that swap in stubs)"""
+    with _lock:
+        _registry.clear()
+
+
+def install(kind: str, service: str, instance: Any) -> None:
+    """Use `instance` as the shared client or resource for `service` (for benchmarks that swap in stubs)"""
+    with _lock:
+        _registry[(kind, service)] = instance
+
+
+class LazyClient:
+    """
+    Module-level stand-in for a client or resource
+
+    Attribute access goes to the shared instance, which is created the first
+    time any attribute is used, so `s3_client = lazy_client('s3')` at import
+    costs nothing.
+    """
+
+    def __init__(self, kind: str, service: str):
+        self._kind = kind
+        self._service = service
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(_create(self._kind, self._service), name)
+
+    def __repr__(self) -> str:
+        return f'LazyClient({self._kind}={self._service!r})'
+
+
+def lazy_client(service: str) -> LazyClient:
+    return LazyClient('client', service)
+
+
+def lazy_resource(service: str) -> LazyClient:
+    return LazyClient('resource', service)
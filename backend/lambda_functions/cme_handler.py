@@ -4,7 +4,6 @@ Implements the Florida happy-path workflow for AI-powered CME recording analysis
 """
 
 import json
-import boto3
 import logging
 from typing import Dict, Any, Optional, List
 import os
@@ -13,17 +12,19 @@ import uuid
 from datetime import datetime, timedelta
 from decimal import Decimal
 
+from aws_clients import lazy_client, lazy_resource
+
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# Initialize AWS clients
-s3_client = boto3.client('s3')
-dynamodb = boto3.resource('dynamodb')
-transcribe_client = boto3.client('transcribe')
-comprehend_client = boto3.client('comprehend')
-bedrock_client = boto3.client('bedrock-runtime')
-stepfunctions_client = boto3.client('stepfunctions')
+# AWS clients, created on first use so a request only pays for the services it calls
+s3_client = lazy_client('s3')
+dynamodb = lazy_resource('dynamodb')
+transcribe_client = lazy_client('transcribe')
+comprehend_client = lazy_client('comprehend')
+bedrock_client = lazy_client('bedrock-runtime')
+stepfunctions_client = lazy_client('stepfunctions')
 
 # Environment variables
 S3_BUCKET = os.environ.get('S3_BUCKET', 'eve-legal-documents')
@@ -44,20 +45,6 @@ STATE_RECORDING_RULES = {
     'DEFAULT': {'video': False, 'audio': False, 'mode': 'Ephemeral', 'rule': 'Jurisdictional rules apply'}
 }
 
-# Medical test taxonomy for intent detection
-TEST_TAXONOMY = {
-    'spine': ['spine', 'spinal', 'vertebra', 'vertebrae', 'back'],
-    'lumbar_rom': ['lumbar', 'lower back', 'range of motion', 'rom', 'flexion', 'extension'],
-    'straight_leg_raise': ['straight leg', 'slr', 'leg raise', 'lasegue'],
-    'waddells_signs': ['waddell', 'non-organic', 'behavioral'],
-    'cervical_rom': ['cervical', 'neck', 'rotation', 'lateral flexion'],
-    'gait': ['gait', 'walking', 'ambulation', 'mobility'],
-    'neurological': ['reflex', 'reflexes', 'sensation', 'sensory', 'motor', 'strength'],
-    'palpation': ['palpate', 'palpating', 'feel', 'touch', 'tender'],
-    'orthopedic': ['orthopedic', 'musculoskeletal', 'joint'],
-    'cognitive': ['memory', 'concentration', 'cognitive', 'mental status']
-}
-
 
 class CMEDataModel:
     """Data models for CME analysis"""
@@ -4,428 +4,112 @@ Implements Steps 4 & 7 from the technical documentation
 """
 
 import json
-import boto3
 import logging
-import re
+import os
 from typing import Dict, Any, List, Tuple, Optional
 from decimal import Decimal
 import time
+from bisect import bisect_left, bisect_right
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from aws_clients import get_client, get_resource, lazy_client
+from transcript_index import TranscriptIndex
+from transcript_stream import parse_transcript_stream
+from transcript_columnar import ColumnarTranscriptStore
+from demeanor_lexicon import DemeanorLexicon
+from sentiment_pipeline import SentimentPipeline
+from result_cache import ResultCache, S3ResultCache, content_key
+from dynamo_persistence import persist_declared_steps, persist_demeanor_flags
+from speaker_roles import SpeakerRoleResolver
+from intent_classifier import get_intent_classifier
+from test_episodes import consolidate_declared_tests, episode_metrics, episode_payload
+from test_taxonomy import TEST_TAXONOMY, DEFAULT_DEMEANOR_LEXICON
+from taxonomy_artifact import TaxonomyArtifact
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# Initialize AWS clients
-comprehend_client = boto3.client('comprehend')
-bedrock_client = boto3.client('bedrock-runtime')
-
-# Comprehensive Medical Test Taxonomy for CME/IME Detection
-# Based on common physical examination tests in medico-legal contexts
-TEST_TAXONOMY = {
-    'range_of_motion': {
-        'keywords': ['range of motion', 'rom', 'flexion', 'extension', 'limited', 'measured in degrees', 'restricted'],
-        'patterns': [
-            r'range\s+of\s+motion\s+(?:was\s+)?measured',
-            r'(?:flexion|extension)\s+(?:were|was)\s+limited',
-            r'rom\s+(?:is\s+)?restricted',
-            r'limited\s+(?:in\s+)?all\s+planes'
-        ],
-        'category': 'orthopedic',
-        'priority': 'high'
-    },
-    'straight_leg_raise': {
-        'keywords': ['straight leg raise', 'slr', 'positive at', 'negative straight', 'lasegue'],
-        'patterns': [
-            r'straight\s+leg\s+raise\s+(?:was\s+)?positive',
-            r'slr\s+(?:positive|negative)',
-            r'negative\s+straight[-\s]leg\s+raise'
-        ],
-        'category': 'orthopedic',
-        'priority': 'high'
-    },
-    'cross_straight_leg_raise': {
-        'keywords': ['crossed straight', 'contralateral', 'well leg raise', 'opposite leg'],
-        'patterns': [
-            r'crossed\s+straight[-\s]leg\s+raise',
-            r'contralateral\s+slr',
-            r'well\s+leg\s+raise',
-            r'positive\s+(?:well\s+leg|contralateral)'
-        ],
-        'category': 'orthopedic',
-        'priority': 'medium'
-    },
-    'faber_test': {
-        'keywords': ['faber', 'patrick', 'figure-4', 'si joint', 'hip pain'],
-        'patterns': [
-            r'faber\s+test',
-            r'patrick[\'s]*\s+test',
-            r'figure[-\s]4\s+position'
-        ],
-        'category': 'orthopedic',
-        'priority': 'medium'
-    },
-    'spurlings_test': {
-        'keywords': ['spurling', 'foraminal compression', 'radicular pain', 'neck'],
-        'patterns': [
-            r'spurling[\'s]*\s+(?:test|maneuver)',
-            r'foraminal\s+compression',
-            r'radicular\s+pain'
-        ],
-        'category': 'orthopedic',
-        'priority': 'medium'
-    },
-    'drop_arm_test': {
-        'keywords': ['drop arm', 'rotator cuff', 'lower the arm', '90° abduction'],
-        'patterns': [
-            r'drop\s+arm\s+test',
-            r'unable\s+to\s+(?:smoothly\s+)?lower\s+(?:the\s+)?arm',
-            r'arm\s+drops?\s+suddenly'
-        ],
-        'category': 'orthopedic',
-        'priority': 'medium'
-    },
-    'hawkins_kennedy_test': {
-        'keywords': ['hawkins', 'kennedy', 'impingement', 'shoulder pain', 'internally rotate'],
-        'patterns': [
-            r'hawkins[-\s]kennedy\s+test',
-            r'hawkins\s+impingement',
-            r'internal(?:ly)?\s+rotat(?:e|ion)'
-        ],
-        'category': 'orthopedic',
-        'priority': 'medium'
-    },
-    'neer_test': {
-        'keywords': ['neer', 'impingement', 'forward flexion', 'overhead'],
-        'patterns': [
-            r'neer[\'s]*\s+(?:test|sign)',
-            r'neer\s+impingement',
-            r'forced\s+forward\s+flexion'
-        ],
-        'category': 'orthopedic',
-        'priority': 'medium'
-    },
-    'lachman_test': {
-        'keywords': ['lachman', 'acl', 'anterior translation', 'soft endpoint', 'knee'],
-        'patterns': [
-            r'lachman\s+test',
-            r'acl\s+(?:tear|laxity)',
-            r'anterior\s+translation',
-            r'soft\s+endpoint'
-        ],
-        'category': 'orthopedic',
-        'priority': 'medium'
-    },
-    'mcmurray_test': {
-        'keywords': ['mcmurray', 'meniscus', 'click', 'knee', 'joint line'],
-        'patterns': [
-            r'mcmurray[\'s]*\s+test',
-            r'meniscal\s+tear',
-            r'click\s+(?:in\s+)?(?:the\s+)?knee'
-        ],
-        'category': 'orthopedic',
-        'priority': 'medium'
-    },
-    'phalens_test': {
-        'keywords': ['phalen', 'carpal tunnel', 'wrist flexion', 'tingling', 'fingers'],
-        'patterns': [
-            r'phalen[\'s]*\s+(?:test|maneuver)',
-            r'carpal\s+tunnel',
-            r'wrist\s+flexion',
-            r'tingling\s+(?:in\s+)?fingers'
-        ],
-        'category': 'orthopedic',
-        'priority': 'medium'
-    },
-    'tinels_sign': {
-        'keywords': ['tinel', 'tapping', 'nerve', 'tingling', 'pins and needles'],
-        'patterns': [
-            r'tinel[\'s]*\s+sign',
-            r'tapping\s+over\s+(?:the\s+)?(?:median|ulnar)\s+nerve',
-            r'pins\s+and\s+needles'
-        ],
-        'category': 'orthopedic',
-        'priority': 'medium'
-    },
-    'trendelenburg_sign': {
-        'keywords': ['trendelenburg', 'pelvic drop', 'hip abductor', 'one leg'],
-        'patterns': [
-            r'trendelenburg\s+sign',
-            r'pelvic\s+drop',
-            r'standing\s+on\s+one\s+leg'
-        ],
-        'category': 'orthopedic',
-        'priority': 'medium'
-    },
-    'deep_tendon_reflexes': {
-        'keywords': ['deep tendon', 'dtr', 'reflex', 'patellar', 'achilles', 'biceps', 'triceps', '2+', 'brisk', 'absent'],
-        'patterns': [
-            r'deep\s+tendon\s+reflex(?:es)?',
-            r'dtr[s]*',
-            r'(?:patellar|achilles|biceps|triceps)\s+reflex',
-            r'reflex(?:es)?\s+(?:\d\+|brisk|absent|diminished)'
-        ],
-        'category': 'neurological',
-        'priority': 'high'
-    },
-    'babinski_sign': {
-        'keywords': ['babinski', 'plantar response', 'upgoing toe', 'downgoing', 'extensor'],
-        'patterns': [
-            r'babinski\s+sign',
-            r'plantar\s+response',
-            r'(?:upgoing|downgoing)\s+toe',
-            r'extensor\s+plantar'
-        ],
-        'category': 'neurological',
-        'priority': 'medium'
-    },
-    'hoffmanns_sign': {
-        'keywords': ['hoffmann', 'flick', 'middle finger', 'thumb flexion', 'cervical'],
-        'patterns': [
-            r'hoffmann[\'s]*\s+(?:sign|reflex)',
-            r'flick(?:ing)?\s+(?:the\s+)?middle\s+finger'
-        ],
-        'category': 'neurological',
-        'priority': 'medium'
-    },
-    'clonus_test': {
-        'keywords': ['clonus', 'ankle', 'sustained', 'beats', 'rhythmic'],
-        'patterns': [
-            r'clonus\s+(?:present|noted|absent)',
-            r'sustained\s+clonus',
-            r'beats\s+of\s+clonus'
-        ],
-        'category': 'neurological',
-        'priority': 'medium'
-    },
-    'romberg_test': {
-        'keywords': ['romberg', 'balance', 'eyes closed', 'sway', 'proprioception'],
-        'patterns': [
-            r'romberg\s+(?:test|sign)',
-            r'balance\s+with\s+eyes\s+closed',
-            r'increased\s+sway'
-        ],
-        'category': 'neurological',
-        'priority': 'medium'
-    },
-    'light_touch_sensation': {
-        'keywords': ['light touch', 'sensation', 'intact', 'decreased', 'dermatome'],
-        'patterns': [
-            r'light\s+touch\s+sensation',
-            r'sensation\s+(?:is\s+)?intact',
-            r'decreased\s+(?:light\s+)?touch'
-        ],
-        'category': 'sensory',
-        'priority': 'high'
-    },
-    'pinprick_sensation': {
-        'keywords': ['pinprick', 'sharp', 'dull', 'pin sensation', 'discrimination'],
-        'patterns': [
-            r'pinprick\s+sensation',
-            r'sharp[/\s]dull',
-            r'pin\s+sensation',
-            r'sharp[/\s]dull\s+discrimination'
-        ],
-        'category': 'sensory',
-        'priority': 'high'
-    },
-    'vibration_sense': {
-        'keywords': ['vibration', 'tuning fork', 'vibratory', 'great toe', 'malleolus'],
-        'patterns': [
-            r'vibration\s+sense',
-            r'vibratory\s+sensation',
-            r'tuning\s+fork'
-        ],
-        'category': 'sensory',
-        'priority': 'medium'
-    },
-    'proprioception': {
-        'keywords': ['proprioception', 'joint position', 'position sense', 'up or down'],
-        'patterns': [
-            r'proprioception\s+test',
-            r'joint\s+position\s+sense',
-            r'position\s+sense'
-        ],
-        'category': 'sensory',
-        'priority': 'medium'
-    },
-    'gait_observation': {
-        'keywords': ['gait', 'antalgic', 'limping', 'walking', 'stride', 'assistive device'],
-        'patterns': [
-            r'gait\s+(?:was|is)\s+(?:antalgic|normal|abnormal)',
-            r'limp(?:ing)?\s+noted',
-            r'walking\s+(?:with|without)\s+(?:assistive\s+)?device'
-        ],
-        'category': 'functional',
-        'priority': 'high'
-    },
-    'heel_walking': {
-        'keywords': ['heel walk', 'walk on heels', 'dorsiflexor', 'tibialis anterior'],
-        'patterns': [
-            r'heel\s+walk(?:ing)?',
-            r'walk(?:ing)?\s+on\s+heels',
-            r'(?:able|unable)\s+to\s+walk\s+on\s+heels'
-        ],
-        'category': 'functional',
-        'priority': 'high'
-    },
-    'toe_walking': {
-        'keywords': ['toe walk', 'walk on toes', 'plantarflexor', 'calf', 'tiptoes'],
-        'patterns': [
-            r'toe\s+walk(?:ing)?',
-            r'walk(?:ing)?\s+on\s+toes',
-            r'(?:able|unable)\s+to\s+walk\s+on\s+toes',
-            r'tiptoes'
-        ],
-        'category': 'functional',
-        'priority': 'high'
-    },
-    'tandem_gait': {
-        'keywords': ['tandem', 'heel-to-toe', 'balance', 'straight line'],
-        'patterns': [
-            r'tandem\s+(?:gait|walk)',
-            r'heel[-\s]to[-\s]toe',
-            r'walk(?:ing)?\s+(?:in\s+)?(?:a\s+)?straight\s+line'
-        ],
-        'category': 'functional',
-        'priority': 'medium'
-    },
-    'sit_to_stand': {
-        'keywords': ['sit to stand', 'rise from', 'seated position', 'chair', 'arm support'],
-        'patterns': [
-            r'sit[-\s]to[-\s]stand',
-            r'ris(?:e|ing)\s+from\s+(?:seated|chair)',
-            r'(?:needs|uses)\s+arm\s+support'
-        ],
-        'category': 'functional',
-        'priority': 'medium'
-    },
-    'stair_climb': {
-        'keywords': ['stair', 'climb', 'ascend', 'descend', 'step', 'railing'],
-        'patterns': [
-            r'stair\s+climb',
-            r'ascend(?:s|ing)?\s+(?:and\s+)?descend',
-            r'step\s+up\s+and\s+down',
-            r'uses?\s+railing'
-        ],
-        'category': 'functional',
-        'priority': 'medium'
-    },
-    'squat_and_rise': {
-        'keywords': ['squat', 'rise', 'full squat', 'knee flexion', 'difficulty'],
-        'patterns': [
-            r'squat\s+(?:and\s+)?rise',
-            r'full\s+squat',
-            r'half[-\s]squat',
-            r'difficulty\s+squatting'
-        ],
-        'category': 'functional',
-        'priority': 'medium'
-    },
-    'axial_loading': {
-        'keywords': ['axial loading', 'axial compression', 'downward pressure', 'skull', 'non-organic'],
-        'patterns': [
-            r'axial\s+loading',
-            r'axial\s+compression',
-            r'downward\s+pressure\s+on\s+(?:the\s+)?head',
-            r'non[-\s]organic\s+finding'
-        ],
-        'category': 'simulation',
-        'priority': 'high'
-    },
-    'simulated_rotation': {
-        'keywords': ['simulated rotation', 'en bloc', 'trunk rotation', 'shoulders and pelvis', 'non-organic'],
-        'patterns': [
-            r'simulated\s+rotation',
-            r'en\s+bloc\s+(?:rotation|trunk)',
-            r'rotating?\s+shoulders\s+and\s+pelvis'
-        ],
-        'category': 'simulation',
-        'priority': 'high'
-    },
-    'superficial_tenderness': {
-        'keywords': ['superficial tenderness', 'light touch', 'widespread', 'non-anatomic'],
-        'patterns': [
-            r'superficial\s+tenderness',
-            r'widespread\s+tenderness',
-            r'light\s+touch\s+(?:causes|elicits)\s+pain'
-        ],
-        'category': 'simulation',
-        'priority': 'high'
-    },
-    'non_anatomic_tenderness': {
-        'keywords': ['non-anatomic', 'diffuse', 'broad area', 'not localized'],
-        'patterns': [
-            r'non[-\s]anatomic\s+tenderness',
-            r'diffuse\s+(?:pain|tenderness)',
-            r'broad\s+area'
-        ],
-        'category': 'simulation',
-        'priority': 'high'
-    },
-    'distracted_slr': {
-        'keywords': ['distracted', 'flip test', 'inconsistent', 'seated', 'supine slr'],
-        'patterns': [
-            r'distracted\s+(?:straight\s+leg|slr)',
-            r'flip\s+test',
-            r'inconsistent\s+(?:straight\s+leg|slr)',
-            r'seated\s+(?:vs\s+)?supine'
-        ],
-        'category': 'simulation',
-        'priority': 'high'
-    },
-    'give_way_weakness': {
-        'keywords': ['give-way', 'giveway', 'cogwheel', 'inconsistent effort', 'regional weakness'],
-        'patterns': [
-            r'give[-\s]way\s+weakness',
-            r'cogwheel\s+weakness',
-            r'inconsistent\s+effort',
-            r'regional\s+weakness'
-        ],
-        'category': 'simulation',
-        'priority': 'high'
-    },
-    'hoovers_test': {
-        'keywords': ['hoover', 'downward pressure', 'opposite heel', 'lack of effort'],
-        'patterns': [
-            r'hoover[\'s]*\s+(?:test|sign)',
-            r'downward\s+pressure\s+(?:from\s+)?opposite',
-            r'lack\s+of\s+effort'
-        ],
-        'category': 'simulation',
-        'priority': 'medium'
-    },
-    'manual_muscle_testing': {
-        'keywords': ['manual muscle', 'mmt', 'strength', '5/5', '4/5', 'muscle groups'],
-        'patterns': [
-            r'manual\s+muscle\s+test(?:ing)?',
-            r'mmt',
-            r'strength\s+(?:is\s+)?\d[/]\d',
-            r'\d[/]\d\s+(?:strength|weakness)'
-        ],
-        'category': 'MMT',
-        'priority': 'high'
-    }
-}
-
-# Demeanor analysis patterns
-NEGATIVE_TONE_INDICATORS = [
-    'that\'s ridiculous', 'you\'re lying', 'i don\'t believe', 'that\'s impossible',
-    'come on', 'really?', 'seriously?', 'you\'re exaggerating', 'that doesn\'t make sense'
-]
-
-INTERRUPTION_PATTERNS = [
-    r'stop\s+(?:talking|speaking)',
-    r'let\s+me\s+(?:speak|talk)',
-    r'don\'t\s+(?:interrupt|talk)',
-    r'be\s+quiet',
-    r'shut\s+up'
-]
-
-DISMISSIVE_PATTERNS = [
-    r'(?:doesn\'t|does\s+not)\s+matter',
-    r'not\s+important',
-    r'(?:don\'t|do\s+not)\s+care\s+about',
-    r'that\'s\s+(?:irrelevant|not\s+relevant)'
-]
+# AWS clients, created on first use
+comprehend_client = lazy_client('comprehend')
+bedrock_client = lazy_client('bedrock-runtime')
+comprehend_medical_client = lazy_client('comprehendmedical')
+
+# Parse S3 transcripts incrementally into compact arrays instead of json.loads
+STREAM_TRANSCRIPTS = os.environ.get('CME_STREAM_TRANSCRIPTS', 'true').lower() == 'true'
+
+# Declarations split across diarization segments: join consecutive same-speaker
+# segments separated by at most ROLLING_MAX_GAP seconds into one scan window
+CROSS_SEGMENT_DETECTION = os.environ.get('CME_CROSS_SEGMENT_DETECTION', 'true').lower() == 'true'
+ROLLING_MAX_GAP = float(os.environ.get('CME_ROLLING_MAX_GAP', '2.0'))
+ROLLING_MAX_CHARS = int(os.environ.get('CME_ROLLING_MAX_CHARS', '1000'))
+
+# Sharded mode for very long exams: test detection and tone analysis run in
+# worker processes, one time shard each. Opt-in (0 = one worker per available
+# vCPU): sequential detection + tone on an 8 h exam takes well under a second,
+# less than forking workers and pickling shards costs
+AVAILABLE_VCPUS = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else (os.cpu_count() or 1)
+NLP_WORKERS = int(os.environ.get('CME_NLP_WORKERS', '1')) or AVAILABLE_VCPUS
+SHARD_MIN_SECONDS = float(os.environ.get('CME_SHARD_MIN_SECONDS', '7200'))
+
+# Test detection backend: 'taxonomy' (keyword/pattern scoring) or 'local_model',
+# a transformers classifier run on CPU in-process (see intent_classifier.py)
+INTENT_BACKEND = os.environ.get('CME_INTENT_BACKEND', 'taxonomy')
+INTENT_MODEL_PATH = os.environ.get('CME_INTENT_MODEL_PATH', '')
+INTENT_MODEL_THREADS = int(os.environ.get('CME_INTENT_MODEL_THREADS', '0')) or AVAILABLE_VCPUS
+INTENT_BATCH_SIZE = int(os.environ.get('CME_INTENT_BATCH_SIZE', '32'))
+INTENT_QUANTIZE = os.environ.get('CME_INTENT_QUANTIZE', 'true').lower() == 'true'
+INTENT_THRESHOLD = float(os.environ.get('CME_INTENT_THRESHOLD', '0.5'))
+
+# Same-label declarations within EPISODE_TOLERANCE_SECONDS of each other are
+# merged into one test episode (spanning at most EPISODE_MAX_SECONDS), and the
+# video Map fans out over episodes instead of individual declarations
+EPISODE_TOLERANCE_SECONDS = float(os.environ.get('CME_EPISODE_TOLERANCE_SECONDS', '60'))
+EPISODE_MAX_SECONDS = float(os.environ.get('CME_EPISODE_MAX_SECONDS', '300'))
+
+# Medical entity stage: chunk size (Comprehend Medical limit), concurrency and cache
+EXTRACT_MEDICAL_ENTITIES = os.environ.get('CME_EXTRACT_MEDICAL_ENTITIES', 'true').lower() == 'true'
+MEDICAL_ENTITY_CHUNK_CHARS = 20000
+MEDICAL_ENTITY_WORKERS = int(os.environ.get('CME_MEDICAL_ENTITY_WORKERS', '4'))
+CACHE_DIR = os.environ.get('CME_CACHE_DIR', '/tmp/cme-cache')
+ENTITY_CACHE = ResultCache(os.path.join(CACHE_DIR, 'medical-entities'))
+
+# Bedrock test detection: model, overlapping transcript windows and response cache
+BEDROCK_MODEL_ID = os.environ.get('CME_BEDROCK_MODEL_ID', 'anthropic.claude-3-sonnet-20240229-v1:0')
+AI_WINDOW_SECONDS = float(os.environ.get('CME_AI_WINDOW_SECONDS', '300'))
+AI_WINDOW_OVERLAP_SECONDS = float(os.environ.get('CME_AI_WINDOW_OVERLAP_SECONDS', '30'))
+AI_WINDOW_MAX_CHARS = 4000
+AI_MAX_CONCURRENCY = int(os.environ.get('CME_AI_MAX_CONCURRENCY', '3'))
+BEDROCK_CACHE = ResultCache(os.path.join(CACHE_DIR, 'bedrock'), max_entries=512)
+
+# Confidence-gated cascade: segments whose best local score falls in
+# [CASCADE_LOW, CASCADE_HIGH) are escalated to Bedrock; the rest are decided locally
+AI_CASCADE = os.environ.get('CME_AI_CASCADE', 'false').lower() == 'true'
+CASCADE_LOW = float(os.environ.get('CME_CASCADE_LOW', '0.2'))
+CASCADE_HIGH = float(os.environ.get('CME_CASCADE_HIGH', '0.5'))
+
+# Whole-result cache so retried executions and re-run sessions skip analysis
+# and persistence; kept in S3 when a bucket is configured, else under /tmp
+RESULT_CACHE_ENABLED = os.environ.get('CME_RESULT_CACHE', 'true').lower() == 'true'
+RESULT_CACHE_BUCKET = os.environ.get('CME_RESULT_CACHE_BUCKET', os.environ.get('S3_BUCKET', ''))
+if RESULT_CACHE_BUCKET:
+    RESULT_CACHE = S3ResultCache(lazy_client('s3'), RESULT_CACHE_BUCKET, 'cme-cache/nlp-results/')
+else:
+    RESULT_CACHE = ResultCache(os.path.join(CACHE_DIR, 'nlp-results'), max_entries=64)
+
+# Prebuilt matcher tables (see taxonomy_artifact.py); every segment scan reuses them
+TAXONOMY_ARTIFACT = TaxonomyArtifact.load(os.environ.get('CME_TAXONOMY_ARTIFACT'))
+TEST_MATCHER = TAXONOMY_ARTIFACT.test_matcher
+SPEAKER_ROLE_RESOLVER = SpeakerRoleResolver(TEST_MATCHER)
+
+# Changes whenever a test, keyword, pattern or declaration phrase changes
+TAXONOMY_VERSION = TAXONOMY_ARTIFACT.taxonomy_version
+
+# Set CME_DEMEANOR_LEXICON to a JSON file path to override the built-in lexicon
+if os.environ.get('CME_DEMEANOR_LEXICON'):
+    DEMEANOR_LEXICON = DemeanorLexicon.load(os.environ.get('CME_DEMEANOR_LEXICON'), DEFAULT_DEMEANOR_LEXICON)
+else:
+    DEMEANOR_LEXICON = TAXONOMY_ARTIFACT.demeanor_lexicon
 
 
 class CMENLPProcessor:
@@ -433,14 +117,108 @@ class CMENLPProcessor:
     
     def __init__(self):
         self.test_taxonomy = TEST_TAXONOMY
+        self.test_matcher = TEST_MATCHER
+        self.speaker_role_resolver = SPEAKER_ROLE_RESOLVER
+        self.demeanor_lexicon = DEMEANOR_LEXICON
+        self.sentiment_pipeline = SentimentPipeline(comprehend_client)
+        self.sentiment_timeline: List[Dict[str, Any]] = []
+        self.cascade_metrics: Dict[str, Any] = {}
     
-    def detect_declared_tests(self, transcript: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def analyze_sharded(
+        self,
+        transcript: Dict[str, Any],
+        examiner_speaker_label: str,
+        workers: int = NLP_WORKERS
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        detect_declared_tests + analyze_examiner_demeanor across worker processes
+        
+        The parent lays out the scan units (rolling windows, or single segments
+        in per-segment mode) exactly as the sequential path would, then cuts
+        them into `workers` time shards. A window that crosses a shard boundary
+        stays whole in the shard where it starts, overlapping the next one, and
+        hits repeated across the boundary are dropped when shards are merged in
+        time order. Tone analysis is sharded the same way; interruption
+        counting and Comprehend sentiment stay in the parent.
+        
+        Returns:
+            (declared_tests, demeanor_flags), identical to the sequential calls
+        """
+        index = TranscriptIndex.from_transcript(transcript)
+        examiner = examiner_speaker_label
+        
+        if CROSS_SEGMENT_DETECTION:
+            units = [w for w in index.speaker_windows(ROLLING_MAX_GAP, ROLLING_MAX_CHARS)
+                     if index.segment_speakers[w[0]] == examiner]
+        else:
+            units = [[i] for i in index.segments_for_speaker(examiner)]
+        examiner_segments = index.segments_for_speaker(examiner)
+        
+        # Time shards of equal length; each unit and segment goes to the shard it starts in
+        duration = index.segment_ends[-1] if len(index) else 0.0
+        shard_seconds = duration / workers if workers and duration else float('inf')
+        shards = [{'units': [], 'segments': []} for _ in range(max(workers, 1))]
+        for unit in units:
+            shards[min(int(index.segment_starts[unit[0]] // shard_seconds), len(shards) - 1)]['units'].append(unit)
+        for i in examiner_segments:
+            shards[min(int(index.segment_starts[i] // shard_seconds), len(shards) - 1)]['segments'].append(i)
+        shards = [shard for shard in shards if shard['units'] or shard['segments']]
+        
+        _SHARD_CONTEXT['processor'] = self
+        _SHARD_CONTEXT['index'] = index
+        try:
+            shard_results = _run_shards(shards, workers)
+        finally:
+            _SHARD_CONTEXT.clear()
+        
+        # Merge in time order; the boundary overlap can report a hit twice
+        declared_tests = []
+        seen = set()
+        tone_flags = {}
+        for tests, flags in shard_results:
+            for test in tests:
+                key = (test['label'], test['timestamp'])
+                if key not in seen:
+                    seen.add(key)
+                    declared_tests.append(test)
+            tone_flags.update(flags)
+        
+        # Interruptions need the full turn order, which is cheap to walk here
+        demeanor_flags = []
+        state = {'consecutive_count': 0, 'last_speaker': None}
+        for i in range(len(index)):
+            for flag in self._segment_demeanor_flags(index, i, examiner, state, tone=False):
+                demeanor_flags.append(flag)
+            demeanor_flags.extend(tone_flags.get(i, []))
+        
+        self.sentiment_timeline = self.sentiment_pipeline.timeline(index, examiner_segments)
+        demeanor_flags.extend(self._sentiment_flags(self.sentiment_timeline))
+        
+        logger.info(
+            f"Sharded analysis over {len(shards)} shards: {len(declared_tests)} tests, {len(demeanor_flags)} flags"
+        )
+        return declared_tests, demeanor_flags
+    
+    def incremental(self, examiner_speaker_label: str) -> 'IncrementalAnalysis':
+        """Start incremental analysis of a transcript that arrives in fragments"""
+        return IncrementalAnalysis(self, examiner_speaker_label)
+    
+    def resolve_examiner(self, transcript: Dict[str, Any]) -> Dict[str, Any]:
+        """Identify the examiner's speaker label (see SpeakerRoleResolver.resolve)"""
+        return self.speaker_role_resolver.resolve(TranscriptIndex.from_transcript(transcript))
+    
+    def detect_declared_tests(
+        self,
+        transcript: Dict[str, Any],
+        speaker_label: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
         """
         Step 4: Test Intent Detection
         Analyze transcript to identify declared medical tests
         
         Args:
-            transcript: AWS Transcribe output with speaker labels
+            transcript: AWS Transcribe output with speaker labels, or a prebuilt TranscriptIndex
+            speaker_label: Only analyze this speaker's segments (the examiner); all speakers if None
             
         Returns:
             List of detected test declarations with timestamps
@@ -448,24 +226,22 @@ class CMENLPProcessor:
         declared_tests = []
         
         try:
-            # Parse transcript items
-            results = transcript.get('results', {})
-            items = results.get('items', [])
-            speaker_labels = results.get('speaker_labels', {})
-            segments = speaker_labels.get('segments', [])
+            index = TranscriptIndex.from_transcript(transcript)
+            
+            if CROSS_SEGMENT_DETECTION:
+                declared_tests = self._detect_declared_tests_rolling(index, speaker_label)
+                logger.info(f"Detected {len(declared_tests)} test declarations")
+                return declared_tests
+            
+            # Only analyze examiner speech when the examiner is known
+            segment_ids = self._speaker_segments(index, speaker_label)
             
             # Process each segment
-            for segment in segments:
-                speaker = segment.get('speaker_label', 'unknown')
-                
-                # Only analyze examiner speech (typically speaker_0 or speaker_1)
-                # In real implementation, we'd use speaker diarization to identify the examiner
-                
-                start_time = float(segment.get('start_time', 0))
-                end_time = float(segment.get('end_time', 0))
+            for i in segment_ids:
+                speaker, start_time, end_time = index.segment(i)
                 
                 # Get transcript text for this segment
-                segment_text = self._get_segment_text(segment, items)
+                segment_text = index.segment_text(i)
                 
                 # Detect test declarations
                 detected_tests = self._analyze_text_for_tests(segment_text, start_time)
@@ -482,58 +258,94 @@ class CMENLPProcessor:
             logger.error(f"Error detecting declared tests: {str(e)}")
             return []
     
-    def _get_segment_text(self, segment: Dict[str, Any], items: List[Dict[str, Any]]) -> str:
-        """Extract text from a transcript segment"""
-        segment_start = float(segment.get('start_time', 0))
-        segment_end = float(segment.get('end_time', 0))
+    def _speaker_segments(self, index: TranscriptIndex, speaker_label: Optional[str]) -> List[int]:
+        if speaker_label is None:
+            return list(range(len(index)))
+        return index.segments_for_speaker(speaker_label)
+    
+    def _detect_declared_tests_rolling(
+        self,
+        index: TranscriptIndex,
+        speaker_label: Optional[str] = None,
+        max_gap: float = ROLLING_MAX_GAP,
+        max_chars: int = ROLLING_MAX_CHARS
+    ) -> List[Dict[str, Any]]:
+        """
+        Detect tests over windows of consecutive same-speaker segments
         
-        words = []
-        for item in items:
-            if item.get('type') == 'pronunciation':
-                item_start = float(item.get('start_time', 0))
-                if segment_start <= item_start <= segment_end:
-                    content = item.get('alternatives', [{}])[0].get('content', '')
-                    words.append(content)
+        Each window is scanned once; a test is timestamped at the first word of
+        its earliest keyword or pattern hit. Windows that share a segment (only
+        when the character budget splits a run) report a hit once.
+        """
+        declared_tests = []
+        seen = set()
         
-        return ' '.join(words)
+        for window in index.speaker_windows(max_gap, max_chars):
+            if speaker_label is not None and index.segment_speakers[window[0]] != speaker_label:
+                continue
+            declared_tests.extend(self._window_tests(index, window, seen))
+        
+        return declared_tests
+    
+    def _window_tests(self, index: TranscriptIndex, window: List[int], seen: set) -> List[Dict[str, Any]]:
+        """Tests declared in one rolling window; `seen` drops hits already reported by an overlapping window"""
+        declared_tests = []
+        labels = self.test_matcher.labels
+        
+        word_ids = index.window_words(window)
+        window_text = ' '.join(index.words[w] for w in word_ids)
+        word_offsets = []
+        position = 0
+        for w in word_ids:
+            word_offsets.append(position)
+            position += len(index.words[w]) + 1
+        
+        for test_index, confidence, offset in self.test_matcher.score_with_offsets(window_text.lower()):
+            if confidence < 0.5:  # Threshold for detection
+                continue
+            first_word = word_ids[max(bisect_right(word_offsets, offset) - 1, 0)]
+            timestamp = index.word_starts[first_word]
+            if (test_index, first_word) in seen:
+                continue
+            seen.add((test_index, first_word))
+            
+            # Excerpt from the start of the segment holding the first hit
+            segment_id = window[0]
+            for i in window:
+                if index.segment_word_lo[i] <= first_word:
+                    segment_id = i
+            excerpt_start = word_offsets[bisect_left(word_ids, index.segment_word_lo[segment_id])]
+            declared_tests.append({
+                'label': labels[test_index],
+                'timestamp': timestamp,
+                'confidence': min(confidence, 1.0),
+                'matched_text': window_text[excerpt_start:excerpt_start + 200],
+                'speaker': index.segment_speakers[window[0]],
+                'transcript_text': window_text
+            })
+        
+        return declared_tests
     
     def _analyze_text_for_tests(self, text: str, timestamp: float) -> List[Dict[str, Any]]:
         """Analyze text segment for test declarations using NLP"""
+        # One automaton pass + one regex pass per category covers the whole taxonomy
+        return self._tests_from_scores(self.test_matcher.score(text.lower()), text, timestamp)
+    
+    def _tests_from_scores(
+        self,
+        scores: List[Tuple[int, float]],
+        text: str,
+        timestamp: float
+    ) -> List[Dict[str, Any]]:
+        """Turn raw TaxonomyMatcher scores for a segment into detected tests"""
         detected = []
-        text_lower = text.lower()
+        labels = self.test_matcher.labels
         
-        # Check each test type in taxonomy
-        for test_label, test_config in self.test_taxonomy.items():
-            confidence = 0.0
-            
-            # Check keyword matches
-            keyword_matches = sum(1 for kw in test_config['keywords'] if kw in text_lower)
-            if keyword_matches > 0:
-                confidence += 0.3 * min(keyword_matches / len(test_config['keywords']), 1.0)
-            
-            # Check pattern matches
-            pattern_matches = 0
-            for pattern in test_config['patterns']:
-                if re.search(pattern, text_lower, re.IGNORECASE):
-                    pattern_matches += 1
-            
-            if pattern_matches > 0:
-                confidence += 0.7
-            
-            # Check for declaration phrases
-            declaration_phrases = [
-                'now we', 'let\'s', 'going to', 'want to', 'need to', 
-                'i\'m going to', 'i\'m checking', 'i need', 'we\'re going to'
-            ]
-            
-            has_declaration = any(phrase in text_lower for phrase in declaration_phrases)
-            if has_declaration and confidence > 0:
-                confidence += 0.2
-            
+        for test_index, confidence in scores:
             # If confidence threshold met, add to detected tests
             if confidence >= 0.5:  # Threshold for detection
                 detected.append({
-                    'label': test_label,
+                    'label': labels[test_index],
                     'timestamp': timestamp,
                     'confidence': min(confidence, 1.0),
                     'matched_text': text[:200]  # First 200 chars
@@ -541,18 +353,186 @@ class CMENLPProcessor:
         
         return detected
     
+    def detect_declared_tests_local_model(
+        self,
+        transcript: Dict[str, Any],
+        speaker_label: Optional[str] = None,
+        classifier: Any = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Test detection with the local intent classifier
+        
+        Every non-empty segment of the speaker is classified in padded
+        minibatches; each taxonomy label scoring at least the classifier's
+        threshold becomes a detected test, in the same form detect_declared_tests
+        returns. Falls back to detect_declared_tests when no classifier loads.
+        """
+        declared_tests = []
+        
+        try:
+            index = TranscriptIndex.from_transcript(transcript)
+            if classifier is None:
+                classifier = get_intent_classifier(
+                    INTENT_MODEL_PATH, num_threads=INTENT_MODEL_THREADS, batch_size=INTENT_BATCH_SIZE,
+                    quantize=INTENT_QUANTIZE, threshold=INTENT_THRESHOLD
+                )
+            if classifier is None:
+                logger.warning("Local intent model unavailable, using taxonomy detection")
+                return self.detect_declared_tests(index, speaker_label)
+            
+            segment_ids = [i for i in self._speaker_segments(index, speaker_label) if index.segment_text(i)]
+            texts = [index.segment_text(i) for i in segment_ids]
+            
+            for i, text, predictions in zip(segment_ids, texts, classifier.predict(texts)):
+                speaker, start_time, end_time = index.segment(i)
+                for label, score in predictions:
+                    if label not in self.test_taxonomy:
+                        continue
+                    declared_tests.append({
+                        'label': label,
+                        'timestamp': start_time,
+                        'confidence': round(score, 4),
+                        'matched_text': text[:200],
+                        'speaker': speaker,
+                        'transcript_text': text,
+                        'source': 'local_model'
+                    })
+            
+            logger.info(f"Local model detected {len(declared_tests)} test declarations in {len(texts)} segments")
+            
+        except Exception as e:
+            logger.error(f"Error in local model test detection: {str(e)}")
+        
+        return declared_tests
+    
+    def detect_declared_tests_cascade(
+        self,
+        transcript: Dict[str, Any],
+        speaker_label: Optional[str] = None,
+        low: float = CASCADE_LOW,
+        high: float = CASCADE_HIGH
+    ) -> List[Dict[str, Any]]:
+        """
+        Test detection with Bedrock as a second stage for ambiguous segments
+        
+        Each segment (each rolling same-speaker window when cross-segment
+        detection is on) is scored locally once. Segments whose best score is >= `high`
+        keep the tests detect_declared_tests would report for them; segments whose best
+        score is below `low` are dropped. Segments with a best score in
+        [low, high) are sent to the model in batches and only its answers for
+        those segments that name a taxonomy test are kept, with at least the
+        detection threshold as confidence. Escalation counts and model latency
+        are left in `self.cascade_metrics`.
+        """
+        declared_tests = []
+        
+        try:
+            index = TranscriptIndex.from_transcript(transcript)
+            ambiguous = []
+            local_best = {}
+            
+            if CROSS_SEGMENT_DETECTION:
+                # Score the same rolling windows detect_declared_tests does, so
+                # declarations split across segments are seen whole; an
+                # ambiguous window escalates all of its segments
+                windows = [
+                    window for window in index.speaker_windows(ROLLING_MAX_GAP, ROLLING_MAX_CHARS)
+                    if speaker_label is None or index.segment_speakers[window[0]] == speaker_label
+                ]
+                segment_ids = sorted({i for window in windows for i in window})
+                seen = set()
+                for window in windows:
+                    window_text = ' '.join(index.words[w] for w in index.window_words(window))
+                    best = max(
+                        (confidence for _, confidence, _ in self.test_matcher.score_with_offsets(window_text.lower())),
+                        default=0.0
+                    )
+                    if best >= high:
+                        declared_tests.extend(self._window_tests(index, window, seen))
+                    elif best >= low:
+                        for i in window:
+                            local_best[i] = max(local_best.get(i, 0.0), best)
+                ambiguous = sorted(local_best)
+            else:
+                segment_ids = self._speaker_segments(index, speaker_label)
+                for i in segment_ids:
+                    speaker, start_time, end_time = index.segment(i)
+                    segment_text = index.segment_text(i)
+                    scores = self.test_matcher.score(segment_text.lower())
+                    best = max((confidence for _, confidence in scores), default=0.0)
+                    
+                    if best >= high:
+                        for test in self._tests_from_scores(scores, segment_text, start_time):
+                            test['speaker'] = speaker
+                            test['transcript_text'] = segment_text
+                            declared_tests.append(test)
+                    elif best >= low:
+                        ambiguous.append(i)
+                        local_best[i] = best
+            
+            # Batches are bounded by prompt size only and never overlap
+            batches = build_transcript_windows(index, float('inf'), 0.0, segment_ids=ambiguous)
+            all_batches = build_transcript_windows(index, float('inf'), 0.0, segment_ids=segment_ids)
+            
+            model_start = time.time()
+            escalated = _detect_in_windows(index, batches, AI_MAX_CONCURRENCY) if batches else []
+            model_seconds = time.time() - model_start
+            
+            for test in escalated:
+                if test['label'] not in self.test_taxonomy:
+                    continue
+                segment_id = test['segment_index']
+                declared_tests.append({
+                    'label': test['label'],
+                    'timestamp': test['timestamp'],
+                    # Confirmed by the model, so at least the detection threshold
+                    'confidence': max(round(local_best[segment_id], 4), 0.5),
+                    'matched_text': index.segment_text(segment_id)[:200],
+                    'speaker': test['speaker'],
+                    'transcript_text': index.segment_text(segment_id),
+                    'source': 'bedrock'
+                })
+            declared_tests.sort(key=lambda test: test['timestamp'])
+            
+            # Sending every segment would take ceil(all/concurrency) rounds of
+            # model calls; estimate that from the measured per-round latency
+            rounds = -(-len(batches) // AI_MAX_CONCURRENCY)
+            all_rounds = -(-len(all_batches) // AI_MAX_CONCURRENCY)
+            per_round = model_seconds / rounds if rounds else 0.0
+            self.cascade_metrics = {
+                'segments': len(segment_ids),
+                'escalated_segments': len(ambiguous),
+                'escalated_fraction': round(len(ambiguous) / len(segment_ids), 4) if segment_ids else 0.0,
+                'model_batches': len(batches),
+                'full_transcript_batches': len(all_batches),
+                'model_seconds': round(model_seconds, 3),
+                'estimated_seconds_saved': round(per_round * (all_rounds - rounds), 3),
+                'model_detected_tests': len(escalated)
+            }
+            
+            logger.info(
+                f"Cascade detection: {len(declared_tests)} tests, {len(ambiguous)}/{len(segment_ids)} "
+                f"segments escalated in {len(batches)} batches"
+            )
+            return declared_tests
+            
+        except Exception as e:
+            logger.error(f"Error in cascade test detection: {str(e)}")
+            return []
+    
     def analyze_examiner_demeanor(
         self, 
         transcript: Dict[str, Any],
-        examiner_speaker_label: str = 'speaker_0'
+        examiner_speaker_label: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         Step 7: Demeanor & Tone Analysis
         Analyze examiner's tone, politeness, and behavior
         
         Args:
-            transcript: AWS Transcribe output
-            examiner_speaker_label: Speaker label for the examiner
+            transcript: AWS Transcribe output, or a prebuilt TranscriptIndex
+            examiner_speaker_label: Speaker label for the examiner; resolved from the
+                transcript when not given
             
         Returns:
             List of demeanor flags with timestamps
@@ -560,51 +540,21 @@ class CMENLPProcessor:
         demeanor_flags = []
         
         try:
-            results = transcript.get('results', {})
-            speaker_labels = results.get('speaker_labels', {})
-            segments = speaker_labels.get('segments', [])
-            items = results.get('items', [])
+            index = TranscriptIndex.from_transcript(transcript)
+            if examiner_speaker_label is None:
+                examiner_speaker_label = self.speaker_role_resolver.resolve(index)['examiner']
             
-            examiner_segments = [s for s in segments if s.get('speaker_label') == examiner_speaker_label]
+            examiner_segments = index.segments_for_speaker(examiner_speaker_label)
             
             # Track consecutive examiner utterances (interruptions)
-            consecutive_count = 0
-            last_speaker = None
-            
-            for i, segment in enumerate(segments):
-                speaker = segment.get('speaker_label')
-                start_time = float(segment.get('start_time', 0))
-                segment_text = self._get_segment_text(segment, items)
-                
-                # Count consecutive examiner utterances (interruptions)
-                if speaker == examiner_speaker_label:
-                    if last_speaker == examiner_speaker_label:
-                        consecutive_count += 1
-                        if consecutive_count >= 2:  # 3+ consecutive utterances
-                            demeanor_flags.append({
-                                'flag_type': 'interruption',
-                                'timestamp': start_time,
-                                'transcript_excerpt': segment_text[:200],
-                                'severity': 'medium',
-                                'description': f'Examiner spoke {consecutive_count + 1} times consecutively'
-                            })
-                    else:
-                        consecutive_count = 0
-                    
-                    # Analyze tone and sentiment
-                    flags = self._analyze_tone(segment_text, start_time)
-                    demeanor_flags.extend(flags)
-                
-                last_speaker = speaker
+            state = {'consecutive_count': 0, 'last_speaker': None}
             
-            # Use AWS Comprehend for sentiment analysis on examiner segments
-            examiner_text = ' '.join([
-                self._get_segment_text(s, items) for s in examiner_segments[:10]  # First 10 segments
-            ])
+            for i in range(len(index)):
+                demeanor_flags.extend(self._segment_demeanor_flags(index, i, examiner_speaker_label, state))
             
-            if examiner_text:
-                sentiment_flags = self._analyze_sentiment_comprehend(examiner_text, examiner_segments)
-                demeanor_flags.extend(sentiment_flags)
+            # Use AWS Comprehend for sentiment analysis on every examiner segment
+            self.sentiment_timeline = self.sentiment_pipeline.timeline(index, examiner_segments)
+            demeanor_flags.extend(self._sentiment_flags(self.sentiment_timeline))
             
             logger.info(f"Detected {len(demeanor_flags)} demeanor flags")
             return demeanor_flags
@@ -613,172 +563,383 @@ class CMENLPProcessor:
             logger.error(f"Error analyzing demeanor: {str(e)}")
             return []
     
-    def _analyze_tone(self, text: str, timestamp: float) -> List[Dict[str, Any]]:
-        """Analyze text for negative tone indicators"""
-        flags = []
-        text_lower = text.lower()
-        
-        # Check for negative tone indicators
-        for indicator in NEGATIVE_TONE_INDICATORS:
-            if indicator in text_lower:
-                flags.append({
-                    'flag_type': 'negative_tone',
-                    'timestamp': timestamp,
-                    'transcript_excerpt': text[:200],
-                    'severity': 'high',
-                    'description': f'Negative language detected: "{indicator}"'
-                })
-        
-        # Check for dismissive patterns
-        for pattern in DISMISSIVE_PATTERNS:
-            if re.search(pattern, text_lower):
-                flags.append({
-                    'flag_type': 'dismissive',
-                    'timestamp': timestamp,
-                    'transcript_excerpt': text[:200],
-                    'severity': 'medium',
-                    'description': 'Dismissive language detected'
-                })
+    def _segment_demeanor_flags(
+        self,
+        index: TranscriptIndex,
+        i: int,
+        examiner_speaker_label: str,
+        state: Dict[str, Any],
+        tone: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Interruption and (unless tone=False) tone flags for segment i; `state` carries the run of examiner turns"""
+        demeanor_flags = []
+        speaker, start_time, _ = index.segment(i)
         
-        # Check for aggressive patterns
-        for pattern in INTERRUPTION_PATTERNS:
-            if re.search(pattern, text_lower):
-                flags.append({
-                    'flag_type': 'aggressive',
-                    'timestamp': timestamp,
-                    'transcript_excerpt': text[:200],
-                    'severity': 'high',
-                    'description': 'Aggressive or controlling language detected'
-                })
+        # Count consecutive examiner utterances (interruptions)
+        if speaker == examiner_speaker_label:
+            segment_text = index.segment_text(i)
+            if state['last_speaker'] == examiner_speaker_label:
+                state['consecutive_count'] += 1
+                if state['consecutive_count'] >= 2:  # 3+ consecutive utterances
+                    demeanor_flags.append({
+                        'flag_type': 'interruption',
+                        'timestamp': start_time,
+                        'transcript_excerpt': segment_text[:200],
+                        'severity': 'medium',
+                        'description': f"Examiner spoke {state['consecutive_count'] + 1} times consecutively"
+                    })
+            else:
+                state['consecutive_count'] = 0
+            
+            # Analyze tone and sentiment
+            if tone:
+                demeanor_flags.extend(self._analyze_tone(segment_text, start_time))
         
-        return flags
+        state['last_speaker'] = speaker
+        return demeanor_flags
     
-    def _analyze_sentiment_comprehend(
-        self, 
-        text: str, 
-        segments: List[Dict[str, Any]]
-    ) -> List[Dict[str, Any]]:
-        """Use AWS Comprehend for sentiment analysis"""
+    def _analyze_tone(self, text: str, timestamp: float) -> List[Dict[str, Any]]:
+        """Analyze text for negative tone, dismissive and aggressive language in one pass"""
+        return self.demeanor_lexicon.flags(text, timestamp)
+    
+    def _sentiment_flags(self, timeline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Flag examiner segments Comprehend scored as clearly negative"""
         flags = []
         
-        try:
-            # AWS Comprehend has a 5000 byte limit
-            text_sample = text[:5000]
-            
-            response = comprehend_client.detect_sentiment(
-                Text=text_sample,
-                LanguageCode='en'
-            )
-            
-            sentiment = response.get('Sentiment')
-            sentiment_score = response.get('SentimentScore', {})
-            
-            # Flag negative sentiment
-            if sentiment == 'NEGATIVE' and sentiment_score.get('Negative', 0) > 0.6:
+        for entry in timeline:
+            negative = entry['scores'].get('Negative', 0)
+            if entry['sentiment'] == 'NEGATIVE' and negative > 0.6:
                 flags.append({
                     'flag_type': 'negative_sentiment',
-                    'timestamp': float(segments[0].get('start_time', 0)) if segments else 0,
-                    'transcript_excerpt': text_sample[:200],
+                    'timestamp': entry['timestamp'],
+                    'transcript_excerpt': entry['text'][:200],
                     'severity': 'medium',
-                    'description': f'Overall negative sentiment detected (score: {sentiment_score.get("Negative"):.2f})',
-                    'sentiment_scores': sentiment_score
+                    'description': f'Negative sentiment detected (score: {negative:.2f})',
+                    'sentiment_scores': entry['scores']
                 })
-            
-        except Exception as e:
-            logger.error(f"Error in Comprehend sentiment analysis: {str(e)}")
         
         return flags
     
-    def extract_medical_entities(self, text: str) -> List[Dict[str, Any]]:
-        """Extract medical entities using AWS Comprehend Medical"""
-        entities = []
+    def extract_medical_entities(self, text: Any) -> List[Dict[str, Any]]:
+        """
+        Extract medical entities using AWS Comprehend Medical
+        
+        The transcript (TranscriptIndex or raw text) is split on segment
+        boundaries into limit-sized chunks that are sent through a bounded
+        thread pool. Responses are cached by chunk hash, and entity offsets are
+        rebased onto the full transcript text; with an index each entity also
+        carries the timestamp of the word it starts in.
+        """
+        index = text if isinstance(text, TranscriptIndex) else None
+        if index is None:
+            words = text.split(' ') if text else []
+            index = TranscriptIndex([0.0] * len(words), [0.0] * len(words), words, [], [], [])
+        
+        chunks = index.segment_aligned_chunks(MEDICAL_ENTITY_CHUNK_CHARS)
+        if not chunks:
+            return []
+        
+        def detect(chunk):
+            lo, hi = chunk
+            return self._detect_entities_cached(index.word_range_text(lo, hi))
         
+        entities = []
         try:
-            response = comprehend_client.detect_entities_v2(
-                Text=text[:20000]  # Comprehend Medical limit
-            )
-            
-            for entity in response.get('Entities', []):
-                entities.append({
-                    'text': entity.get('Text'),
-                    'category': entity.get('Category'),
-                    'type': entity.get('Type'),
-                    'score': entity.get('Score'),
-                    'begin_offset': entity.get('BeginOffset'),
-                    'end_offset': entity.get('EndOffset')
-                })
+            with ThreadPoolExecutor(max_workers=min(MEDICAL_ENTITY_WORKERS, len(chunks))) as executor:
+                for (lo, _), chunk_entities in zip(chunks, executor.map(detect, chunks)):
+                    base = index.word_offsets[lo]
+                    for entity in chunk_entities:
+                        entry = dict(entity)
+                        if entry.get('begin_offset') is not None:
+                            entry['begin_offset'] += base
+                            entry['end_offset'] += base
+                            if isinstance(text, TranscriptIndex):
+                                entry['timestamp'] = index.time_at_offset(entry['begin_offset'])
+                        entities.append(entry)
             
+            logger.info(f"Extracted {len(entities)} medical entities from {len(chunks)} chunks")
             return entities
             
         except Exception as e:
             logger.error(f"Error extracting medical entities: {str(e)}")
             return []
+    
+    def _detect_entities_cached(self, chunk_text: str) -> List[Dict[str, Any]]:
+        """DetectEntitiesV2 for one chunk, memoized by content hash"""
+        key = content_key('comprehendmedical.detect_entities_v2', chunk_text)
+        cached = ENTITY_CACHE.get(key)
+        if cached is not None:
+            return cached
+        
+        response = comprehend_medical_client.detect_entities_v2(Text=chunk_text)
+        entities = [{
+            'text': entity.get('Text'),
+            'category': entity.get('Category'),
+            'type': entity.get('Type'),
+            'score': entity.get('Score'),
+            'begin_offset': entity.get('BeginOffset'),
+            'end_offset': entity.get('EndOffset')
+        } for entity in response.get('Entities', [])]
+        
+        ENTITY_CACHE.put(key, entities)
+        return entities
+
+
+# Set in the parent just before workers fork, so shards inherit the index
+# and compiled matchers instead of pickling them
+_SHARD_CONTEXT: Dict[str, Any] = {}
+
+
+def _analyze_shard(shard: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Dict[int, List[Dict[str, Any]]]]:
+    """Worker: declared tests for the shard's scan units and tone flags for its segments"""
+    processor = _SHARD_CONTEXT['processor']
+    index = _SHARD_CONTEXT['index']
+    tests = []
+    seen = set()
+    for unit in shard['units']:
+        if CROSS_SEGMENT_DETECTION:
+            tests.extend(processor._window_tests(index, unit, seen))
+        else:
+            segment_text = index.segment_text(unit[0])
+            for test in processor._analyze_text_for_tests(segment_text, index.segment_starts[unit[0]]):
+                test['speaker'] = index.segment_speakers[unit[0]]
+                test['transcript_text'] = segment_text
+                tests.append(test)
+    flags = {}
+    for i in shard['segments']:
+        segment_flags = processor._analyze_tone(index.segment_text(i), index.segment_starts[i])
+        if segment_flags:
+            flags[i] = segment_flags
+    return tests, flags
+
+
+def _pipe_worker(shard: Dict[str, Any], connection: Any) -> None:
+    try:
+        connection.send(_analyze_shard(shard))
+    finally:
+        connection.close()
+
+
+def _run_shards(shards: List[Dict[str, Any]], workers: int) -> List[Any]:
+    """Run shards in forked processes, in order; in-process when one worker suffices"""
+    if workers <= 1 or len(shards) <= 1:
+        return [_analyze_shard(shard) for shard in shards]
+    
+    context = multiprocessing.get_context('fork')
+    try:
+        with ProcessPoolExecutor(max_workers=min(workers, len(shards)), mp_context=context) as pool:
+            return list(pool.map(_analyze_shard, shards))
+    except OSError as e:
+        # Lambda has no /dev/shm, which the pool's queues and locks need;
+        # one process per shard with a pipe back needs neither
+        logger.warning(f"Process pool unavailable ({str(e)}), using one process per shard")
+    
+    pipes = []
+    for shard in shards:
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(target=_pipe_worker, args=(shard, sender))
+        process.start()
+        sender.close()
+        pipes.append((process, receiver))
+    results = []
+    for process, receiver in pipes:
+        results.append(receiver.recv())
+        process.join()
+    return results
+
+
+class IncrementalAnalysis:
+    """
+    Test detection and demeanor analysis over a transcript that grows over time
+    
+    Fragments (Transcribe-shaped dicts holding the next items and speaker
+    segments, in time order) are appended to one TranscriptIndex. Each `add`
+    analyzes only segments whose words are final and returns the declared
+    tests and flags found since the previous call; `finish` flushes the rest.
+    Rolling-window, interruption and sentiment state carries across calls, so
+    the concatenated output equals one batch run over the whole transcript.
+    The examiner label must be known up front (session setup or event), since
+    resolving it needs the whole transcript.
+    """
+    
+    def __init__(self, processor: CMENLPProcessor, examiner_speaker_label: str):
+        self.processor = processor
+        self.examiner_speaker_label = examiner_speaker_label
+        self.index = TranscriptIndex([], [], [], [], [], [])
+        self.declared_tests: List[Dict[str, Any]] = []
+        self.demeanor_flags: List[Dict[str, Any]] = []
+        self.sentiment_flags: List[Dict[str, Any]] = []
+        self.sentiment_timeline: List[Dict[str, Any]] = []
+        self._next_window = 0
+        self._next_segment = 0
+        self._seen_tests = set()
+        self._demeanor_state = {'consecutive_count': 0, 'last_speaker': None}
+    
+    def add(self, fragment: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+        """Append a transcript fragment and return newly final tests and flags"""
+        piece = TranscriptIndex.from_transcript(fragment)
+        self.index.append(
+            piece.word_starts, piece.word_ends, piece.words,
+            piece.segment_speakers, piece.segment_starts, piece.segment_ends
+        )
+        return self._advance(self.index.stable_segments)
+    
+    def finish(self) -> Dict[str, List[Dict[str, Any]]]:
+        """No more fragments: analyze every remaining segment"""
+        return self._advance(None)
+    
+    def results(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Everything found so far, ordered as the batch analyses return it"""
+        return {
+            'declared_tests': list(self.declared_tests),
+            'demeanor_flags': self.demeanor_flags + self.sentiment_flags
+        }
+    
+    def _advance(self, available: Optional[int]) -> Dict[str, List[Dict[str, Any]]]:
+        index = self.index
+        examiner = self.examiner_speaker_label
+        limit = len(index) if available is None else available
+        new_tests = []
+        
+        # Declared tests: rolling windows (or single segments) that can no longer grow
+        if CROSS_SEGMENT_DETECTION:
+            while self._next_window < limit:
+                next_window = index.next_speaker_window(
+                    self._next_window, ROLLING_MAX_GAP, ROLLING_MAX_CHARS, available
+                )
+                if next_window is None:
+                    break
+                window, self._next_window = next_window
+                if index.segment_speakers[window[0]] == examiner:
+                    new_tests.extend(self.processor._window_tests(index, window, self._seen_tests))
+        else:
+            for i in range(self._next_segment, limit):
+                if index.segment_speakers[i] == examiner:
+                    segment_text = index.segment_text(i)
+                    for test in self.processor._analyze_text_for_tests(segment_text, index.segment_starts[i]):
+                        test['speaker'] = examiner
+                        test['transcript_text'] = segment_text
+                        new_tests.append(test)
+        
+        # Demeanor: per-segment flags, then sentiment for the new examiner segments
+        new_flags = []
+        examiner_segments = []
+        for i in range(self._next_segment, limit):
+            new_flags.extend(self.processor._segment_demeanor_flags(index, i, examiner, self._demeanor_state))
+            if index.segment_speakers[i] == examiner:
+                examiner_segments.append(i)
+        self._next_segment = limit
+        
+        timeline = self.processor.sentiment_pipeline.timeline(index, examiner_segments) if examiner_segments else []
+        sentiment_flags = self.processor._sentiment_flags(timeline)
+        self.sentiment_timeline.extend(timeline)
+        
+        self.declared_tests.extend(new_tests)
+        self.demeanor_flags.extend(new_flags)
+        self.sentiment_flags.extend(sentiment_flags)
+        return {'declared_tests': new_tests, 'demeanor_flags': new_flags + sentiment_flags}
+
+
+def nlp_result_key(
+    session_id: str,
+    transcript_index: TranscriptIndex,
+    examiner_speaker_label: Optional[str] = None
+) -> str:
+    """Cache key for a session's NLP result: transcript content plus every input that shapes the output"""
+    return content_key(
+        'cme-nlp-result/1',
+        session_id,
+        transcript_index.content_hash(),
+        TAXONOMY_VERSION,
+        DEMEANOR_LEXICON.fingerprint,
+        f'cascade={AI_CASCADE}:{CASCADE_LOW}:{CASCADE_HIGH}',
+        f'rolling={CROSS_SEGMENT_DETECTION}:{ROLLING_MAX_GAP}:{ROLLING_MAX_CHARS}',
+        f'medical_entities={EXTRACT_MEDICAL_ENTITIES}',
+        f'intent_backend={INTENT_BACKEND}:{INTENT_MODEL_PATH}:{INTENT_THRESHOLD}',
+        f'episodes={EPISODE_TOLERANCE_SECONDS}:{EPISODE_MAX_SECONDS}',
+        f'examiner={examiner_speaker_label or "auto"}'
+    )
 
 
 def process_transcript_for_cme_analysis(
     session_id: str,
-    transcript_data: Dict[str, Any]
+    transcript_data: Dict[str, Any],
+    examiner_speaker_label: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Main processing function for CME transcript analysis
     Combines test intent detection and demeanor analysis
     **NOW WITH DYNAMODB PERSISTENCE**
     """
-    import os
-    import boto3
-    
-    dynamodb = boto3.resource('dynamodb')
+    dynamodb = get_resource('dynamodb')
     steps_table = dynamodb.Table(os.environ.get('CME_STEPS_TABLE', 'cme-declared-steps'))
     demeanor_table = dynamodb.Table(os.environ.get('CME_DEMEANOR_TABLE', 'cme-demeanor-flags'))
     sessions_table = dynamodb.Table(os.environ.get('CME_SESSIONS_TABLE', 'cme-sessions'))
     
     processor = CMENLPProcessor()
     
+    # Index the transcript once; both analyses share the same word store
+    transcript_index = TranscriptIndex.from_transcript(transcript_data)
+    
+    # A stored result means this exact analysis already ran and was persisted
+    result_key = ''
+    if RESULT_CACHE_ENABLED:
+        result_key = nlp_result_key(session_id, transcript_index, examiner_speaker_label)
+        cached_result = RESULT_CACHE.get(result_key)
+        if cached_result is not None:
+            logger.info(f"NLP result cache hit for session {session_id}, skipping analysis and persistence")
+            return {**cached_result, 'result_cache_hit': True, 'processing_timestamp': int(time.time())}
+    
+    # Work out which diarization label is the examiner once; both analyses use it
+    speaker_roles = {'examiner': examiner_speaker_label, 'confidence': 1.0, 'speakers': {}}
+    if examiner_speaker_label is None:
+        speaker_roles = processor.resolve_examiner(transcript_index)
+    examiner = speaker_roles['examiner']
+    
+    # Very long exams: detection and tone analysis across worker processes
+    local_model = INTENT_BACKEND == 'local_model'
+    sharded = (not AI_CASCADE and not local_model and examiner is not None and NLP_WORKERS > 1 and len(transcript_index)
+               and transcript_index.segment_ends[-1] >= SHARD_MIN_SECONDS)
+    
     # Step 4: Detect declared tests
-    declared_tests = processor.detect_declared_tests(transcript_data)
+    if sharded:
+        declared_tests, demeanor_flags = processor.analyze_sharded(transcript_index, examiner)
+    elif local_model:
+        declared_tests = processor.detect_declared_tests_local_model(transcript_index, examiner)
+    elif AI_CASCADE:
+        declared_tests = processor.detect_declared_tests_cascade(transcript_index, examiner)
+    else:
+        declared_tests = processor.detect_declared_tests(transcript_index, examiner)
     
     # *** PERSIST DECLARED TESTS TO DYNAMODB ***
-    persisted_step_ids = []
-    for test in declared_tests:
-        step_id = f"step_{int(time.time())}_{len(persisted_step_ids)}"
-        
-        step_item = {
-            'declared_step_id': step_id,
-            'session_id': session_id,
-            'timestamp': test.get('timestamp', 0),
-            'label': test.get('label', 'unknown'),
-            'transcript_text': test.get('matched_text', ''),
-            'confidence': test.get('confidence', 0.0),
-            'video_snippet_uri': '',
-            'created_at': int(time.time())
-        }
-        
-        steps_table.put_item(Item=step_item)
-        persisted_step_ids.append(step_id)
-        logger.info(f"Persisted declared step: {step_id} - {test.get('label')}")
+    persisted_step_ids = persist_declared_steps(steps_table, session_id, declared_tests)
     
     # Step 7: Analyze demeanor
-    demeanor_flags = processor.analyze_examiner_demeanor(transcript_data)
+    if not sharded:
+        demeanor_flags = processor.analyze_examiner_demeanor(transcript_index, examiner)
     
     # *** PERSIST DEMEANOR FLAGS TO DYNAMODB ***
-    persisted_flag_ids = []
-    for flag in demeanor_flags:
-        flag_id = f"flag_{int(time.time())}_{len(persisted_flag_ids)}"
-        
-        flag_item = {
-            'flag_id': flag_id,
-            'session_id': session_id,
-            'timestamp': flag.get('timestamp', 0),
-            'flag_type': flag.get('flag_type', 'unknown'),
-            'transcript_excerpt': flag.get('transcript_excerpt', ''),
-            'severity': flag.get('severity', 'low'),
-            'description': flag.get('description', ''),
-            'created_at': int(time.time())
-        }
-        
-        demeanor_table.put_item(Item=flag_item)
-        persisted_flag_ids.append(flag_id)
-        logger.info(f"Persisted demeanor flag: {flag_id} - {flag.get('flag_type')}")
+    persisted_flag_ids = persist_demeanor_flags(demeanor_table, session_id, demeanor_flags)
+    
+    # One video job per test episode; every declaration stays persisted above
+    test_episodes = consolidate_declared_tests(declared_tests, EPISODE_TOLERANCE_SECONDS, EPISODE_MAX_SECONDS)
+    test_episode_metrics = episode_metrics(declared_tests, test_episodes)
+    
+    # Medical entities over the full transcript; the list goes to S3 since it
+    # can outgrow the Step Functions payload limit
+    medical_entities = []
+    medical_entities_key = ''
+    if EXTRACT_MEDICAL_ENTITIES:
+        medical_entities = processor.extract_medical_entities(transcript_index)
+        s3_bucket = os.environ.get('S3_BUCKET')
+        if s3_bucket and medical_entities:
+            medical_entities_key = f"cme-transcripts/{session_id}/medical_entities.json"
+            get_client('s3').put_object(
+                Bucket=s3_bucket,
+                Key=medical_entities_key,
+                Body=json.dumps(medical_entities).encode('utf-8'),
+                ContentType='application/json'
+            )
     
     # Update session status
     sessions_table.update_item(
@@ -790,17 +951,81 @@ def process_transcript_for_cme_analysis(
         }
     )
     
-    logger.info(f"NLP Analysis complete: {len(declared_tests)} tests, {len(demeanor_flags)} flags")
+    sentiment_summary = {}
+    for entry in processor.sentiment_timeline:
+        sentiment_summary[entry['sentiment']] = sentiment_summary.get(entry['sentiment'], 0) + 1
     
-    return {
+    logger.info(
+        f"NLP Analysis complete: {len(declared_tests)} tests in {len(test_episodes)} episodes "
+        f"({test_episode_metrics['video_jobs_avoided']} video jobs avoided), {len(demeanor_flags)} flags"
+    )
+    
+    result = {
         'session_id': session_id,
-        'declared_tests': declared_tests,  # Return for Step Function to map over
+        # Window transcript text is persisted as matched_text already and would
+        # only bloat the Step Functions state
+        'declared_tests': [
+            {field: value for field, value in test.items() if field != 'transcript_text'} for test in declared_tests
+        ],
+        'test_episodes': [episode_payload(episode) for episode in test_episodes],  # Return for Step Function to map over
+        'episode_metrics': test_episode_metrics,
         'demeanor_flags': demeanor_flags,
         'persisted_step_ids': persisted_step_ids,
         'persisted_flag_ids': persisted_flag_ids,
+        'sentiment_summary': sentiment_summary,
+        'medical_entity_count': len(medical_entities),
+        'medical_entities_key': medical_entities_key,
+        'cascade_metrics': processor.cascade_metrics,
+        'speaker_roles': speaker_roles,
         'processing_timestamp': int(time.time()),
         'status': 'completed'
     }
+    
+    # Stored only after every write above has succeeded
+    if result_key:
+        RESULT_CACHE.put(result_key, result)
+    
+    return {**result, 'result_cache_hit': False}
+
+
+def _invoke_bedrock(prompt: str, max_tokens: int = 1500) -> str:
+    """Invoke the Bedrock model, memoizing the response text by prompt hash"""
+    key = content_key(BEDROCK_MODEL_ID, str(max_tokens), prompt)
+    cached = BEDROCK_CACHE.get(key)
+    if cached is not None:
+        return cached
+    
+    response = bedrock_client.invoke_model(
+        modelId=BEDROCK_MODEL_ID,
+        body=json.dumps({
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": max_tokens,
+            "messages": [{
+                "role": "user",
+                "content": prompt
+            }]
+        })
+    )
+    
+    response_body = json.loads(response['body'].read())
+    text = response_body.get('content', [{}])[0].get('text', '[]')
+    BEDROCK_CACHE.put(key, text)
+    return text
+
+
+def _parse_json_array(text: str) -> List[Any]:
+    """Pull the JSON array out of a model reply, tolerating surrounding prose"""
+    start, end = text.find('['), text.rfind(']')
+    if start < 0 or end < start:
+        return []
+    parsed = json.loads(text[start:end + 1])
+    return parsed if isinstance(parsed, list) else []
+
+
+def _taxonomy_label(test_type: Any) -> Optional[str]:
+    """The TEST_TAXONOMY key a model answered with, or None for labels outside the taxonomy"""
+    label = str(test_type).strip().lower().replace(' ', '_').replace('-', '_')
+    return label if label in TEST_TAXONOMY else None
 
 
 def enhanced_test_detection_with_ai(transcript_text: str) -> List[Dict[str, Any]]:
@@ -816,30 +1041,22 @@ Transcript:
 {transcript_text[:4000]}
 
 For each declared test, return JSON with:
-- test_type: The type of medical test (e.g., "lumbar_rom", "straight_leg_raise", "gait", "reflex")
+- test_type: The type of medical test, exactly one of: {', '.join(TEST_TAXONOMY)}
 - declaration: The exact words the examiner used
 - approximate_time: An estimate of when this occurred in the conversation (e.g., "early", "middle", "late")
 
+Skip declarations that match none of the listed test types.
 Return ONLY a JSON array of test declarations, no additional text:
 [{{"test_type": "...", "declaration": "...", "approximate_time": "..."}}]"""
 
-        response = bedrock_client.invoke_model(
-            modelId="anthropic.claude-3-sonnet-20240229-v1:0",
-            body=json.dumps({
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 1500,
-                "messages": [{
-                    "role": "user",
-                    "content": prompt
-                }]
-            })
-        )
-        
-        response_body = json.loads(response['body'].read())
-        ai_result = response_body.get('content', [{}])[0].get('text', '[]')
+        ai_result = _invoke_bedrock(prompt)
         
-        # Parse AI response
-        tests = json.loads(ai_result)
+        # Parse AI response, keeping only answers that name a taxonomy test
+        tests = []
+        for test in json.loads(ai_result):
+            label = _taxonomy_label(test.get('test_type', '')) if isinstance(test, dict) else None
+            if label:
+                tests.append({**test, 'test_type': label})
         return tests
         
     except Exception as e:
@@ -847,6 +1064,142 @@ Return ONLY a JSON array of test declarations, no additional text:
         return []
 
 
+def build_transcript_windows(
+    index: TranscriptIndex,
+    window_seconds: float = AI_WINDOW_SECONDS,
+    overlap_seconds: float = AI_WINDOW_OVERLAP_SECONDS,
+    max_chars: int = AI_WINDOW_MAX_CHARS,
+    segment_ids: Optional[List[int]] = None
+) -> List[List[int]]:
+    """
+    Group segments into overlapping windows bounded by duration and prompt size
+    
+    Each window starts at the first segment beginning `overlap_seconds` before
+    the previous window's end, so a declaration near a boundary is seen whole
+    by at least one window. Always advances by at least one segment.
+    """
+    ids = list(range(len(index))) if segment_ids is None else list(segment_ids)
+    windows = []
+    first = 0
+    while first < len(ids):
+        window_start = index.segment_starts[ids[first]]
+        last, chars = first, 0
+        while last < len(ids):
+            segment_chars = len(index.segment_text(ids[last])) + 1
+            if last > first and (index.segment_starts[ids[last]] - window_start >= window_seconds
+                                 or chars + segment_chars > max_chars):
+                break
+            chars += segment_chars
+            last += 1
+        windows.append(ids[first:last])
+        if last >= len(ids):
+            break
+        overlap_from = index.segment_ends[ids[last - 1]] - overlap_seconds
+        next_first = first + 1
+        while next_first < last and index.segment_starts[ids[next_first]] < overlap_from:
+            next_first += 1
+        first = next_first
+    return windows
+
+
+def _window_prompt(index: TranscriptIndex, window: List[int]) -> str:
+    lines = '\n'.join(
+        f"[S{i} @ {index.segment_starts[i]:.1f}s] {index.segment_speakers[i]}: {index.segment_text(i)}"
+        for i in window
+    )
+    return f"""You are analyzing part of a transcript of a Compulsory Medical Examination (CME).
+Extract all instances where the examiner declares they are performing a specific medical test or examination.
+Each line starts with a segment id and its start time.
+
+Transcript excerpt:
+{lines}
+
+For each declared test, return JSON with:
+- test_type: The type of medical test, exactly one of: {', '.join(TEST_TAXONOMY)}
+- declaration: The exact words the examiner used
+- segment_id: The S-number of the line containing the declaration, as an integer
+
+Skip declarations that match none of the listed test types.
+Return ONLY a JSON array of test declarations, no additional text:
+[{{"test_type": "...", "declaration": "...", "segment_id": 0}}]"""
+
+
+def _resolve_declaration_segment(index: TranscriptIndex, window: List[int], declaration: Dict[str, Any]) -> Optional[int]:
+    """Map a model answer to a real segment in its window"""
+    try:
+        segment_id = int(str(declaration.get('segment_id', '')).lstrip('Ss'))
+        if segment_id in window:
+            return segment_id
+    except ValueError:
+        pass
+    # Fall back to locating the quoted declaration text
+    quoted = str(declaration.get('declaration', '')).lower().strip()
+    if quoted:
+        for i in window:
+            if quoted in index.segment_text(i).lower():
+                return i
+    return None
+
+
+def windowed_test_detection_with_ai(
+    transcript: Any,
+    window_seconds: float = AI_WINDOW_SECONDS,
+    overlap_seconds: float = AI_WINDOW_OVERLAP_SECONDS,
+    max_concurrency: int = AI_MAX_CONCURRENCY,
+    segment_ids: Optional[List[int]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Bedrock test detection over the whole transcript
+    
+    Splits the transcript into overlapping windows, sends them concurrently
+    (at most `max_concurrency` in flight), keys every answer to a real segment
+    timestamp and de-duplicates answers repeated across window overlaps.
+    Responses are cached by prompt hash, so re-running an unchanged transcript
+    makes no model calls.
+    """
+    index = TranscriptIndex.from_transcript(transcript)
+    windows = build_transcript_windows(index, window_seconds, overlap_seconds, segment_ids=segment_ids)
+    if not windows:
+        return []
+    
+    detected = _detect_in_windows(index, windows, max_concurrency)
+    logger.info(f"Windowed AI detection: {len(detected)} tests from {len(windows)} windows")
+    return detected
+
+
+def _detect_in_windows(index: TranscriptIndex, windows: List[List[int]], max_concurrency: int) -> List[Dict[str, Any]]:
+    """Run the window prompts concurrently and merge answers keyed by segment"""
+    def detect(window):
+        try:
+            return _parse_json_array(_invoke_bedrock(_window_prompt(index, window)))
+        except Exception as e:
+            logger.error(f"Error in windowed AI test detection: {str(e)}")
+            return []
+    
+    merged = {}
+    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(windows))) as executor:
+        for window, declarations in zip(windows, executor.map(detect, windows)):
+            for declaration in declarations:
+                if not isinstance(declaration, dict) or not declaration.get('test_type'):
+                    continue
+                label = _taxonomy_label(declaration['test_type'])
+                segment_id = _resolve_declaration_segment(index, window, declaration)
+                if label is None or segment_id is None:
+                    continue
+                key = (label, segment_id)
+                if key not in merged:
+                    merged[key] = {
+                        'label': key[0],
+                        'timestamp': index.segment_starts[segment_id],
+                        'segment_index': segment_id,
+                        'speaker': index.segment_speakers[segment_id],
+                        'declaration': declaration.get('declaration', ''),
+                        'source': 'bedrock'
+                    }
+    
+    return sorted(merged.values(), key=lambda test: (test['timestamp'], test['label']))
+
+
 def handler(event, context):
     """
     Lambda handler for Step Functions invocation
@@ -857,13 +1210,18 @@ def handler(event, context):
         session_id = event['session_id']
         transcript_data = event.get('transcript_data')
         
+        # Prefer the columnar copy written by the waiter: mapped from /tmp, no parsing
+        columnar_key = event.get('columnar_transcript_key')
+        s3_bucket = os.environ.get('S3_BUCKET')
+        if not transcript_data and columnar_key and s3_bucket:
+            transcript_data = ColumnarTranscriptStore(get_client('s3'), s3_bucket).get(columnar_key)
+        
         # If transcript_data not provided, fetch from S3
         if not transcript_data:
             transcript_uri = event.get('transcript_uri')
             if transcript_uri:
                 # Download transcript from S3
-                import boto3
-                s3_client = boto3.client('s3')
+                s3_client = get_client('s3')
                 
                 if transcript_uri.startswith('s3://'):
                     uri_parts = transcript_uri.replace('s3://', '').split('/', 1)
@@ -871,11 +1229,16 @@ def handler(event, context):
                     key = uri_parts[1]
                     
                     response = s3_client.get_object(Bucket=bucket, Key=key)
-                    transcript_json = response['Body'].read().decode('utf-8')
-                    transcript_data = json.loads(transcript_json)
+                    if STREAM_TRANSCRIPTS:
+                        transcript_data = parse_transcript_stream(response['Body'])
+                    else:
+                        transcript_json = response['Body'].read().decode('utf-8')
+                        transcript_data = json.loads(transcript_json)
         
         # Process transcript
-        result = process_transcript_for_cme_analysis(session_id, transcript_data)
+        result = process_transcript_for_cme_analysis(
+            session_id, transcript_data, event.get('examiner_speaker_label')
+        )
         
         return {
             'statusCode': 200,
@@ -4,19 +4,20 @@ Implements Step 8 from the technical documentation
 """
 
 import json
-import boto3
 import logging
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from decimal import Decimal
 import base64
 
+from aws_clients import lazy_client, lazy_resource
+
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 # Initialize AWS clients
-s3_client = boto3.client('s3')
-dynamodb = boto3.resource('dynamodb')
+s3_client = lazy_client('s3')
+dynamodb = lazy_resource('dynamodb')
 
 # HTML Template for CME Report
 HTML_REPORT_TEMPLATE = """<!DOCTYPE html>
@@ -318,12 +319,12 @@ class CMEReportGenerator:
             actions_response = actions_table.scan()
             all_actions = actions_response.get('Items', [])
             
-            # Map actions to steps
+            # Map actions to steps; one action covers every declaration in its test episode
             step_actions = {}
             for action in all_actions:
-                step_id = action.get('declared_step_id')
-                if step_id:
-                    step_actions[step_id] = action
+                for step_id in action.get('declared_step_ids') or [action.get('declared_step_id')]:
+                    if step_id:
+                        step_actions[step_id] = action
             
             # Get demeanor flags
             demeanor_table = dynamodb.Table(os.environ.get('CME_DEMEANOR_TABLE', 'cme-demeanor-flags'))
@@ -4,246 +4,43 @@ Implements Steps 5 & 6 from the technical documentation
 """
 
 import json
-import boto3
 import logging
 from typing import Dict, Any, List, Optional, Tuple
 import subprocess
 import os
 import tempfile
+import time
 from decimal import Decimal
 
+from aws_clients import get_resource, lazy_client
+from dynamo_persistence import batch_put, deterministic_id
+from ranged_mp4 import open_reader
+from test_taxonomy import TEST_MOTION_EXPECTATIONS
+from video_segmenter import (
+    FFMPEG_TIMEOUT_SECONDS, RANGED_READS, SEGMENT_MODE, SNAP_TOLERANCE_SECONDS,
+    build_copy_command, find_ffmpeg, probe_keyframes, snap_to_keyframe
+)
+
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 # Initialize AWS clients
-s3_client = boto3.client('s3')
-rekognition_client = boto3.client('rekognition')
-
-# Expected motion patterns for different test types - Comprehensive CME/IME Taxonomy
-TEST_MOTION_EXPECTATIONS = {
-    'range_of_motion': {
-        'expected_movements': ['flexion', 'extension', 'rotation', 'bending'],
-        'patient_motion_required': True,
-        'examiner_touch': False,
-        'description': 'Examiner measures joint/spinal movements using goniometer or visual estimate'
-    },
-    'straight_leg_raise': {
-        'expected_movements': ['leg_raise', 'hip_flexion', 'patient_supine'],
-        'patient_motion_required': True,
-        'examiner_touch': True,
-        'description': 'Examiner passively lifts straight leg while patient lies supine'
-    },
-    'cross_straight_leg_raise': {
-        'expected_movements': ['opposite_leg_raise', 'patient_supine'],
-        'patient_motion_required': True,
-        'examiner_touch': True,
-        'description': 'Examiner raises unaffected leg to elicit contralateral pain'
-    },
-    'faber_test': {
-        'expected_movements': ['hip_flexion', 'abduction', 'external_rotation', 'knee_press'],
-        'patient_motion_required': False,
-        'examiner_touch': True,
-        'description': 'Patient in figure-4 position, examiner presses down on knee'
-    },
-    'spurlings_test': {
-        'expected_movements': ['neck_extension', 'rotation', 'axial_pressure'],
-        'patient_motion_required': False,
-        'examiner_touch': True,
-        'description': 'Examiner extends/rotates neck and applies downward pressure'
-    },
-    'drop_arm_test': {
-        'expected_movements': ['arm_abduction', 'arm_lowering'],
-        'patient_motion_required': True,
-        'examiner_touch': True,
-        'description': 'Patient slowly lowers arm from 90° abduction'
-    },
-    'hawkins_kennedy_test': {
-        'expected_movements': ['shoulder_flexion', 'internal_rotation'],
-        'patient_motion_required': False,
-        'examiner_touch': True,
-        'description': 'Examiner internally rotates shoulder at 90° flexion'
-    },
-    'neer_test': {
-        'expected_movements': ['forward_flexion', 'overhead_reach'],
-        'patient_motion_required': False,
-        'examiner_touch': True,
-        'description': 'Examiner passively forward-flexes arm overhead'
-    },
-    'lachman_test': {
-        'expected_movements': ['knee_flexion', 'anterior_tibial_pull'],
-        'patient_motion_required': False,
-        'examiner_touch': True,
-        'description': 'Examiner pulls tibia forward with knee at 20-30° flexion'
-    },
-    'mcmurray_test': {
-        'expected_movements': ['knee_flexion', 'rotation', 'extension'],
-        'patient_motion_required': False,
-        'examiner_touch': True,
-        'description': 'Examiner rotates and extends knee to test meniscus'
-    },
-    'phalens_test': {
-        'expected_movements': ['wrist_flexion', 'hands_pressed'],
-        'patient_motion_required': True,
-        'examiner_touch': False,
-        'description': 'Patient flexes both wrists and holds for 30-60 seconds'
-    },
-    'tinels_sign': {
-        'expected_movements': ['tapping', 'percussion'],
-        'patient_motion_required': False,
-        'examiner_touch': True,
-        'description': 'Examiner taps over nerve path'
-    },
-    'trendelenburg_sign': {
-        'expected_movements': ['one_leg_stand', 'pelvic_observation'],
-        'patient_motion_required': True,
-        'examiner_touch': False,
-        'description': 'Patient stands on one leg, examiner observes pelvis'
-    },
-    'deep_tendon_reflexes': {
-        'expected_movements': ['hammer_tap', 'limb_movement', 'reflex_response'],
-        'patient_motion_required': False,
-        'examiner_touch': True,
-        'description': 'Examiner taps tendons with reflex hammer'
-    },
-    'babinski_sign': {
-        'expected_movements': ['sole_stroke', 'toe_movement'],
-        'patient_motion_required': False,
-        'examiner_touch': True,
-        'description': 'Examiner strokes lateral sole of foot'
-    },
-    'hoffmanns_sign': {
-        'expected_movements': ['finger_flick', 'thumb_flexion'],
-        'patient_motion_required': False,
-        'examiner_touch': True,
-        'description': 'Examiner flicks middle finger nail downward'
-    },
-    'clonus_test': {
-        'expected_movements': ['rapid_dorsiflexion', 'rhythmic_contractions'],
-        'patient_motion_required': False,
-        'examiner_touch': True,
-        'description': 'Examiner rapidly dorsiflexes foot and holds'
-    },
-    'romberg_test': {
-        'expected_movements': ['standing', 'eyes_closed', 'balance_observation'],
-        'patient_motion_required': True,
-        'examiner_touch': False,
-        'description': 'Patient stands with eyes closed, examiner observes balance'
-    },
-    'light_touch_sensation': {
-        'expected_movements': ['light_touch', 'cotton_wisp'],
-        'patient_motion_required': False,
-        'examiner_touch': True,
-        'description': 'Examiner tests sensation with cotton or light touch'
-    },
-    'pinprick_sensation': {
-        'expected_movements': ['pin_touch', 'sharp_dull_alternation'],
-        'patient_motion_required': False,
-        'examiner_touch': True,
-        'description': 'Examiner uses pin to test sharp/dull discrimination'
-    },
-    'vibration_sense': {
-        'expected_movements': ['tuning_fork_application', 'vibration_detection'],
-        'patient_motion_required': False,
-        'examiner_touch': True,
-        'description': 'Examiner applies vibrating tuning fork to bony prominences'
-    },
-    'proprioception': {
-        'expected_movements': ['joint_movement', 'position_testing'],
-        'patient_motion_required': False,
-        'examiner_touch': True,
-        'description': 'Examiner moves digit up/down, patient identifies position'
-    },
-    'gait_observation': {
-        'expected_movements': ['walking', 'stride_observation', 'limping'],
-        'patient_motion_required': True,
-        'examiner_touch': False,
-        'description': 'Examiner observes patient walking normally'
-    },
-    'heel_walking': {
-        'expected_movements': ['walking', 'heel_walk', 'toe_lift'],
-        'patient_motion_required': True,
-        'examiner_touch': False,
-        'description': 'Patient walks on heels with toes off ground'
-    },
-    'toe_walking': {
-        'expected_movements': ['walking', 'toe_walk', 'heel_lift'],
-        'patient_motion_required': True,
-        'examiner_touch': False,
-        'description': 'Patient walks on tiptoes with heels off ground'
-    },
-    'tandem_gait': {
-        'expected_movements': ['walking', 'heel_to_toe', 'balance'],
-        'patient_motion_required': True,
-        'examiner_touch': False,
-        'description': 'Patient walks heel-to-toe in straight line'
-    },
-    'sit_to_stand': {
-        'expected_movements': ['rising', 'standing', 'chair_transfer'],
-        'patient_motion_required': True,
-        'examiner_touch': False,
-        'description': 'Patient rises from seated position'
-    },
-    'stair_climb': {
-        'expected_movements': ['stepping', 'climbing', 'descending'],
-        'patient_motion_required': True,
-        'examiner_touch': False,
-        'description': 'Patient steps up and down stairs'
-    },
-    'squat_and_rise': {
-        'expected_movements': ['squatting', 'rising', 'knee_flexion'],
-        'patient_motion_required': True,
-        'examiner_touch': False,
-        'description': 'Patient squats down and stands back up'
-    },
-    'axial_loading': {
-        'expected_movements': ['downward_pressure', 'head_compression'],
-        'patient_motion_required': False,
-        'examiner_touch': True,
-        'description': 'Examiner applies downward pressure on head (Waddell sign)'
-    },
-    'simulated_rotation': {
-        'expected_movements': ['trunk_rotation', 'en_bloc_rotation'],
-        'patient_motion_required': False,
-        'examiner_touch': True,
-        'description': 'Examiner rotates shoulders and pelvis together (Waddell sign)'
-    },
-    'superficial_tenderness': {
-        'expected_movements': ['light_palpation', 'skin_pinching'],
-        'patient_motion_required': False,
-        'examiner_touch': True,
-        'description': 'Examiner lightly palpates skin (Waddell sign)'
-    },
-    'non_anatomic_tenderness': {
-        'expected_movements': ['palpation', 'pressure_application'],
-        'patient_motion_required': False,
-        'examiner_touch': True,
-        'description': 'Examiner applies pressure in non-anatomic pattern (Waddell sign)'
-    },
-    'distracted_slr': {
-        'expected_movements': ['seated_leg_extension', 'supine_slr_comparison'],
-        'patient_motion_required': True,
-        'examiner_touch': False,
-        'description': 'Compare distracted vs formal SLR (Waddell sign)'
-    },
-    'give_way_weakness': {
-        'expected_movements': ['muscle_testing', 'sudden_collapse'],
-        'patient_motion_required': True,
-        'examiner_touch': True,
-        'description': 'Patient suddenly gives way during strength testing (Waddell sign)'
-    },
-    'hoovers_test': {
-        'expected_movements': ['leg_raise', 'opposite_heel_pressure'],
-        'patient_motion_required': True,
-        'examiner_touch': False,
-        'description': 'Check for counter-pressure from opposite heel during leg raise'
-    },
-    'manual_muscle_testing': {
-        'expected_movements': ['resistance_testing', 'limb_movement', 'strength_grading'],
-        'patient_motion_required': True,
-        'examiner_touch': True,
-        'description': 'Examiner applies resistance to test muscle strength'
-    }
-}
+s3_client = lazy_client('s3')
+rekognition_client = lazy_client('rekognition')
+
+# Re-encoding a shared clip takes longer the longer it is: allow per second of
+# clip, at least a minute and at most the segmenter's ffmpeg timeout
+EXTRACT_MIN_TIMEOUT_SECONDS = 60
+EXTRACT_TIMEOUT_PER_VIDEO_SECOND = float(os.environ.get('CME_EXTRACT_TIMEOUT_PER_VIDEO_SECOND', '1.0'))
+
+# Rekognition video jobs run longer on longer clips, and a shared clip can be
+# several minutes long: wait per second of clip, at least a minute and at most
+# CME_REKOGNITION_MAX_WAIT_SECONDS. The wait never runs past the invocation's
+# remaining time less LAMBDA_RESERVE_SECONDS for the DynamoDB writes
+REKOGNITION_MIN_WAIT_SECONDS = 60
+REKOGNITION_WAIT_PER_VIDEO_SECOND = float(os.environ.get('CME_REKOGNITION_WAIT_PER_VIDEO_SECOND', '1.0'))
+REKOGNITION_MAX_WAIT_SECONDS = float(os.environ.get('CME_REKOGNITION_MAX_WAIT_SECONDS', '720'))
+LAMBDA_RESERVE_SECONDS = float(os.environ.get('CME_LAMBDA_RESERVE_SECONDS', '30'))
 
 
 class CMEVideoProcessor:
@@ -258,7 +55,8 @@ class CMEVideoProcessor:
         video_s3_key: str,
         start_time: float,
         duration: float = 60.0,
-        output_key_prefix: str = 'cme-segments'
+        output_key_prefix: str = 'cme-segments',
+        pre_roll: float = 30.0
     ) -> Optional[str]:
         """
         Step 5: Video Segment Extraction
@@ -269,13 +67,14 @@ class CMEVideoProcessor:
             start_time: Start timestamp in seconds
             duration: Duration to extract (default 60 seconds: ±30s around declaration)
             output_key_prefix: S3 prefix for output segments
+            pre_roll: Seconds kept before start_time (0 for a shared clip's own start)
             
         Returns:
             S3 key of extracted segment
         """
         try:
             # Calculate extraction window (30 seconds before, 30 seconds after)
-            extract_start = max(0, start_time - 30)
+            extract_start = max(0, start_time - pre_roll)
             
             # Generate output filename
             segment_id = f"segment_{int(start_time)}_{int(duration)}"
@@ -283,16 +82,24 @@ class CMEVideoProcessor:
             local_output = os.path.join(self.temp_dir, f'{segment_id}.mp4')
             output_s3_key = f"{output_key_prefix}/{segment_id}.mp4"
             
-            # Download video from S3
-            logger.info(f"Downloading video from s3://{self.s3_bucket}/{video_s3_key}")
-            s3_client.download_file(self.s3_bucket, video_s3_key, local_input)
+            # Fetch only this window's samples when the recording is an indexed MP4,
+            # else download the whole video from S3
+            ffmpeg = find_ffmpeg()
+            reader = open_reader(s3_client, self.s3_bucket, video_s3_key) if RANGED_READS else None
+            if reader:
+                reader.materialize(local_input, [(extract_start, extract_start + duration)])
+                keyframes = reader.keyframe_times() if SEGMENT_MODE == 'copy' else []
+            else:
+                logger.info(f"Downloading video from s3://{self.s3_bucket}/{video_s3_key}")
+                s3_client.download_file(self.s3_bucket, video_s3_key, local_input)
+                keyframes = probe_keyframes(local_input) if ffmpeg and SEGMENT_MODE == 'copy' else []
             
-            # Extract segment using FFmpeg
+            # Extract segment using FFmpeg, seeking the input so only the window is decoded
             # Note: In production Lambda, you'd include FFmpeg layer or use MediaConvert
             command = [
-                'ffmpeg',
-                '-i', local_input,
+                ffmpeg or 'ffmpeg',
                 '-ss', str(extract_start),
+                '-i', local_input,
                 '-t', str(duration),
                 '-c:v', 'libx264',
                 '-c:a', 'aac',
@@ -300,11 +107,20 @@ class CMEVideoProcessor:
                 local_output
             ]
             
+            # Stream-copy from the preceding keyframe when it is close enough
+            if keyframes:
+                keyframe = snap_to_keyframe(extract_start, keyframes)
+                if abs(extract_start - keyframe) <= SNAP_TOLERANCE_SECONDS:
+                    command = build_copy_command(
+                        ffmpeg, local_input, keyframe, duration + (extract_start - keyframe), local_output
+                    )
+            
             logger.info(f"Extracting segment: start={extract_start}s, duration={duration}s")
             
-            # For Lambda, you'd need to check if ffmpeg is available
-            if os.path.exists('/usr/bin/ffmpeg') or os.path.exists('/opt/bin/ffmpeg'):
-                result = subprocess.run(command, capture_output=True, text=True, timeout=60)
+            if ffmpeg:
+                result = subprocess.run(
+                    command, capture_output=True, text=True, timeout=extract_timeout_seconds(duration)
+                )
                 if result.returncode != 0:
                     logger.error(f"FFmpeg error: {result.stderr}")
                     return None
@@ -499,6 +315,14 @@ class CMEVideoProcessor:
             job_status = response.get('JobStatus')
             
             if job_status == 'SUCCEEDED':
+                # A shared clip covers several tests; later pages hold the later ones
+                items_key = 'Labels' if job_type == 'motion_analysis' else 'Persons'
+                get_page = (rekognition_client.get_label_detection if job_type == 'motion_analysis'
+                            else rekognition_client.get_person_tracking)
+                while response.get('NextToken'):
+                    page = get_page(JobId=job_id, NextToken=response['NextToken'])
+                    response[items_key] = response.get(items_key, []) + page.get(items_key, [])
+                    response['NextToken'] = page.get('NextToken')
                 return {
                     'status': 'COMPLETED',
                     'results': response,
@@ -596,17 +420,15 @@ def process_video_for_cme_test(
     session_id: str,
     declared_test: Dict[str, Any],
     video_s3_key: str,
-    s3_bucket: str
+    s3_bucket: str,
+    deadline: Optional[float] = None
 ) -> Dict[str, Any]:
     """
     Main processing function for video analysis of a declared test
     Combines video segmentation and action analysis
     **NOW WITH PERSISTENCE AND REKOGNITION POLLING**
     """
-    import os
-    import boto3
-    
-    dynamodb = boto3.resource('dynamodb')
+    dynamodb = get_resource('dynamodb')
     actions_table = dynamodb.Table(os.environ.get('CME_ACTIONS_TABLE', 'cme-observed-actions'))
     
     processor = CMEVideoProcessor(s3_bucket)
@@ -614,14 +436,21 @@ def process_video_for_cme_test(
     test_timestamp = float(declared_test.get('timestamp', 0))
     test_type = declared_test.get('label', 'unknown')
     declared_step_id = declared_test.get('declared_step_id', '')
-    
-    # Step 5: Extract video segment
-    segment_key = processor.extract_video_segment(
-        video_s3_key=video_s3_key,
-        start_time=test_timestamp,
-        duration=60.0,
-        output_key_prefix=f'cme-segments/{session_id}'
-    )
+    # A test episode covers every merged mention; a lone declaration is its own episode
+    declared_step_ids = declared_test.get('declared_step_ids') or ([declared_step_id] if declared_step_id else [])
+    episode_end = float(declared_test.get('episode_end', test_timestamp))
+    
+    # Step 5: The session segmenter has normally cut this episode's clip already
+    # (its manifest entry carries segment_key); otherwise extract it here
+    # (±30s around the first and last mention)
+    segment_key = declared_test.get('segment_key')
+    if not segment_key:
+        segment_key = processor.extract_video_segment(
+            video_s3_key=video_s3_key,
+            start_time=test_timestamp,
+            duration=60.0 + (episode_end - test_timestamp),
+            output_key_prefix=f'cme-segments/{session_id}'
+        )
     
     if not segment_key:
         logger.warning(f"Failed to extract segment, using simple analysis")
@@ -630,6 +459,7 @@ def process_video_for_cme_test(
         action_item = {
             'observed_action_id': action_id,
             'declared_step_id': declared_step_id,
+            'declared_step_ids': declared_step_ids,
             'motion_present': 'not_observed',
             'pose_match': 'no_match',
             'confidence_score': 0.0,
@@ -647,36 +477,9 @@ def process_video_for_cme_test(
     
     # Step 6: Analyze the segment
     analysis = processor.analyze_video_segment(segment_key, test_type)
-    
-    # Poll Rekognition jobs until complete
-    motion_job_id = analysis.get('motion_detected', {}).get('job_id')
-    pose_job_id = analysis.get('poses_detected', {}).get('job_id')
-    
-    # Simple polling (in production, use Step Function wait states)
-    import time as time_module
-    max_wait = 60  # Wait up to 60 seconds
-    waited = 0
-    
-    motion_result = None
-    pose_result = None
-    
-    while waited < max_wait:
-        if motion_job_id and not motion_result:
-            motion_result = processor.get_rekognition_results(motion_job_id, 'motion_analysis')
-            if motion_result.get('status') == 'COMPLETED':
-                logger.info(f"Motion analysis completed for {motion_job_id}")
-        
-        if pose_job_id and not pose_result:
-            pose_result = processor.get_rekognition_results(pose_job_id, 'pose_detection')
-            if pose_result.get('status') == 'COMPLETED':
-                logger.info(f"Pose detection completed for {pose_job_id}")
-        
-        if (motion_result and motion_result.get('status') == 'COMPLETED' and
-            pose_result and pose_result.get('status') == 'COMPLETED'):
-            break
-        
-        time_module.sleep(5)
-        waited += 5
+    motion_job_id, pose_job_id, motion_result, pose_result = wait_for_rekognition(
+        processor, analysis, rekognition_wait_seconds(60.0 + (episode_end - test_timestamp), deadline)
+    )
     
     # Analyze Rekognition results
     motion_present, pose_match, confidence = analyze_rekognition_results(
@@ -688,6 +491,7 @@ def process_video_for_cme_test(
     action_item = {
         'observed_action_id': action_id,
         'declared_step_id': declared_step_id,
+        'declared_step_ids': declared_step_ids,
         'motion_present': motion_present,
         'pose_match': pose_match,
         'confidence_score': confidence,
@@ -709,6 +513,7 @@ def process_video_for_cme_test(
         'session_id': session_id,
         'test_type': test_type,
         'timestamp': test_timestamp,
+        'mention_count': declared_test.get('mention_count', 1),
         'segment_key': segment_key,
         'action_id': action_id,
         'motion_present': motion_present,
@@ -718,6 +523,201 @@ def process_video_for_cme_test(
     }
 
 
+def extract_timeout_seconds(clip_seconds: float) -> float:
+    """How long ffmpeg may take to cut a clip `clip_seconds` long"""
+    return min(
+        max(EXTRACT_MIN_TIMEOUT_SECONDS, clip_seconds * EXTRACT_TIMEOUT_PER_VIDEO_SECOND),
+        FFMPEG_TIMEOUT_SECONDS
+    )
+
+
+def rekognition_wait_seconds(clip_seconds: float, deadline: Optional[float] = None) -> float:
+    """
+    How long to poll the Rekognition jobs of a clip `clip_seconds` long
+
+    `deadline` is the epoch time the invocation times out at; extraction may
+    already have used part of the budget, so the wait shrinks to what is left
+    """
+    wait = min(
+        max(REKOGNITION_MIN_WAIT_SECONDS, clip_seconds * REKOGNITION_WAIT_PER_VIDEO_SECOND),
+        REKOGNITION_MAX_WAIT_SECONDS
+    )
+    if deadline is not None:
+        wait = max(0.0, min(wait, deadline - time.time() - LAMBDA_RESERVE_SECONDS))
+    return wait
+
+
+def wait_for_rekognition(
+    processor: CMEVideoProcessor,
+    analysis: Dict[str, Any],
+    max_wait: float = REKOGNITION_MIN_WAIT_SECONDS
+) -> Tuple:
+    """
+    Poll a segment's Rekognition jobs until both complete or `max_wait` seconds pass
+    
+    Returns: (motion_job_id, pose_job_id, motion_result, pose_result)
+    """
+    motion_job_id = analysis.get('motion_detected', {}).get('job_id')
+    pose_job_id = analysis.get('poses_detected', {}).get('job_id')
+    
+    # Simple polling (in production, use Step Function wait states)
+    waited = 0
+    
+    motion_result = None
+    pose_result = None
+    
+    while waited < max_wait:
+        if motion_job_id and not motion_result:
+            motion_result = processor.get_rekognition_results(motion_job_id, 'motion_analysis')
+            if motion_result.get('status') == 'COMPLETED':
+                logger.info(f"Motion analysis completed for {motion_job_id}")
+        
+        if pose_job_id and not pose_result:
+            pose_result = processor.get_rekognition_results(pose_job_id, 'pose_detection')
+            if pose_result.get('status') == 'COMPLETED':
+                logger.info(f"Pose detection completed for {pose_job_id}")
+        
+        if (motion_result and motion_result.get('status') == 'COMPLETED' and
+            pose_result and pose_result.get('status') == 'COMPLETED'):
+            break
+        
+        time.sleep(5)
+        waited += 5
+    
+    return motion_job_id, pose_job_id, motion_result, pose_result
+
+
+def slice_rekognition_result(result: Optional[Dict[str, Any]], start: float, end: float) -> Optional[Dict[str, Any]]:
+    """Keep only the detections between start and end seconds of the clip (Rekognition timestamps are in ms)"""
+    if not result or 'results' not in result:
+        return result
+    
+    results = dict(result['results'])
+    for items_key in ('Labels', 'Persons'):
+        if items_key in results:
+            results[items_key] = [
+                item for item in results[items_key]
+                if start * 1000 <= item.get('Timestamp', 0) <= end * 1000
+            ]
+    return {**result, 'results': results}
+
+
+def process_video_for_cme_segment(
+    session_id: str,
+    segment: Dict[str, Any],
+    video_s3_key: str,
+    s3_bucket: str,
+    deadline: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Analyze one shared clip from the segment manifest for every test it covers
+    
+    The clip gets one pair of Rekognition jobs; each test's verdict comes from
+    the detections inside its own window (test_offset, test_duration), the
+    same ±30s window a clip of its own would have held.
+    """
+    dynamodb = get_resource('dynamodb')
+    actions_table = dynamodb.Table(os.environ.get('CME_ACTIONS_TABLE', 'cme-observed-actions'))
+    
+    processor = CMEVideoProcessor(s3_bucket)
+    tests = segment.get('tests') or []
+    
+    # Step 5: The session segmenter has normally cut the clip already; otherwise
+    # extract the whole shared window here
+    segment_key = segment.get('segment_key')
+    if not segment_key:
+        segment_key = processor.extract_video_segment(
+            video_s3_key=video_s3_key,
+            start_time=float(segment.get('segment_start', 0)),
+            duration=float(segment.get('segment_duration', 60.0)),
+            output_key_prefix=f'cme-segments/{session_id}',
+            pre_roll=0.0
+        )
+    
+    # Step 6: Analyze the clip once for all of its tests
+    motion_job_id = pose_job_id = motion_result = pose_result = None
+    if segment_key:
+        analysis = processor.analyze_video_segment(segment_key, tests[0].get('label', 'unknown') if tests else 'unknown')
+        motion_job_id, pose_job_id, motion_result, pose_result = wait_for_rekognition(
+            processor, analysis, rekognition_wait_seconds(float(segment.get('segment_duration', 60.0)), deadline)
+        )
+    else:
+        logger.warning(f"Failed to extract segment for {len(tests)} tests, using simple analysis")
+    
+    created_at = int(time.time())
+    action_items = []
+    results = []
+    for test in tests:
+        test_timestamp = float(test.get('timestamp', 0))
+        test_type = test.get('label', 'unknown')
+        declared_step_id = test.get('declared_step_id', '')
+        declared_step_ids = test.get('declared_step_ids') or ([declared_step_id] if declared_step_id else [])
+        test_start = float(test.get('test_offset', 0))
+        test_end = test_start + float(test.get('test_duration', 60.0))
+        
+        action_id = deterministic_id('action', session_id, test_type, f'{test_timestamp:.3f}')
+        if not segment_key:
+            action_items.append({
+                'observed_action_id': action_id,
+                'declared_step_id': declared_step_id,
+                'declared_step_ids': declared_step_ids,
+                'motion_present': 'not_observed',
+                'pose_match': 'no_match',
+                'confidence_score': 0.0,
+                'analysis_details': {'error': 'Segment extraction failed'},
+                'created_at': created_at
+            })
+            results.append({
+                'test_type': test_type,
+                'timestamp': test_timestamp,
+                'error': 'Failed to extract video segment'
+            })
+            continue
+        
+        test_motion = slice_rekognition_result(motion_result, test_start, test_end)
+        test_pose = slice_rekognition_result(pose_result, test_start, test_end)
+        motion_present, pose_match, confidence = analyze_rekognition_results(test_motion, test_pose, test_type)
+        action_items.append({
+            'observed_action_id': action_id,
+            'declared_step_id': declared_step_id,
+            'declared_step_ids': declared_step_ids,
+            'motion_present': motion_present,
+            'pose_match': pose_match,
+            'confidence_score': confidence,
+            'analysis_details': {
+                'segment_key': segment_key,
+                'segment_offset': test_start,
+                'segment_end': test_end,
+                'test_type': test_type,
+                'motion_job_id': motion_job_id,
+                'pose_job_id': pose_job_id,
+                'motion_labels': extract_motion_labels(test_motion),
+                'person_count': count_persons(test_pose)
+            },
+            'created_at': created_at
+        })
+        results.append({
+            'test_type': test_type,
+            'timestamp': test_timestamp,
+            'mention_count': test.get('mention_count', 1),
+            'action_id': action_id,
+            'motion_present': motion_present,
+            'pose_match': pose_match,
+            'confidence': confidence,
+            'status': 'completed'
+        })
+    
+    batch_put(actions_table, action_items, 'observed_action_id')
+    logger.info(f"Persisted {len(action_items)} observed actions from segment {segment_key}")
+    
+    return {
+        'session_id': session_id,
+        'segment_key': segment_key,
+        'rekognition_jobs': int(bool(motion_job_id)) + int(bool(pose_job_id)),
+        'tests': results
+    }
+
+
 def analyze_rekognition_results(
     motion_result: Dict[str, Any],
     pose_result: Dict[str, Any],
@@ -878,23 +878,35 @@ def generate_frame_snapshots(
 def handler(event, context):
     """
     Lambda handler for Step Functions invocation
-    Processes a single declared test
+    Processes one segment manifest clip, or a single declared test
     """
     try:
         logger.info(f"Video Processor invoked: {json.dumps(event)}")
         
         session_id = event['session_id']
-        declared_test = event['declared_test']
         video_s3_key = event['video_s3_key']
         s3_bucket = os.environ.get('S3_BUCKET', 'default-bucket')
+        # Rekognition polling stops short of the Lambda timeout
+        deadline = time.time() + context.get_remaining_time_in_millis() / 1000 if context else None
         
-        # Process the test
-        result = process_video_for_cme_test(
-            session_id=session_id,
-            declared_test=declared_test,
-            video_s3_key=video_s3_key,
-            s3_bucket=s3_bucket
-        )
+        # The pipeline Map sends one manifest clip with all the tests it covers
+        if 'segment' in event:
+            result = process_video_for_cme_segment(
+                session_id=session_id,
+                segment=event['segment'],
+                video_s3_key=video_s3_key,
+                s3_bucket=s3_bucket,
+                deadline=deadline
+            )
+        else:
+            # Process the test
+            result = process_video_for_cme_test(
+                session_id=session_id,
+                declared_test=event['declared_test'],
+                video_s3_key=video_s3_key,
+                s3_bucket=s3_bucket,
+                deadline=deadline
+            )
         
         return {
             'statusCode': 200,
@@ -0,0 +1,130 @@
+"""
+Demeanor Lexicon - Compiled single-pass scanner for examiner tone analysis
+Loads a versioned lexicon (built-in or JSON file) and turns every phrase and
+pattern into one MultiPatternMatcher so each segment is scanned exactly once
+"""
+
+import hashlib
+import json
+import logging
+from typing import Dict, Any, List, Tuple, Optional
+
+from text_matcher import MultiPatternMatcher
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Lexicon file format:
+# {
+#   "version": "2024-06-01",
+#   "categories": {
+#     "<flag_type>": {
+#       "severity": "low|medium|high",
+#       "description": "Text for the flag; {term} is replaced by the matched entry",
+#       "phrases": ["literal substring", ...],
+#       "patterns": ["regex", ...]
+#     }
+#   }
+# }
+# Categories are reported in file order, then phrases before patterns, each in list order.
+
+
+class DemeanorLexicon:
+    """Versioned demeanor lexicon compiled for single-pass scanning"""
+
+    def __init__(self, config: Dict[str, Any]):
+        if 'version' not in config or not isinstance(config.get('categories'), dict):
+            raise ValueError("Demeanor lexicon must define 'version' and a 'categories' object")
+
+        self.version = str(config['version'])
+        self.fingerprint = hashlib.sha256(
+            json.dumps(config, sort_keys=True).encode('utf-8')
+        ).hexdigest()[:16]
+
+        self.categories: List[Dict[str, Any]] = []
+        keywords = []
+        patterns = []
+        for category_index, (flag_type, category) in enumerate(config['categories'].items()):
+            # Each term keeps its listing position so output order is stable
+            terms = [('phrase', phrase) for phrase in category.get('phrases', [])]
+            terms += [('pattern', pattern) for pattern in category.get('patterns', [])]
+            self.categories.append({
+                'flag_type': flag_type,
+                'severity': category.get('severity', 'medium'),
+                'description': category.get('description', f'{flag_type} language detected'),
+                'terms': terms
+            })
+            for term_index, (kind, term) in enumerate(terms):
+                tag = (category_index, term_index)
+                if kind == 'phrase':
+                    keywords.append((term, tag))
+                else:
+                    patterns.append((term, tag))
+
+        self.matcher = MultiPatternMatcher(keywords, patterns)
+        self.term_count = len(keywords) + len(patterns)
+
+    def to_tables(self) -> Dict[str, Any]:
+        """JSON-safe compiled lexicon, restored by `from_tables`"""
+        return {
+            'version': self.version,
+            'fingerprint': self.fingerprint,
+            'categories': self.categories,
+            'term_count': self.term_count,
+            'matcher': self.matcher.to_tables()
+        }
+
+    @classmethod
+    def from_tables(cls, tables: Dict[str, Any]) -> 'DemeanorLexicon':
+        lexicon = cls.__new__(cls)
+        lexicon.version = tables['version']
+        lexicon.fingerprint = tables['fingerprint']
+        lexicon.categories = [
+            {**category, 'terms': [tuple(term) for term in category['terms']]} for category in tables['categories']
+        ]
+        lexicon.term_count = tables['term_count']
+        lexicon.matcher = MultiPatternMatcher.from_tables(tables['matcher'])
+        return lexicon
+
+    @classmethod
+    def from_file(cls, path: str) -> 'DemeanorLexicon':
+        """Load a lexicon JSON file"""
+        with open(path, 'r', encoding='utf-8') as f:
+            lexicon = cls(json.load(f))
+        logger.info(f"Loaded demeanor lexicon {lexicon.version} ({lexicon.term_count} terms) from {path}")
+        return lexicon
+
+    @classmethod
+    def load(cls, path: Optional[str], default: Dict[str, Any]) -> 'DemeanorLexicon':
+        """Load `path` if given, falling back to the built-in lexicon on any error"""
+        if path:
+            try:
+                return cls.from_file(path)
+            except Exception as e:
+                logger.error(f"Error loading demeanor lexicon {path}, using built-in: {str(e)}")
+        return cls(default)
+
+    def scan(self, text_lower: str) -> List[Tuple[int, int, str, str]]:
+        """Every lexicon hit in lower-cased text as (start, end, flag_type, term)"""
+        hits = []
+        for start, end, (category_index, term_index) in self.matcher.scan(text_lower):
+            category = self.categories[category_index]
+            hits.append((start, end, category['flag_type'], category['terms'][term_index][1]))
+        return hits
+
+    def flags(self, text: str, timestamp: float) -> List[Dict[str, Any]]:
+        """One demeanor flag per lexicon entry present in `text`"""
+        matched = sorted({tag for _, _, tag in self.matcher.scan(text.lower())})
+        flags = []
+        for category_index, term_index in matched:
+            category = self.categories[category_index]
+            term = category['terms'][term_index][1]
+            flags.append({
+                'flag_type': category['flag_type'],
+                'timestamp': timestamp,
+                'transcript_excerpt': text[:200],
+                'severity': category['severity'],
+                'description': category['description'].replace('{term}', term),
+                'term': term
+            })
+        return flags
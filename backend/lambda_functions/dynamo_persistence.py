@@ -0,0 +1,103 @@
+"""
+DynamoDB Persistence - Batched, idempotent writes for NLP results
+Declared steps and demeanor flags get IDs derived from their content, so a
+retried or re-run session overwrites its own items instead of duplicating them
+"""
+
+import hashlib
+import json
+import logging
+import time
+from decimal import Decimal
+from typing import Dict, Any, List
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+def deterministic_id(prefix: str, *parts: Any) -> str:
+    """Stable item ID from the fields that identify an item"""
+    digest = hashlib.sha256('\x1f'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return f'{prefix}_{digest[:24]}'
+
+
+def to_dynamo(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Marshal a whole batch for DynamoDB in one pass
+
+    A single JSON round trip turns every float (at any depth) into a Decimal
+    with the same shortest repr, which boto3 requires and Decimal(str(x)) gives.
+    """
+    return json.loads(json.dumps(items), parse_float=Decimal)
+
+
+def batch_put(table: Any, items: List[Dict[str, Any]], key_name: str) -> int:
+    """
+    Write items with the table's batch_writer
+
+    batch_writer sends 25-item BatchWriteItem requests and resubmits any
+    UnprocessedItems; overwrite_by_pkeys drops duplicate keys within a batch,
+    which DynamoDB would otherwise reject.
+    """
+    if not items:
+        return 0
+    with table.batch_writer(overwrite_by_pkeys=[key_name]) as batch:
+        for item in to_dynamo(items):
+            batch.put_item(Item=item)
+    return len(items)
+
+
+def persist_declared_steps(table: Any, session_id: str, declared_tests: List[Dict[str, Any]]) -> List[str]:
+    """Write one declared step per test and set `declared_step_id` on each test"""
+    created_at = int(time.time())
+    items = []
+    for test in declared_tests:
+        timestamp = float(test.get('timestamp', 0))
+        label = test.get('label', 'unknown')
+        test['declared_step_id'] = deterministic_id('step', session_id, label, f'{timestamp:.3f}')
+        items.append({
+            'declared_step_id': test['declared_step_id'],
+            'session_id': session_id,
+            'timestamp': timestamp,
+            'label': label,
+            'transcript_text': test.get('matched_text', ''),
+            'confidence': test.get('confidence', 0.0),
+            'video_snippet_uri': '',
+            'created_at': created_at
+        })
+
+    batch_put(table, items, 'declared_step_id')
+    logger.info(f"Persisted {len(items)} declared steps for session {session_id}")
+    return [item['declared_step_id'] for item in items]
+
+
+def persist_demeanor_flags(table: Any, session_id: str, demeanor_flags: List[Dict[str, Any]]) -> List[str]:
+    """Write one item per distinct demeanor flag and set `flag_id` on each flag"""
+    created_at = int(time.time())
+    items = []
+    seen = set()
+    for flag in demeanor_flags:
+        timestamp = float(flag.get('timestamp', 0))
+        flag_type = flag.get('flag_type', 'unknown')
+        # Several flags of one type can share a segment; the matched term (not
+        # every description names it) and the description tell them apart
+        flag['flag_id'] = deterministic_id(
+            'flag', session_id, flag_type, f'{timestamp:.3f}', flag.get('description', ''), flag.get('term', '')
+        )
+        if flag['flag_id'] in seen:
+            continue
+        seen.add(flag['flag_id'])
+        items.append({
+            'flag_id': flag['flag_id'],
+            'session_id': session_id,
+            'timestamp': timestamp,
+            'flag_type': flag_type,
+            'transcript_excerpt': flag.get('transcript_excerpt', ''),
+            'severity': flag.get('severity', 'low'),
+            'description': flag.get('description', ''),
+            'created_at': created_at
+        })
+
+    batch_put(table, items, 'flag_id')
+    logger.info(f"Persisted {len(items)} demeanor flags for session {session_id}")
+    return [item['flag_id'] for item in items]
@@ -0,0 +1,138 @@
+"""
+Intent Classifier - Local CPU test-intent model for examiner segments
+Runs a small fine-tuned transformers sequence classifier over every examiner
+segment in length-sorted, padded minibatches, with int8 dynamic quantization
+and a fixed torch thread count, as an in-process alternative to Bedrock
+"""
+
+import importlib.util
+import logging
+import threading
+import time
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# torch and transformers are optional and slow to import, so they are only
+# loaded when a classifier is actually built
+TORCH_AVAILABLE = (
+    importlib.util.find_spec('torch') is not None and importlib.util.find_spec('transformers') is not None
+)
+
+# Label the model uses for segments that declare no test
+NO_TEST_LABEL = 'none'
+
+# Model directory layout: a transformers sequence-classification checkpoint
+# (config.json, weights, tokenizer files) whose id2label holds taxonomy test
+# labels plus NO_TEST_LABEL. With problem_type "multi_label_classification"
+# every label gets an independent sigmoid score; otherwise scores are softmax.
+
+
+class IntentClassifier:
+    """Batched CPU inference for a test-intent sequence classifier"""
+
+    def __init__(
+        self,
+        model_path: str,
+        num_threads: int = 1,
+        batch_size: int = 32,
+        max_length: int = 128,
+        quantize: bool = True,
+        threshold: float = 0.5
+    ):
+        if not TORCH_AVAILABLE:
+            raise RuntimeError('torch and transformers are required for IntentClassifier')
+        import torch
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+        self._torch = torch
+        self.model_path = model_path
+        self.num_threads = num_threads
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.threshold = threshold
+        self.stats = {'segments': 0, 'batches': 0, 'padded_tokens': 0, 'tokens': 0, 'seconds': 0.0}
+        self._lock = threading.Lock()
+
+        torch.set_num_threads(num_threads)
+        try:
+            # Only settable before the first parallel op in the process
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            pass
+
+        start = time.time()
+        self.tokenizer = AutoTokenizer.from_pretrained(model_path)
+        model = AutoModelForSequenceClassification.from_pretrained(model_path)
+        model.eval()
+        if quantize:
+            # int8 weights for every Linear layer; activations are quantized per batch
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model = model
+        self.quantized = quantize
+
+        config = model.config
+        self.labels = [config.id2label[i] for i in range(config.num_labels)]
+        self.multi_label = getattr(config, 'problem_type', None) == 'multi_label_classification'
+        logger.info(
+            f"Loaded intent classifier {model_path}: {len(self.labels)} labels, "
+            f"quantized={quantize}, threads={num_threads} in {time.time() - start:.2f}s"
+        )
+
+    def predict(self, texts: Sequence[str]) -> List[List[Tuple[str, float]]]:
+        """
+        Test labels scoring at least `threshold` for each text, in input order
+
+        Texts are sorted by length before batching so each minibatch is padded
+        only to its own longest member.
+        """
+        torch = self._torch
+        results: List[List[Tuple[str, float]]] = [[] for _ in texts]
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+
+        # One inference at a time: concurrent calls would oversubscribe the torch threads
+        with self._lock, torch.inference_mode():
+            start = time.time()
+            for first in range(0, len(order), self.batch_size):
+                batch = order[first:first + self.batch_size]
+                encoded = self.tokenizer(
+                    [texts[i] for i in batch], padding=True, truncation=True,
+                    max_length=self.max_length, return_tensors='pt'
+                )
+                logits = self.model(**encoded).logits
+                scores = torch.sigmoid(logits) if self.multi_label else torch.softmax(logits, dim=-1)
+
+                self.stats['batches'] += 1
+                self.stats['padded_tokens'] += int(encoded['attention_mask'].numel())
+                self.stats['tokens'] += int(encoded['attention_mask'].sum())
+                for i, row in zip(batch, scores.tolist()):
+                    results[i] = [
+                        (label, score) for label, score in zip(self.labels, row)
+                        if score >= self.threshold and label != NO_TEST_LABEL
+                    ]
+            self.stats['segments'] += len(texts)
+            self.stats['seconds'] += time.time() - start
+        return results
+
+
+_classifiers: Dict[Any, IntentClassifier] = {}
+_classifiers_lock = threading.Lock()
+
+
+def get_intent_classifier(model_path: str, **options: Any) -> Optional[IntentClassifier]:
+    """
+    The shared classifier for `model_path`, loaded once per container
+
+    Returns None (and logs why) when torch/transformers are missing or the
+    model cannot be loaded, so callers can fall back to taxonomy matching.
+    """
+    key = (model_path, tuple(sorted(options.items())))
+    with _classifiers_lock:
+        if key not in _classifiers:
+            try:
+                _classifiers[key] = IntentClassifier(model_path, **options)
+            except Exception as e:
+                logger.error(f"Error loading intent classifier {model_path}: {str(e)}")
+                return None
+        return _classifiers[key]
@@ -0,0 +1,406 @@
+"""
+Ranged MP4 - Read only the parts of an S3 recording a set of time windows need
+Fetches and parses the MP4 `moov` atom with ranged GETs, maps each window to
+the byte ranges of its samples through the sample tables, fetches those ranges
+in parallel and writes them into a sparse local file that ffmpeg can open as if
+it were the whole recording
+"""
+
+import logging
+import os
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional, Tuple
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# First ranged read; holds ftyp and, for faststart files, the whole moov
+PROBE_BYTES = 64 * 1024
+
+# Samples of every track this long before a window's keyframe and after its
+# end are fetched too: ffmpeg reads interleaved audio around the seek point and
+# a few packets past the end before it stops
+WINDOW_MARGIN_SECONDS = 1.0
+
+# The start of every track is always fetched so ffmpeg's stream probing reads
+# real samples
+HEAD_SECONDS = 1.0
+
+# Byte ranges closer than this are fetched as one request; each request is
+# split into parts of at most PART_BYTES fetched concurrently
+COALESCE_GAP_BYTES = 256 * 1024
+PART_BYTES = 8 * 1024 * 1024
+FETCH_WORKERS = int(os.environ.get('CME_RANGED_FETCH_WORKERS', '8'))
+
+
+class Mp4IndexError(ValueError):
+    """Raised when an object is not an MP4 whose samples can be located from its moov"""
+    pass
+
+
+def _boxes(data: bytes, start: int = 0, end: Optional[int] = None):
+    """(type, payload_start, payload_end) for each box in data[start:end]"""
+    end = len(data) if end is None else end
+    position = start
+    while position + 8 <= end:
+        size, box_type = struct.unpack_from('>I4s', data, position)
+        header = 8
+        if size == 1:
+            size = struct.unpack_from('>Q', data, position + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - position
+        if size < header or position + size > end:
+            raise Mp4IndexError(f'Truncated {box_type!r} box at {position}')
+        yield box_type, position + header, position + size
+        position += size
+
+
+def _find(data: bytes, start: int, end: int, path: List[bytes]) -> Optional[Tuple[int, int]]:
+    """Payload bounds of the first box at `path` below data[start:end]"""
+    for box_type, payload_start, payload_end in _boxes(data, start, end):
+        if box_type == path[0]:
+            if len(path) == 1:
+                return payload_start, payload_end
+            return _find(data, payload_start, payload_end, path[1:])
+    return None
+
+
+def _uint32_array(data: bytes, offset: int, count: int) -> array:
+    values = array('I', data[offset:offset + 4 * count])
+    if sys.byteorder == 'little':
+        values.byteswap()
+    return values
+
+
+def _runs(data: bytes, bounds: Tuple[int, int], signed: bool = False) -> Tuple[List[int], List[int], List[int], List[int]]:
+    """
+    Run-length table (stts/ctts) as parallel lists of first sample, first
+    value, sample count and per-sample delta or offset
+    """
+    start, _ = bounds
+    count = struct.unpack_from('>I', data, start + 4)[0]
+    entries = _uint32_array(data, start + 8, 2 * count)
+    first_samples, first_values, counts, deltas = [], [], [], []
+    sample, value = 0, 0
+    for i in range(count):
+        run_count, delta = entries[2 * i], entries[2 * i + 1]
+        if signed and delta >= 1 << 31:
+            delta -= 1 << 32
+        first_samples.append(sample)
+        first_values.append(value)
+        counts.append(run_count)
+        deltas.append(delta)
+        sample += run_count
+        value += run_count * delta
+    return first_samples, first_values, counts, deltas
+
+
+class Mp4Track:
+    """Sample table of one track: sample times, sizes and file offsets"""
+
+    def __init__(self, data: bytes, trak: Tuple[int, int]):
+        mdhd = _find(data, trak[0], trak[1], [b'mdia', b'mdhd'])
+        hdlr = _find(data, trak[0], trak[1], [b'mdia', b'hdlr'])
+        stbl = _find(data, trak[0], trak[1], [b'mdia', b'minf', b'stbl'])
+        if not (mdhd and hdlr and stbl):
+            raise Mp4IndexError('Track without mdhd, hdlr or stbl')
+        version = data[mdhd[0]]
+        self.timescale = struct.unpack_from('>I', data, mdhd[0] + (20 if version == 1 else 12))[0]
+        self.handler = data[hdlr[0] + 8:hdlr[0] + 12].decode('latin-1')
+
+        def table(name: bytes) -> Optional[Tuple[int, int]]:
+            return _find(data, stbl[0], stbl[1], [name])
+
+        stts = table(b'stts')
+        stsc = table(b'stsc')
+        stsz = table(b'stsz')
+        chunk_offsets = table(b'stco') or table(b'co64')
+        if not (stts and stsc and stsz and chunk_offsets):
+            raise Mp4IndexError(f'{self.handler} track without stts, stsc, stsz or chunk offsets')
+
+        self._dts_runs = _runs(data, stts)
+        ctts = table(b'ctts')
+        self._cts_runs = _runs(data, ctts, signed=True) if ctts else None
+
+        # Sample sizes
+        fixed_size, sample_count = struct.unpack_from('>II', data, stsz[0] + 4)
+        self.sample_count = sample_count
+        self._fixed_size = fixed_size
+        self._sizes = _uint32_array(data, stsz[0] + 12, sample_count) if fixed_size == 0 else None
+
+        # Chunk offsets
+        entry_count = struct.unpack_from('>I', data, chunk_offsets[0] + 4)[0]
+        if data[chunk_offsets[0] - 4:chunk_offsets[0]] == b'co64':
+            self._chunk_offsets = list(struct.unpack_from(f'>{entry_count}Q', data, chunk_offsets[0] + 8))
+        else:
+            self._chunk_offsets = _uint32_array(data, chunk_offsets[0] + 8, entry_count)
+
+        # First sample of every chunk, expanded from the sample-to-chunk runs
+        stsc_count = struct.unpack_from('>I', data, stsc[0] + 4)[0]
+        stsc_entries = _uint32_array(data, stsc[0] + 8, 3 * stsc_count)
+        self._chunk_first_sample = array('q')
+        sample = 0
+        for i in range(stsc_count):
+            first_chunk = stsc_entries[3 * i] - 1
+            next_chunk = stsc_entries[3 * (i + 1)] - 1 if i + 1 < stsc_count else entry_count
+            samples_per_chunk = stsc_entries[3 * i + 1]
+            for _ in range(first_chunk, next_chunk):
+                self._chunk_first_sample.append(sample)
+                sample += samples_per_chunk
+
+        # Edit list: media time shown at presentation time zero
+        self._media_start = 0
+        elst = _find(data, trak[0], trak[1], [b'edts', b'elst'])
+        if elst:
+            elst_version = data[elst[0]]
+            offset = elst[0] + 8
+            for _ in range(struct.unpack_from('>I', data, elst[0] + 4)[0]):
+                if elst_version == 1:
+                    media_time = struct.unpack_from('>q', data, offset + 8)[0]
+                    offset += 20
+                else:
+                    media_time = struct.unpack_from('>i', data, offset + 4)[0]
+                    offset += 12
+                if media_time >= 0:
+                    self._media_start = media_time
+                    break
+
+        stss = table(b'stss')
+        if stss:
+            sync_count = struct.unpack_from('>I', data, stss[0] + 4)[0]
+            self.sync_samples = [number - 1 for number in _uint32_array(data, stss[0] + 8, sync_count)]
+        else:
+            self.sync_samples = None
+
+    @staticmethod
+    def _run_value(runs, sample: int) -> int:
+        first_samples, first_values, _, deltas = runs
+        i = bisect_right(first_samples, sample) - 1
+        return first_values[i] + (sample - first_samples[i]) * deltas[i]
+
+    def sample_time(self, sample: int) -> float:
+        """Presentation time of `sample` in seconds"""
+        time = self._run_value(self._dts_runs, sample)
+        if self._cts_runs:
+            first_samples, _, _, deltas = self._cts_runs
+            time += deltas[bisect_right(first_samples, sample) - 1]
+        return (time - self._media_start) / self.timescale
+
+    def sample_at(self, seconds: float) -> int:
+        """
+        Index of the last sample decoding at or before `seconds` (clamped to the track)
+
+        Decode times run ahead of presentation times by the edit list shift,
+        so this errs towards earlier samples, which callers fetch anyway.
+        """
+        first_samples, first_values, counts, deltas = self._dts_runs
+        target = int(seconds * self.timescale)
+        i = max(bisect_right(first_values, target) - 1, 0)
+        step = (target - first_values[i]) // deltas[i] if deltas[i] else 0
+        sample = first_samples[i] + min(max(step, 0), counts[i] - 1)
+        return min(max(sample, 0), self.sample_count - 1)
+
+    def keyframe_times(self) -> List[float]:
+        samples = self.sync_samples if self.sync_samples is not None else range(self.sample_count)
+        return sorted(self.sample_time(sample) for sample in samples)
+
+    def _size(self, first: int, last: int) -> int:
+        if self._sizes is None:
+            return self._fixed_size * (last - first)
+        return sum(self._sizes[first:last])
+
+    def byte_ranges(self, first_sample: int, last_sample: int) -> List[Tuple[int, int]]:
+        """[start, end) file byte ranges of samples first_sample..last_sample, one per chunk"""
+        ranges = []
+        chunk = bisect_right(self._chunk_first_sample, first_sample) - 1
+        sample = first_sample
+        while sample <= last_sample and chunk < len(self._chunk_offsets):
+            chunk_first = self._chunk_first_sample[chunk]
+            chunk_end = (self._chunk_first_sample[chunk + 1]
+                         if chunk + 1 < len(self._chunk_first_sample) else self.sample_count)
+            through = min(chunk_end, last_sample + 1)
+            start = self._chunk_offsets[chunk] + self._size(chunk_first, sample)
+            ranges.append((start, start + self._size(sample, through)))
+            sample = through
+            chunk += 1
+        return ranges
+
+
+def coalesce_ranges(ranges: List[Tuple[int, int]], gap: int = COALESCE_GAP_BYTES) -> List[Tuple[int, int]]:
+    """Sorted [start, end) ranges with overlaps and gaps below `gap` merged"""
+    merged: List[List[int]] = []
+    for start, end in sorted(ranges):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1] + gap:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+class RangedMp4Reader:
+    """
+    Sample-level view of an MP4 object in S3
+
+    Only the moov atom is read on construction; `materialize` then fetches the
+    samples a set of windows needs.
+    """
+
+    def __init__(self, s3_client: Any, bucket: str, key: str):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.key = key
+        self.bytes_fetched = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.size = None
+        self._head = b''
+        self._load_moov()
+
+        video = [track for track in self.tracks if track.handler == 'vide']
+        if not video:
+            raise Mp4IndexError(f's3://{bucket}/{key} has no video track')
+        self.video = video[0]
+
+    def _get(self, start: int, end: int) -> bytes:
+        """Bytes [start, end) of the object"""
+        response = self.s3_client.get_object(Bucket=self.bucket, Key=self.key, Range=f'bytes={start}-{end - 1}')
+        data = response['Body'].read()
+        with self._lock:
+            self.requests += 1
+            self.bytes_fetched += len(data)
+        if self.size is None:
+            content_range = response.get('ContentRange', '')
+            if '/' not in content_range:
+                raise Mp4IndexError('Ranged GET returned no ContentRange')
+            self.size = int(content_range.rsplit('/', 1)[1])
+        return data
+
+    def _load_moov(self) -> None:
+        """
+        Walk every top-level box with ranged GETs, parsing the moov
+
+        The box headers are kept for `materialize`: ffmpeg walks them too, and
+        in a sparse copy any header outside the fetched ranges would read as zeros.
+        """
+        self._head = self._get(0, PROBE_BYTES)
+        self._box_headers = []
+        moov = None
+        buffer, buffer_start, position = self._head, 0, 0
+        while position < self.size:
+            if position + 16 > buffer_start + len(buffer):
+                # Past the moov only headers are left to read
+                fetch = 16 if moov is not None else PROBE_BYTES
+                buffer, buffer_start = self._get(position, min(position + fetch, self.size)), position
+            header = buffer[position - buffer_start:position - buffer_start + 16]
+            if len(header) < 8:
+                raise Mp4IndexError(f'Truncated box header at {position}')
+            size, box_type = struct.unpack_from('>I4s', header)
+            header_size = 8
+            if size == 1:
+                size = struct.unpack_from('>Q', header, 8)[0]
+                header_size = 16
+            elif size == 0:
+                size = self.size - position
+            if size < 8:
+                raise Mp4IndexError(f'Invalid box size {size} at {position}')
+            self._box_headers.append((position, header[:header_size]))
+            if box_type == b'moov':
+                if position + size <= buffer_start + len(buffer):
+                    moov = buffer[position - buffer_start:position - buffer_start + size]
+                else:
+                    moov = self._get(position, position + size)
+                self.moov_range = (position, position + size)
+            elif box_type == b'moof':
+                raise Mp4IndexError('Fragmented MP4: samples are indexed by moof boxes, not the moov')
+            position += size
+        if moov is None:
+            raise Mp4IndexError(f's3://{self.bucket}/{self.key} has no moov box')
+        self._parse_moov(moov)
+
+    def _parse_moov(self, moov: bytes) -> None:
+        header = 16 if struct.unpack_from('>I', moov)[0] == 1 else 8
+        if _find(moov, header, len(moov), [b'mvex']):
+            raise Mp4IndexError('Fragmented MP4: samples are indexed by moof boxes, not the moov')
+        self._moov = moov
+        self.tracks = [
+            Mp4Track(moov, (start, end))
+            for box_type, start, end in _boxes(moov, header, len(moov)) if box_type == b'trak'
+        ]
+        self.tracks = [track for track in self.tracks if track.sample_count]
+
+    def keyframe_times(self) -> List[float]:
+        """Presentation times of the video track's sync samples"""
+        return self.video.keyframe_times()
+
+    def window_ranges(self, windows: List[Tuple[float, float]]) -> List[Tuple[int, int]]:
+        """
+        Coalesced byte ranges holding every sample ffmpeg reads to cut `windows`
+
+        Each window is widened back to the video keyframe it decodes from and
+        by WINDOW_MARGIN_SECONDS on both sides, for every track.
+        """
+        spans = [(0.0, HEAD_SECONDS)]
+        keyframes = self.keyframe_times()
+        for start, end in windows:
+            i = bisect_right(keyframes, start + 0.001) - 1
+            keyframe = keyframes[max(i, 0)]
+            spans.append((min(keyframe, start) - WINDOW_MARGIN_SECONDS, end + WINDOW_MARGIN_SECONDS))
+
+        ranges = []
+        for track in self.tracks:
+            for start, end in spans:
+                ranges += track.byte_ranges(track.sample_at(max(start, 0.0)), track.sample_at(end))
+        return coalesce_ranges(ranges)
+
+    def materialize(self, path: str, windows: List[Tuple[float, float]]) -> int:
+        """
+        Write a sparse copy of the object to `path` holding the head, every
+        top-level box header, the moov and the samples of `windows`; returns
+        total bytes fetched from S3
+        """
+        ranges = self.window_ranges(windows)
+        parts = [
+            (offset, min(offset + PART_BYTES, end))
+            for start, end in ranges for offset in range(start, end, PART_BYTES)
+        ]
+
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.ftruncate(fd, self.size)
+            os.pwrite(fd, self._head, 0)
+            for position, header in self._box_headers:
+                os.pwrite(fd, header, position)
+            os.pwrite(fd, self._moov, self.moov_range[0])
+
+            def fetch(part: Tuple[int, int]) -> None:
+                os.pwrite(fd, self._get(*part), part[0])
+
+            if parts:
+                with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(parts))) as executor:
+                    list(executor.map(fetch, parts))
+        finally:
+            os.close(fd)
+
+        fetched = sum(end - start for start, end in ranges)
+        logger.info(
+            f"Materialized {len(windows)} windows of s3://{self.bucket}/{self.key}: "
+            f"{fetched} of {self.size} sample bytes in {len(parts)} ranged GETs"
+        )
+        return self.bytes_fetched
+
+
+def open_reader(s3_client: Any, bucket: str, key: str) -> Optional[RangedMp4Reader]:
+    """A RangedMp4Reader for the object, or None (logged) when its samples cannot be located"""
+    try:
+        return RangedMp4Reader(s3_client, bucket, key)
+    except Exception as e:
+        logger.warning(f"Ranged reads unavailable for s3://{bucket}/{key}, downloading it whole: {str(e)}")
+        return None
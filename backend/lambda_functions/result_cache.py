@@ -0,0 +1,148 @@
+"""
+Result Cache - Content-addressed JSON cache for expensive AWS calls
+In-memory LRU in front of an optional local directory (Lambda /tmp survives
+warm invocations) or S3 prefix (survives cold starts and retries), keyed by a
+hash of the request content
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+def content_key(*parts: str) -> str:
+    """Stable SHA-256 key over the given request parts"""
+    digest = hashlib.sha256()
+    for part in parts:
+        encoded = part.encode('utf-8')
+        digest.update(str(len(encoded)).encode('ascii') + b':')
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Thread-safe content-addressed cache of JSON-serializable results
+
+    The memory tier holds up to `max_entries` items with LRU eviction. When a
+    directory is given, entries are also written there as <key>.json and the
+    oldest files are pruned once the directory exceeds `max_entries`.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_entries: int = 1024):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._memory: 'OrderedDict[str, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.json')
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+
+        value = None
+        if self.directory:
+            try:
+                with open(self._path(key), 'r', encoding='utf-8') as f:
+                    value = json.load(f)
+                os.utime(self._path(key))
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable cache entry {key}: {str(e)}")
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, value)
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._remember(key, value)
+        if self.directory:
+            try:
+                temp_path = f'{self._path(key)}.{threading.get_ident()}.tmp'
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(value, f)
+                os.replace(temp_path, self._path(key))
+                self._prune_directory()
+            except Exception as e:
+                logger.warning(f"Could not persist cache entry {key}: {str(e)}")
+
+    def _remember(self, key: str, value: Any) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _prune_directory(self) -> None:
+        entries = [entry for entry in os.scandir(self.directory) if entry.name.endswith('.json')]
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+
+class S3ResultCache:
+    """
+    Content-addressed JSON cache stored as <prefix><key>.json objects in S3
+
+    Same get/put interface as ResultCache. Lifetime is left to the bucket's
+    lifecycle rules; read and write failures are logged and treated as misses.
+    """
+
+    def __init__(self, s3_client: Any, bucket: str, prefix: str = 'cache/'):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, key: str) -> str:
+        return f'{self.prefix}{key}.json'
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket, Key=self._key(key))
+            value = json.loads(response['Body'].read().decode('utf-8'))
+            self.hits += 1
+            return value
+        except Exception as e:
+            if getattr(e, 'response', {}).get('Error', {}).get('Code') not in ('NoSuchKey', '404'):
+                logger.warning(f"Ignoring unreadable S3 cache entry {key}: {str(e)}")
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Any) -> None:
+        try:
+            self.s3_client.put_object(
+                Bucket=self.bucket,
+                Key=self._key(key),
+                Body=json.dumps(value).encode('utf-8'),
+                ContentType='application/json'
+            )
+        except Exception as e:
+            logger.warning(f"Could not persist S3 cache entry {key}: {str(e)}")
@@ -0,0 +1,155 @@
+"""
+Sentiment Pipeline - Full-coverage Comprehend sentiment for examiner speech
+Packs segments into BatchDetectSentiment requests, sends them concurrently
+with retry/backoff, and returns a per-segment sentiment timeline
+"""
+
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Callable, Sequence
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# BatchDetectSentiment limits
+MAX_BATCH_DOCUMENTS = 25
+MAX_DOCUMENT_BYTES = 5000
+
+RETRYABLE_ERROR_CODES = {
+    'ThrottlingException', 'TooManyRequestsException', 'InternalServerException',
+    'ServiceUnavailableException', 'RequestLimitExceeded'
+}
+
+
+def truncate_utf8(text: str, max_bytes: int = MAX_DOCUMENT_BYTES) -> str:
+    """Trim text to at most max_bytes of UTF-8 without splitting a character"""
+    encoded = text.encode('utf-8')
+    if len(encoded) <= max_bytes:
+        return text
+    return encoded[:max_bytes].decode('utf-8', errors='ignore')
+
+
+def _error_code(error: Exception) -> str:
+    return getattr(error, 'response', {}).get('Error', {}).get('Code', '')
+
+
+class SentimentPipeline:
+    """Batched, concurrent sentiment scoring against a Comprehend-compatible client"""
+
+    def __init__(
+        self,
+        client: Any,
+        max_workers: int = 4,
+        max_retries: int = 5,
+        base_delay: float = 0.2,
+        language_code: str = 'en',
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        self.client = client
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.language_code = language_code
+        self._sleep = sleep
+        self.stats = {'requests': 0, 'retries': 0, 'failed_documents': 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += n
+
+    def _backoff(self, attempt: int) -> None:
+        # Full jitter keeps concurrent workers from retrying in lockstep
+        self._sleep(random.uniform(0, self.base_delay * (2 ** attempt)))
+
+    def _send_batch(self, documents: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Score one batch, retrying throttles and per-document transient errors"""
+        results: List[Optional[Dict[str, Any]]] = [None] * len(documents)
+        pending = list(range(len(documents)))
+        attempt = 0
+
+        while pending:
+            try:
+                self._count('requests')
+                response = self.client.batch_detect_sentiment(
+                    TextList=[documents[i] for i in pending],
+                    LanguageCode=self.language_code
+                )
+            except Exception as e:
+                if _error_code(e) not in RETRYABLE_ERROR_CODES or attempt >= self.max_retries:
+                    logger.error(f"Comprehend batch failed after {attempt} retries: {str(e)}")
+                    self._count('failed_documents', len(pending))
+                    return results
+                self._count('retries')
+                self._backoff(attempt)
+                attempt += 1
+                continue
+
+            for result in response.get('ResultList', []):
+                results[pending[result['Index']]] = {
+                    'sentiment': result.get('Sentiment'),
+                    'scores': result.get('SentimentScore', {})
+                }
+
+            retry = []
+            for error in response.get('ErrorList', []):
+                if error.get('ErrorCode') in RETRYABLE_ERROR_CODES:
+                    retry.append(pending[error['Index']])
+                else:
+                    self._count('failed_documents')
+            if retry and attempt >= self.max_retries:
+                self._count('failed_documents', len(retry))
+                retry = []
+            if retry:
+                self._count('retries')
+                self._backoff(attempt)
+                attempt += 1
+            pending = retry
+
+        return results
+
+    def score(self, texts: Sequence[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Sentiment for every text, in input order
+
+        Empty texts and documents that still fail after retries yield None.
+        """
+        documents = [truncate_utf8(text) for text in texts]
+        scorable = [i for i, document in enumerate(documents) if document.strip()]
+        batches = [scorable[i:i + MAX_BATCH_DOCUMENTS] for i in range(0, len(scorable), MAX_BATCH_DOCUMENTS)]
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(documents)
+        if not batches:
+            return results
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+            batch_results = executor.map(lambda batch: self._send_batch([documents[i] for i in batch]), batches)
+            for batch, scored in zip(batches, batch_results):
+                for i, result in zip(batch, scored):
+                    results[i] = result
+
+        logger.info(
+            f"Scored {len(scorable)} documents in {len(batches)} batches "
+            f"({self.stats['retries']} retries, {self.stats['failed_documents']} failed)"
+        )
+        return results
+
+    def timeline(self, index: Any, segment_ids: Sequence[int]) -> List[Dict[str, Any]]:
+        """Per-segment sentiment timeline for the given TranscriptIndex segments"""
+        texts = [index.segment_text(i) for i in segment_ids]
+        timeline = []
+        for segment_id, text, result in zip(segment_ids, texts, self.score(texts)):
+            if result is None:
+                continue
+            timeline.append({
+                'segment_index': segment_id,
+                'timestamp': index.segment_starts[segment_id],
+                'end_time': index.segment_ends[segment_id],
+                'sentiment': result['sentiment'],
+                'scores': result['scores'],
+                'text': text
+            })
+        return timeline
@@ -0,0 +1,114 @@
+"""
+Speaker Roles - One-pass examiner identification for diarized transcripts
+Transcribe numbers speakers in order of appearance, so the examiner is not
+reliably spk_0; this picks the examiner from how each speaker talks
+"""
+
+import logging
+from typing import Dict, Any, List, Optional
+
+from text_matcher import KeywordAutomaton, TaxonomyMatcher, KIND_DECLARATION
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Openers of examiner questions ("does that hurt", "can you bend forward")
+QUESTION_OPENERS = {
+    'do', 'does', 'did', 'can', 'could', 'how', 'what', 'where', 'when', 'which', 'why',
+    'is', 'are', 'was', 'were', 'have', 'has', 'any', 'would', 'will'
+}
+
+# Instructions an examiner gives during the physical exam
+IMPERATIVE_PHRASES = [
+    'lift your', 'raise your', 'bend', 'push against', 'pull against', 'squeeze', 'relax',
+    'stand up', 'sit down', 'lie down', 'lie on', 'turn your', 'look at', 'follow my', 'close your eyes',
+    'walk to', 'walk on', 'point to', 'tell me', 'let me know', 'try to', 'hold it', 'resist',
+    'take a deep breath', 'straighten', 'keep your', 'go ahead'
+]
+
+# Relative weight of each per-speaker feature; each is scaled to the largest speaker's value
+FEATURE_WEIGHTS = {
+    'taxonomy_density': 0.35,
+    'imperative_rate': 0.3,
+    'question_rate': 0.25,
+    'talk_share': 0.1
+}
+
+# Pseudo-segments added to rate denominators so a speaker with two short
+# turns ("okay", "is that right") cannot top a rate by chance
+RATE_PRIOR_SEGMENTS = 5
+
+
+class SpeakerRoleResolver:
+    """Works out which diarization label is the examiner in one pass over segments"""
+
+    def __init__(self, test_matcher: TaxonomyMatcher, imperative_phrases: Optional[List[str]] = None):
+        self.test_matcher = test_matcher
+        self.imperatives = KeywordAutomaton(imperative_phrases or IMPERATIVE_PHRASES)
+
+    def resolve(self, index: Any) -> Dict[str, Any]:
+        """
+        Per-speaker features and the chosen examiner label
+
+        Returns:
+            {'examiner': label or None, 'confidence': margin over the runner-up
+             (0-1), 'speakers': {label: {segments, talk_time, words, question_rate,
+             imperative_rate, taxonomy_density, score}}}
+        """
+        stats: Dict[str, Dict[str, float]] = {}
+        for i in range(len(index)):
+            speaker, start_time, end_time = index.segment(i)
+            text = index.segment_text(i).lower()
+            speaker_stats = stats.get(speaker)
+            if speaker_stats is None:
+                speaker_stats = stats[speaker] = {
+                    'segments': 0, 'talk_time': 0.0, 'words': 0, 'questions': 0, 'imperatives': 0, 'taxonomy_hits': 0
+                }
+            speaker_stats['segments'] += 1
+            speaker_stats['talk_time'] += max(end_time - start_time, 0.0)
+            speaker_stats['words'] += index.segment_word_hi[i] - index.segment_word_lo[i]
+            if text.split(' ', 1)[0] in QUESTION_OPENERS:
+                speaker_stats['questions'] += 1
+            if self.imperatives.find_all(text):
+                speaker_stats['imperatives'] += 1
+            speaker_stats['taxonomy_hits'] += sum(
+                1 for hit in self.test_matcher.scan(text) if hit[2] != KIND_DECLARATION
+            )
+
+        total_talk = sum(s['talk_time'] for s in stats.values()) or 1.0
+        features = {}
+        for speaker, s in stats.items():
+            features[speaker] = {
+                'talk_share': s['talk_time'] / total_talk,
+                'question_rate': s['questions'] / (s['segments'] + RATE_PRIOR_SEGMENTS),
+                'imperative_rate': s['imperatives'] / (s['segments'] + RATE_PRIOR_SEGMENTS),
+                'taxonomy_density': s['taxonomy_hits'] / (s['words'] + RATE_PRIOR_SEGMENTS * 10)
+            }
+
+        scale = {
+            name: max((f[name] for f in features.values()), default=0.0) or 1.0 for name in FEATURE_WEIGHTS
+        }
+        speakers = {}
+        for speaker, f in features.items():
+            score = sum(weight * f[name] / scale[name] for name, weight in FEATURE_WEIGHTS.items())
+            speakers[speaker] = {
+                'segments': int(stats[speaker]['segments']),
+                'talk_time': round(stats[speaker]['talk_time'], 2),
+                'words': int(stats[speaker]['words']),
+                'question_rate': round(f['question_rate'], 4),
+                'imperative_rate': round(f['imperative_rate'], 4),
+                'taxonomy_density': round(f['taxonomy_density'], 4),
+                'score': round(score, 4)
+            }
+
+        # Highest score wins; label order breaks ties deterministically
+        ranked = sorted(speakers, key=lambda label: (-speakers[label]['score'], label))
+        examiner = ranked[0] if ranked else None
+        confidence = 0.0
+        if len(ranked) == 1:
+            confidence = 1.0
+        elif ranked:
+            confidence = round(speakers[ranked[0]]['score'] - speakers[ranked[1]]['score'], 4)
+
+        logger.info(f"Resolved examiner speaker {examiner} (margin {confidence}) among {len(speakers)} speakers")
+        return {'examiner': examiner, 'confidence': confidence, 'speakers': speakers}
@@ -0,0 +1,163 @@
+"""
+Taxonomy Artifact - Prebuilt matcher tables for the test taxonomy and demeanor lexicon
+Generated at packaging time from test_taxonomy.py and loaded by the Lambdas at
+import, so a cold start reads finished automaton tables instead of compiling
+the taxonomy. A missing or stale artifact is rebuilt in-process.
+
+Build (run before packaging the Lambda code):
+
+    python backend/lambda_functions/taxonomy_artifact.py
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from typing import Dict, Any, List, Optional
+
+from demeanor_lexicon import DemeanorLexicon
+from result_cache import content_key
+from test_taxonomy import TEST_TAXONOMY, DECLARATION_PHRASES, DEFAULT_DEMEANOR_LEXICON
+from text_matcher import TaxonomyMatcher
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+ARTIFACT_FORMAT = 'cme-taxonomy-artifact/1'
+DEFAULT_ARTIFACT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'taxonomy_artifact.json')
+
+
+def taxonomy_version(taxonomy: Dict[str, Dict[str, Any]], declaration_phrases: List[str]) -> str:
+    """Changes whenever a test, keyword, pattern or declaration phrase changes"""
+    return content_key(
+        json.dumps(taxonomy, sort_keys=True),
+        json.dumps(declaration_phrases)
+    )[:16]
+
+
+def source_version(
+    taxonomy: Dict[str, Dict[str, Any]],
+    declaration_phrases: List[str],
+    demeanor_lexicon: Dict[str, Any]
+) -> str:
+    """Version of everything an artifact is built from, including its own format"""
+    return content_key(
+        ARTIFACT_FORMAT,
+        taxonomy_version(taxonomy, declaration_phrases),
+        json.dumps(demeanor_lexicon, sort_keys=True)
+    )[:16]
+
+
+class TaxonomyArtifact:
+    """Compiled test matcher and demeanor lexicon with the versions they were built from"""
+
+    def __init__(
+        self,
+        test_matcher: TaxonomyMatcher,
+        demeanor_lexicon: DemeanorLexicon,
+        taxonomy_version: str,
+        version: str,
+        source: str
+    ):
+        self.test_matcher = test_matcher
+        self.demeanor_lexicon = demeanor_lexicon
+        self.taxonomy_version = taxonomy_version
+        self.version = version
+        self.source = source
+
+    @classmethod
+    def build(
+        cls,
+        taxonomy: Dict[str, Dict[str, Any]] = TEST_TAXONOMY,
+        declaration_phrases: List[str] = DECLARATION_PHRASES,
+        demeanor_lexicon: Dict[str, Any] = DEFAULT_DEMEANOR_LEXICON
+    ) -> 'TaxonomyArtifact':
+        """Compile the matchers from their definitions"""
+        return cls(
+            test_matcher=TaxonomyMatcher(taxonomy, declaration_phrases),
+            demeanor_lexicon=DemeanorLexicon(demeanor_lexicon),
+            taxonomy_version=taxonomy_version(taxonomy, declaration_phrases),
+            version=source_version(taxonomy, declaration_phrases, demeanor_lexicon),
+            source='built'
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'format': ARTIFACT_FORMAT,
+            'version': self.version,
+            'taxonomy_version': self.taxonomy_version,
+            'test_matcher': self.test_matcher.to_tables(),
+            'demeanor_lexicon': self.demeanor_lexicon.to_tables()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], source: str = 'artifact') -> 'TaxonomyArtifact':
+        if data.get('format') != ARTIFACT_FORMAT:
+            raise ValueError(f"Unsupported taxonomy artifact format {data.get('format')}")
+        return cls(
+            test_matcher=TaxonomyMatcher.from_tables(data['test_matcher']),
+            demeanor_lexicon=DemeanorLexicon.from_tables(data['demeanor_lexicon']),
+            taxonomy_version=data['taxonomy_version'],
+            version=data['version'],
+            source=source
+        )
+
+    def save(self, path: str = DEFAULT_ARTIFACT_PATH) -> int:
+        """Write the artifact as compact JSON; returns its size in bytes"""
+        data = json.dumps(self.to_dict(), separators=(',', ':')).encode('utf-8')
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        return len(data)
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> 'TaxonomyArtifact':
+        """
+        Load the prebuilt artifact, rebuilding in-process if it is missing,
+        unreadable or was built from different definitions than the code holds
+        """
+        path = path or DEFAULT_ARTIFACT_PATH
+        expected = source_version(TEST_TAXONOMY, DECLARATION_PHRASES, DEFAULT_DEMEANOR_LEXICON)
+        try:
+            with open(path, 'rb') as f:
+                data = json.loads(f.read())
+            if data.get('version') != expected:
+                logger.warning(
+                    f"Taxonomy artifact {path} is version {data.get('version')}, expected {expected}; rebuilding"
+                )
+            else:
+                return cls.from_dict(data, source=path)
+        except FileNotFoundError:
+            logger.warning(f"Taxonomy artifact {path} not found; rebuilding")
+        except Exception as e:
+            logger.error(f"Error loading taxonomy artifact {path}, rebuilding: {str(e)}")
+        return cls.build()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Build the precompiled taxonomy artifact')
+    parser.add_argument('--out', default=DEFAULT_ARTIFACT_PATH, help='Artifact path')
+    parser.add_argument('--check', action='store_true', help='Exit 1 if the artifact at --out is stale')
+    args = parser.parse_args()
+
+    expected = source_version(TEST_TAXONOMY, DECLARATION_PHRASES, DEFAULT_DEMEANOR_LEXICON)
+    if args.check:
+        try:
+            with open(args.out, 'rb') as f:
+                version = json.loads(f.read()).get('version')
+        except (OSError, ValueError):
+            version = None
+        print(f'{args.out}: version {version}, expected {expected}')
+        return 0 if version == expected else 1
+
+    artifact = TaxonomyArtifact.build()
+    size = artifact.save(args.out)
+    print(f'Wrote {args.out}: version {artifact.version}, {size} bytes, '
+          f'{len(artifact.test_matcher.labels)} tests, {artifact.demeanor_lexicon.term_count} demeanor terms')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Test Episodes - Consolidate repeated test declarations before video analysis
+An examiner usually names a test several times while performing it; each
+mention would otherwise become its own video segment and Rekognition jobs
+"""
+
+import logging
+from typing import Dict, Any, List
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+def consolidate_declared_tests(
+    declared_tests: List[Dict[str, Any]],
+    tolerance_seconds: float = 60.0,
+    max_span_seconds: float = 300.0
+) -> List[Dict[str, Any]]:
+    """
+    Merge same-label declarations into test episodes
+
+    A mention joins the open episode for its label when it starts within
+    `tolerance_seconds` of the previous mention and the episode would not
+    span more than `max_span_seconds`. Each episode is the first mention's
+    test dict (so downstream consumers keep working) plus:
+
+        episode_start / episode_end   first and last mention timestamps
+        mention_count                 declarations merged into the episode
+        mention_timestamps            their timestamps, in order
+        declared_step_ids             their DynamoDB ids, when persisted
+        confidence                    highest confidence among the mentions
+
+    Episodes are returned in order of episode_start.
+    """
+    by_label: Dict[str, List[Dict[str, Any]]] = {}
+    for test in sorted(declared_tests, key=lambda test: float(test.get('timestamp', 0))):
+        by_label.setdefault(test.get('label', 'unknown'), []).append(test)
+
+    episodes = []
+    for mentions in by_label.values():
+        episode = None
+        for test in mentions:
+            timestamp = float(test.get('timestamp', 0))
+            if (episode is not None
+                    and timestamp - episode['episode_end'] <= tolerance_seconds
+                    and timestamp - episode['episode_start'] <= max_span_seconds):
+                episode['episode_end'] = timestamp
+                episode['mention_count'] += 1
+                episode['mention_timestamps'].append(timestamp)
+                if test.get('declared_step_id'):
+                    episode['declared_step_ids'].append(test['declared_step_id'])
+                episode['confidence'] = max(episode['confidence'], test.get('confidence', 0.0))
+                continue
+
+            episode = {
+                **test,
+                'episode_start': timestamp,
+                'episode_end': timestamp,
+                'mention_count': 1,
+                'mention_timestamps': [timestamp],
+                'declared_step_ids': [test['declared_step_id']] if test.get('declared_step_id') else [],
+                'confidence': test.get('confidence', 0.0)
+            }
+            episodes.append(episode)
+
+    episodes.sort(key=lambda episode: (episode['episode_start'], episode.get('label', '')))
+    logger.info(f"Consolidated {len(declared_tests)} declared tests into {len(episodes)} test episodes")
+    return episodes
+
+
+# What the segmenter and the video Map read from an episode; everything else
+# (the mention's window transcript text above all) stays out of the Step
+# Functions state and its 256 KB payload limit
+EPISODE_FIELDS = (
+    'label', 'timestamp', 'confidence', 'speaker', 'source', 'declared_step_id',
+    'episode_start', 'episode_end', 'mention_count', 'mention_timestamps', 'declared_step_ids'
+)
+
+
+def episode_payload(episode: Dict[str, Any]) -> Dict[str, Any]:
+    """The fields of an episode that travel through the pipeline state"""
+    return {field: episode[field] for field in EPISODE_FIELDS if field in episode}
+
+
+def episode_metrics(declared_tests: List[Dict[str, Any]], episodes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Fan-out saved by consolidation: one video job per episode instead of per declaration"""
+    return {
+        'declared_tests': len(declared_tests),
+        'test_episodes': len(episodes),
+        'video_jobs_avoided': len(declared_tests) - len(episodes),
+        'max_mentions_per_episode': max((episode['mention_count'] for episode in episodes), default=0)
+    }
@@ -0,0 +1,670 @@
+"""
+Test Taxonomy - Shared test and demeanor definitions for every Lambda
+Detection keywords and patterns, the motion each test is expected to show on
+video, declaration phrases and the built-in demeanor lexicon live here so the
+NLP processor, video processor and taxonomy artifact build read one source
+"""
+
+# Comprehensive Medical Test Taxonomy for CME/IME Detection
+# Based on common physical examination tests in medico-legal contexts
+TEST_TAXONOMY = {
+    'range_of_motion': {
+        'keywords': ['range of motion', 'rom', 'flexion', 'extension', 'limited', 'measured in degrees', 'restricted'],
+        'patterns': [
+            r'range\s+of\s+motion\s+(?:was\s+)?measured',
+            r'(?:flexion|extension)\s+(?:were|was)\s+limited',
+            r'rom\s+(?:is\s+)?restricted',
+            r'limited\s+(?:in\s+)?all\s+planes'
+        ],
+        'category': 'orthopedic',
+        'priority': 'high'
+    },
+    'straight_leg_raise': {
+        'keywords': ['straight leg raise', 'slr', 'positive at', 'negative straight', 'lasegue'],
+        'patterns': [
+            r'straight\s+leg\s+raise\s+(?:was\s+)?positive',
+            r'slr\s+(?:positive|negative)',
+            r'negative\s+straight[-\s]leg\s+raise'
+        ],
+        'category': 'orthopedic',
+        'priority': 'high'
+    },
+    'cross_straight_leg_raise': {
+        'keywords': ['crossed straight', 'contralateral', 'well leg raise', 'opposite leg'],
+        'patterns': [
+            r'crossed\s+straight[-\s]leg\s+raise',
+            r'contralateral\s+slr',
+            r'well\s+leg\s+raise',
+            r'positive\s+(?:well\s+leg|contralateral)'
+        ],
+        'category': 'orthopedic',
+        'priority': 'medium'
+    },
+    'faber_test': {
+        'keywords': ['faber', 'patrick', 'figure-4', 'si joint', 'hip pain'],
+        'patterns': [
+            r'faber\s+test',
+            r'patrick[\'s]*\s+test',
+            r'figure[-\s]4\s+position'
+        ],
+        'category': 'orthopedic',
+        'priority': 'medium'
+    },
+    'spurlings_test': {
+        'keywords': ['spurling', 'foraminal compression', 'radicular pain', 'neck'],
+        'patterns': [
+            r'spurling[\'s]*\s+(?:test|maneuver)',
+            r'foraminal\s+compression',
+            r'radicular\s+pain'
+        ],
+        'category': 'orthopedic',
+        'priority': 'medium'
+    },
+    'drop_arm_test': {
+        'keywords': ['drop arm', 'rotator cuff', 'lower the arm', '90° abduction'],
+        'patterns': [
+            r'drop\s+arm\s+test',
+            r'unable\s+to\s+(?:smoothly\s+)?lower\s+(?:the\s+)?arm',
+            r'arm\s+drops?\s+suddenly'
+        ],
+        'category': 'orthopedic',
+        'priority': 'medium'
+    },
+    'hawkins_kennedy_test': {
+        'keywords': ['hawkins', 'kennedy', 'impingement', 'shoulder pain', 'internally rotate'],
+        'patterns': [
+            r'hawkins[-\s]kennedy\s+test',
+            r'hawkins\s+impingement',
+            r'internal(?:ly)?\s+rotat(?:e|ion)'
+        ],
+        'category': 'orthopedic',
+        'priority': 'medium'
+    },
+    'neer_test': {
+        'keywords': ['neer', 'impingement', 'forward flexion', 'overhead'],
+        'patterns': [
+            r'neer[\'s]*\s+(?:test|sign)',
+            r'neer\s+impingement',
+            r'forced\s+forward\s+flexion'
+        ],
+        'category': 'orthopedic',
+        'priority': 'medium'
+    },
+    'lachman_test': {
+        'keywords': ['lachman', 'acl', 'anterior translation', 'soft endpoint', 'knee'],
+        'patterns': [
+            r'lachman\s+test',
+            r'acl\s+(?:tear|laxity)',
+            r'anterior\s+translation',
+            r'soft\s+endpoint'
+        ],
+        'category': 'orthopedic',
+        'priority': 'medium'
+    },
+    'mcmurray_test': {
+        'keywords': ['mcmurray', 'meniscus', 'click', 'knee', 'joint line'],
+        'patterns': [
+            r'mcmurray[\'s]*\s+test',
+            r'meniscal\s+tear',
+            r'click\s+(?:in\s+)?(?:the\s+)?knee'
+        ],
+        'category': 'orthopedic',
+        'priority': 'medium'
+    },
+    'phalens_test': {
+        'keywords': ['phalen', 'carpal tunnel', 'wrist flexion', 'tingling', 'fingers'],
+        'patterns': [
+            r'phalen[\'s]*\s+(?:test|maneuver)',
+            r'carpal\s+tunnel',
+            r'wrist\s+flexion',
+            r'tingling\s+(?:in\s+)?fingers'
+        ],
+        'category': 'orthopedic',
+        'priority': 'medium'
+    },
+    'tinels_sign': {
+        'keywords': ['tinel', 'tapping', 'nerve', 'tingling', 'pins and needles'],
+        'patterns': [
+            r'tinel[\'s]*\s+sign',
+            r'tapping\s+over\s+(?:the\s+)?(?:median|ulnar)\s+nerve',
+            r'pins\s+and\s+needles'
+        ],
+        'category': 'orthopedic',
+        'priority': 'medium'
+    },
+    'trendelenburg_sign': {
+        'keywords': ['trendelenburg', 'pelvic drop', 'hip abductor', 'one leg'],
+        'patterns': [
+            r'trendelenburg\s+sign',
+            r'pelvic\s+drop',
+            r'standing\s+on\s+one\s+leg'
+        ],
+        'category': 'orthopedic',
+        'priority': 'medium'
+    },
+    'deep_tendon_reflexes': {
+        'keywords': ['deep tendon', 'dtr', 'reflex', 'patellar', 'achilles', 'biceps', 'triceps', '2+', 'brisk', 'absent'],
+        'patterns': [
+            r'deep\s+tendon\s+reflex(?:es)?',
+            r'dtr[s]*',
+            r'(?:patellar|achilles|biceps|triceps)\s+reflex',
+            r'reflex(?:es)?\s+(?:\d\+|brisk|absent|diminished)'
+        ],
+        'category': 'neurological',
+        'priority': 'high'
+    },
+    'babinski_sign': {
+        'keywords': ['babinski', 'plantar response', 'upgoing toe', 'downgoing', 'extensor'],
+        'patterns': [
+            r'babinski\s+sign',
+            r'plantar\s+response',
+            r'(?:upgoing|downgoing)\s+toe',
+            r'extensor\s+plantar'
+        ],
+        'category': 'neurological',
+        'priority': 'medium'
+    },
+    'hoffmanns_sign': {
+        'keywords': ['hoffmann', 'flick', 'middle finger', 'thumb flexion', 'cervical'],
+        'patterns': [
+            r'hoffmann[\'s]*\s+(?:sign|reflex)',
+            r'flick(?:ing)?\s+(?:the\s+)?middle\s+finger'
+        ],
+        'category': 'neurological',
+        'priority': 'medium'
+    },
+    'clonus_test': {
+        'keywords': ['clonus', 'ankle', 'sustained', 'beats', 'rhythmic'],
+        'patterns': [
+            r'clonus\s+(?:present|noted|absent)',
+            r'sustained\s+clonus',
+            r'beats\s+of\s+clonus'
+        ],
+        'category': 'neurological',
+        'priority': 'medium'
+    },
+    'romberg_test': {
+        'keywords': ['romberg', 'balance', 'eyes closed', 'sway', 'proprioception'],
+        'patterns': [
+            r'romberg\s+(?:test|sign)',
+            r'balance\s+with\s+eyes\s+closed',
+            r'increased\s+sway'
+        ],
+        'category': 'neurological',
+        'priority': 'medium'
+    },
+    'light_touch_sensation': {
+        'keywords': ['light touch', 'sensation', 'intact', 'decreased', 'dermatome'],
+        'patterns': [
+            r'light\s+touch\s+sensation',
+            r'sensation\s+(?:is\s+)?intact',
+            r'decreased\s+(?:light\s+)?touch'
+        ],
+        'category': 'sensory',
+        'priority': 'high'
+    },
+    'pinprick_sensation': {
+        'keywords': ['pinprick', 'sharp', 'dull', 'pin sensation', 'discrimination'],
+        'patterns': [
+            r'pinprick\s+sensation',
+            r'sharp[/\s]dull',
+            r'pin\s+sensation',
+            r'sharp[/\s]dull\s+discrimination'
+        ],
+        'category': 'sensory',
+        'priority': 'high'
+    },
+    'vibration_sense': {
+        'keywords': ['vibration', 'tuning fork', 'vibratory', 'great toe', 'malleolus'],
+        'patterns': [
+            r'vibration\s+sense',
+            r'vibratory\s+sensation',
+            r'tuning\s+fork'
+        ],
+        'category': 'sensory',
+        'priority': 'medium'
+    },
+    'proprioception': {
+        'keywords': ['proprioception', 'joint position', 'position sense', 'up or down'],
+        'patterns': [
+            r'proprioception\s+test',
+            r'joint\s+position\s+sense',
+            r'position\s+sense'
+        ],
+        'category': 'sensory',
+        'priority': 'medium'
+    },
+    'gait_observation': {
+        'keywords': ['gait', 'antalgic', 'limping', 'walking', 'stride', 'assistive device'],
+        'patterns': [
+            r'gait\s+(?:was|is)\s+(?:antalgic|normal|abnormal)',
+            r'limp(?:ing)?\s+noted',
+            r'walking\s+(?:with|without)\s+(?:assistive\s+)?device'
+        ],
+        'category': 'functional',
+        'priority': 'high'
+    },
+    'heel_walking': {
+        'keywords': ['heel walk', 'walk on heels', 'dorsiflexor', 'tibialis anterior'],
+        'patterns': [
+            r'heel\s+walk(?:ing)?',
+            r'walk(?:ing)?\s+on\s+heels',
+            r'(?:able|unable)\s+to\s+walk\s+on\s+heels'
+        ],
+        'category': 'functional',
+        'priority': 'high'
+    },
+    'toe_walking': {
+        'keywords': ['toe walk', 'walk on toes', 'plantarflexor', 'calf', 'tiptoes'],
+        'patterns': [
+            r'toe\s+walk(?:ing)?',
+            r'walk(?:ing)?\s+on\s+toes',
+            r'(?:able|unable)\s+to\s+walk\s+on\s+toes',
+            r'tiptoes'
+        ],
+        'category': 'functional',
+        'priority': 'high'
+    },
+    'tandem_gait': {
+        'keywords': ['tandem', 'heel-to-toe', 'balance', 'straight line'],
+        'patterns': [
+            r'tandem\s+(?:gait|walk)',
+            r'heel[-\s]to[-\s]toe',
+            r'walk(?:ing)?\s+(?:in\s+)?(?:a\s+)?straight\s+line'
+        ],
+        'category': 'functional',
+        'priority': 'medium'
+    },
+    'sit_to_stand': {
+        'keywords': ['sit to stand', 'rise from', 'seated position', 'chair', 'arm support'],
+        'patterns': [
+            r'sit[-\s]to[-\s]stand',
+            r'ris(?:e|ing)\s+from\s+(?:seated|chair)',
+            r'(?:needs|uses)\s+arm\s+support'
+        ],
+        'category': 'functional',
+        'priority': 'medium'
+    },
+    'stair_climb': {
+        'keywords': ['stair', 'climb', 'ascend', 'descend', 'step', 'railing'],
+        'patterns': [
+            r'stair\s+climb',
+            r'ascend(?:s|ing)?\s+(?:and\s+)?descend',
+            r'step\s+up\s+and\s+down',
+            r'uses?\s+railing'
+        ],
+        'category': 'functional',
+        'priority': 'medium'
+    },
+    'squat_and_rise': {
+        'keywords': ['squat', 'rise', 'full squat', 'knee flexion', 'difficulty'],
+        'patterns': [
+            r'squat\s+(?:and\s+)?rise',
+            r'full\s+squat',
+            r'half[-\s]squat',
+            r'difficulty\s+squatting'
+        ],
+        'category': 'functional',
+        'priority': 'medium'
+    },
+    'axial_loading': {
+        'keywords': ['axial loading', 'axial compression', 'downward pressure', 'skull', 'non-organic'],
+        'patterns': [
+            r'axial\s+loading',
+            r'axial\s+compression',
+            r'downward\s+pressure\s+on\s+(?:the\s+)?head',
+            r'non[-\s]organic\s+finding'
+        ],
+        'category': 'simulation',
+        'priority': 'high'
+    },
+    'simulated_rotation': {
+        'keywords': ['simulated rotation', 'en bloc', 'trunk rotation', 'shoulders and pelvis', 'non-organic'],
+        'patterns': [
+            r'simulated\s+rotation',
+            r'en\s+bloc\s+(?:rotation|trunk)',
+            r'rotating?\s+shoulders\s+and\s+pelvis'
+        ],
+        'category': 'simulation',
+        'priority': 'high'
+    },
+    'superficial_tenderness': {
+        'keywords': ['superficial tenderness', 'light touch', 'widespread', 'non-anatomic'],
+        'patterns': [
+            r'superficial\s+tenderness',
+            r'widespread\s+tenderness',
+            r'light\s+touch\s+(?:causes|elicits)\s+pain'
+        ],
+        'category': 'simulation',
+        'priority': 'high'
+    },
+    'non_anatomic_tenderness': {
+        'keywords': ['non-anatomic', 'diffuse', 'broad area', 'not localized'],
+        'patterns': [
+            r'non[-\s]anatomic\s+tenderness',
+            r'diffuse\s+(?:pain|tenderness)',
+            r'broad\s+area'
+        ],
+        'category': 'simulation',
+        'priority': 'high'
+    },
+    'distracted_slr': {
+        'keywords': ['distracted', 'flip test', 'inconsistent', 'seated', 'supine slr'],
+        'patterns': [
+            r'distracted\s+(?:straight\s+leg|slr)',
+            r'flip\s+test',
+            r'inconsistent\s+(?:straight\s+leg|slr)',
+            r'seated\s+(?:vs\s+)?supine'
+        ],
+        'category': 'simulation',
+        'priority': 'high'
+    },
+    'give_way_weakness': {
+        'keywords': ['give-way', 'giveway', 'cogwheel', 'inconsistent effort', 'regional weakness'],
+        'patterns': [
+            r'give[-\s]way\s+weakness',
+            r'cogwheel\s+weakness',
+            r'inconsistent\s+effort',
+            r'regional\s+weakness'
+        ],
+        'category': 'simulation',
+        'priority': 'high'
+    },
+    'hoovers_test': {
+        'keywords': ['hoover', 'downward pressure', 'opposite heel', 'lack of effort'],
+        'patterns': [
+            r'hoover[\'s]*\s+(?:test|sign)',
+            r'downward\s+pressure\s+(?:from\s+)?opposite',
+            r'lack\s+of\s+effort'
+        ],
+        'category': 'simulation',
+        'priority': 'medium'
+    },
+    'manual_muscle_testing': {
+        'keywords': ['manual muscle', 'mmt', 'strength', '5/5', '4/5', 'muscle groups'],
+        'patterns': [
+            r'manual\s+muscle\s+test(?:ing)?',
+            r'mmt',
+            r'strength\s+(?:is\s+)?\d[/]\d',
+            r'\d[/]\d\s+(?:strength|weakness)'
+        ],
+        'category': 'MMT',
+        'priority': 'high'
+    }
+}
+
+# Phrases that mark speech as the examiner announcing what they are doing
+DECLARATION_PHRASES = [
+    'now we', 'let\'s', 'going to', 'want to', 'need to', 
+    'i\'m going to', 'i\'m checking', 'i need', 'we\'re going to'
+]
+
+# Demeanor analysis patterns
+NEGATIVE_TONE_INDICATORS = [
+    'that\'s ridiculous', 'you\'re lying', 'i don\'t believe', 'that\'s impossible',
+    'come on', 'really?', 'seriously?', 'you\'re exaggerating', 'that doesn\'t make sense'
+]
+
+INTERRUPTION_PATTERNS = [
+    r'stop\s+(?:talking|speaking)',
+    r'let\s+me\s+(?:speak|talk)',
+    r'don\'t\s+(?:interrupt|talk)',
+    r'be\s+quiet',
+    r'shut\s+up'
+]
+
+DISMISSIVE_PATTERNS = [
+    r'(?:doesn\'t|does\s+not)\s+matter',
+    r'not\s+important',
+    r'(?:don\'t|do\s+not)\s+care\s+about',
+    r'that\'s\s+(?:irrelevant|not\s+relevant)'
+]
+
+# Built-in demeanor lexicon; the NLP processor's CME_DEMEANOR_LEXICON replaces it with a JSON file
+DEFAULT_DEMEANOR_LEXICON = {
+    'version': 'builtin-1',
+    'categories': {
+        'negative_tone': {
+            'severity': 'high',
+            'description': 'Negative language detected: "{term}"',
+            'phrases': NEGATIVE_TONE_INDICATORS
+        },
+        'dismissive': {
+            'severity': 'medium',
+            'description': 'Dismissive language detected',
+            'patterns': DISMISSIVE_PATTERNS
+        },
+        'aggressive': {
+            'severity': 'high',
+            'description': 'Aggressive or controlling language detected',
+            'patterns': INTERRUPTION_PATTERNS
+        }
+    }
+}
+
+# Expected motion patterns for different test types - Comprehensive CME/IME Taxonomy
+TEST_MOTION_EXPECTATIONS = {
+    'range_of_motion': {
+        'expected_movements': ['flexion', 'extension', 'rotation', 'bending'],
+        'patient_motion_required': True,
+        'examiner_touch': False,
+        'description': 'Examiner measures joint/spinal movements using goniometer or visual estimate'
+    },
+    'straight_leg_raise': {
+        'expected_movements': ['leg_raise', 'hip_flexion', 'patient_supine'],
+        'patient_motion_required': True,
+        'examiner_touch': True,
+        'description': 'Examiner passively lifts straight leg while patient lies supine'
+    },
+    'cross_straight_leg_raise': {
+        'expected_movements': ['opposite_leg_raise', 'patient_supine'],
+        'patient_motion_required': True,
+        'examiner_touch': True,
+        'description': 'Examiner raises unaffected leg to elicit contralateral pain'
+    },
+    'faber_test': {
+        'expected_movements': ['hip_flexion', 'abduction', 'external_rotation', 'knee_press'],
+        'patient_motion_required': False,
+        'examiner_touch': True,
+        'description': 'Patient in figure-4 position, examiner presses down on knee'
+    },
+    'spurlings_test': {
+        'expected_movements': ['neck_extension', 'rotation', 'axial_pressure'],
+        'patient_motion_required': False,
+        'examiner_touch': True,
+        'description': 'Examiner extends/rotates neck and applies downward pressure'
+    },
+    'drop_arm_test': {
+        'expected_movements': ['arm_abduction', 'arm_lowering'],
+        'patient_motion_required': True,
+        'examiner_touch': True,
+        'description': 'Patient slowly lowers arm from 90° abduction'
+    },
+    'hawkins_kennedy_test': {
+        'expected_movements': ['shoulder_flexion', 'internal_rotation'],
+        'patient_motion_required': False,
+        'examiner_touch': True,
+        'description': 'Examiner internally rotates shoulder at 90° flexion'
+    },
+    'neer_test': {
+        'expected_movements': ['forward_flexion', 'overhead_reach'],
+        'patient_motion_required': False,
+        'examiner_touch': True,
+        'description': 'Examiner passively forward-flexes arm overhead'
+    },
+    'lachman_test': {
+        'expected_movements': ['knee_flexion', 'anterior_tibial_pull'],
+        'patient_motion_required': False,
+        'examiner_touch': True,
+        'description': 'Examiner pulls tibia forward with knee at 20-30° flexion'
+    },
+    'mcmurray_test': {
+        'expected_movements': ['knee_flexion', 'rotation', 'extension'],
+        'patient_motion_required': False,
+        'examiner_touch': True,
+        'description': 'Examiner rotates and extends knee to test meniscus'
+    },
+    'phalens_test': {
+        'expected_movements': ['wrist_flexion', 'hands_pressed'],
+        'patient_motion_required': True,
+        'examiner_touch': False,
+        'description': 'Patient flexes both wrists and holds for 30-60 seconds'
+    },
+    'tinels_sign': {
+        'expected_movements': ['tapping', 'percussion'],
+        'patient_motion_required': False,
+        'examiner_touch': True,
+        'description': 'Examiner taps over nerve path'
+    },
+    'trendelenburg_sign': {
+        'expected_movements': ['one_leg_stand', 'pelvic_observation'],
+        'patient_motion_required': True,
+        'examiner_touch': False,
+        'description': 'Patient stands on one leg, examiner observes pelvis'
+    },
+    'deep_tendon_reflexes': {
+        'expected_movements': ['hammer_tap', 'limb_movement', 'reflex_response'],
+        'patient_motion_required': False,
+        'examiner_touch': True,
+        'description': 'Examiner taps tendons with reflex hammer'
+    },
+    'babinski_sign': {
+        'expected_movements': ['sole_stroke', 'toe_movement'],
+        'patient_motion_required': False,
+        'examiner_touch': True,
+        'description': 'Examiner strokes lateral sole of foot'
+    },
+    'hoffmanns_sign': {
+        'expected_movements': ['finger_flick', 'thumb_flexion'],
+        'patient_motion_required': False,
+        'examiner_touch': True,
+        'description': 'Examiner flicks middle finger nail downward'
+    },
+    'clonus_test': {
+        'expected_movements': ['rapid_dorsiflexion', 'rhythmic_contractions'],
+        'patient_motion_required': False,
+        'examiner_touch': True,
+        'description': 'Examiner rapidly dorsiflexes foot and holds'
+    },
+    'romberg_test': {
+        'expected_movements': ['standing', 'eyes_closed', 'balance_observation'],
+        'patient_motion_required': True,
+        'examiner_touch': False,
+        'description': 'Patient stands with eyes closed, examiner observes balance'
+    },
+    'light_touch_sensation': {
+        'expected_movements': ['light_touch', 'cotton_wisp'],
+        'patient_motion_required': False,
+        'examiner_touch': True,
+        'description': 'Examiner tests sensation with cotton or light touch'
+    },
+    'pinprick_sensation': {
+        'expected_movements': ['pin_touch', 'sharp_dull_alternation'],
+        'patient_motion_required': False,
+        'examiner_touch': True,
+        'description': 'Examiner uses pin to test sharp/dull discrimination'
+    },
+    'vibration_sense': {
+        'expected_movements': ['tuning_fork_application', 'vibration_detection'],
+        'patient_motion_required': False,
+        'examiner_touch': True,
+        'description': 'Examiner applies vibrating tuning fork to bony prominences'
+    },
+    'proprioception': {
+        'expected_movements': ['joint_movement', 'position_testing'],
+        'patient_motion_required': False,
+        'examiner_touch': True,
+        'description': 'Examiner moves digit up/down, patient identifies position'
+    },
+    'gait_observation': {
+        'expected_movements': ['walking', 'stride_observation', 'limping'],
+        'patient_motion_required': True,
+        'examiner_touch': False,
+        'description': 'Examiner observes patient walking normally'
+    },
+    'heel_walking': {
+        'expected_movements': ['walking', 'heel_walk', 'toe_lift'],
+        'patient_motion_required': True,
+        'examiner_touch': False,
+        'description': 'Patient walks on heels with toes off ground'
+    },
+    'toe_walking': {
+        'expected_movements': ['walking', 'toe_walk', 'heel_lift'],
+        'patient_motion_required': True,
+        'examiner_touch': False,
+        'description': 'Patient walks on tiptoes with heels off ground'
+    },
+    'tandem_gait': {
+        'expected_movements': ['walking', 'heel_to_toe', 'balance'],
+        'patient_motion_required': True,
+        'examiner_touch': False,
+        'description': 'Patient walks heel-to-toe in straight line'
+    },
+    'sit_to_stand': {
+        'expected_movements': ['rising', 'standing', 'chair_transfer'],
+        'patient_motion_required': True,
+        'examiner_touch': False,
+        'description': 'Patient rises from seated position'
+    },
+    'stair_climb': {
+        'expected_movements': ['stepping', 'climbing', 'descending'],
+        'patient_motion_required': True,
+        'examiner_touch': False,
+        'description': 'Patient steps up and down stairs'
+    },
+    'squat_and_rise': {
+        'expected_movements': ['squatting', 'rising', 'knee_flexion'],
+        'patient_motion_required': True,
+        'examiner_touch': False,
+        'description': 'Patient squats down and stands back up'
+    },
+    'axial_loading': {
+        'expected_movements': ['downward_pressure', 'head_compression'],
+        'patient_motion_required': False,
+        'examiner_touch': True,
+        'description': 'Examiner applies downward pressure on head (Waddell sign)'
+    },
+    'simulated_rotation': {
+        'expected_movements': ['trunk_rotation', 'en_bloc_rotation'],
+        'patient_motion_required': False,
+        'examiner_touch': True,
+        'description': 'Examiner rotates shoulders and pelvis together (Waddell sign)'
+    },
+    'superficial_tenderness': {
+        'expected_movements': ['light_palpation', 'skin_pinching'],
+        'patient_motion_required': False,
+        'examiner_touch': True,
+        'description': 'Examiner lightly palpates skin (Waddell sign)'
+    },
+    'non_anatomic_tenderness': {
+        'expected_movements': ['palpation', 'pressure_application'],
+        'patient_motion_required': False,
+        'examiner_touch': True,
+        'description': 'Examiner applies pressure in non-anatomic pattern (Waddell sign)'
+    },
+    'distracted_slr': {
+        'expected_movements': ['seated_leg_extension', 'supine_slr_comparison'],
+        'patient_motion_required': True,
+        'examiner_touch': False,
+        'description': 'Compare distracted vs formal SLR (Waddell sign)'
+    },
+    'give_way_weakness': {
+        'expected_movements': ['muscle_testing', 'sudden_collapse'],
+        'patient_motion_required': True,
+        'examiner_touch': True,
+        'description': 'Patient suddenly gives way during strength testing (Waddell sign)'
+    },
+    'hoovers_test': {
+        'expected_movements': ['leg_raise', 'opposite_heel_pressure'],
+        'patient_motion_required': True,
+        'examiner_touch': False,
+        'description': 'Check for counter-pressure from opposite heel during leg raise'
+    },
+    'manual_muscle_testing': {
+        'expected_movements': ['resistance_testing', 'limb_movement', 'strength_grading'],
+        'patient_motion_required': True,
+        'examiner_touch': True,
+        'description': 'Examiner applies resistance to test muscle strength'
+    }
+}
+
@@ -0,0 +1,442 @@
+"""
+Text Matcher - Precompiled multi-pattern matching for transcript scanning
+Aho-Corasick keyword automaton with literal-anchored regexes, built once at
+module load so per-segment cost does not grow with the size of the taxonomy
+"""
+
+import re
+from typing import Dict, Any, List, Tuple, Iterable, Optional
+
+# Hit tuple layout returned by the scanners: (start, end, kind, owner_index, term_index)
+KIND_KEYWORD = 'keyword'
+KIND_PATTERN = 'pattern'
+KIND_DECLARATION = 'declaration'
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over a fixed set of literal keywords
+
+    A single left-to-right pass over the text reports every occurrence of every
+    keyword, including overlapping ones, which is exactly the set of keywords
+    for which `keyword in text` is true.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = []
+        self._ids: Dict[str, int] = {}
+        for keyword in keywords:
+            if keyword and keyword not in self._ids:
+                self._ids[keyword] = len(self.keywords)
+                self.keywords.append(keyword)
+
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+        self._build()
+
+    def keyword_id(self, keyword: str) -> Optional[int]:
+        return self._ids.get(keyword)
+
+    def to_tables(self) -> Dict[str, Any]:
+        """JSON-safe goto/fail/output tables, restored by `from_tables` without rebuilding"""
+        return {'keywords': self.keywords, 'goto': self._goto, 'fail': self._fail, 'output': self._output}
+
+    @classmethod
+    def from_tables(cls, tables: Dict[str, Any]) -> 'KeywordAutomaton':
+        automaton = cls.__new__(cls)
+        automaton.keywords = list(tables['keywords'])
+        automaton._ids = {keyword: keyword_id for keyword_id, keyword in enumerate(automaton.keywords)}
+        automaton._goto = tables['goto']
+        automaton._fail = tables['fail']
+        automaton._output = [tuple(out) for out in tables['output']]
+        return automaton
+
+    def _build(self) -> None:
+        goto, fail = self._goto, self._fail
+        outputs: List[List[int]] = [[]]
+
+        for keyword_id, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    fail.append(0)
+                    outputs.append([])
+                state = next_state
+            outputs[state].append(keyword_id)
+
+        # Breadth-first failure links; outputs are merged along the failure chain
+        # so scanning never has to follow more than one link per emitted match
+        queue = list(goto[0].values())
+        for state in queue:
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                target = goto[fallback].get(char, 0)
+                fail[next_state] = target if target != next_state else 0
+                outputs[next_state].extend(outputs[fail[next_state]])
+
+        self._output = [tuple(out) for out in outputs]
+
+    def find_all(self, text: str) -> List[Tuple[int, int, int]]:
+        """All keyword occurrences as (start, end, keyword_id)"""
+        goto, fail, output, keywords = self._goto, self._fail, self._output, self.keywords
+        hits = []
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                end = position + 1
+                for keyword_id in output[state]:
+                    hits.append((end - len(keywords[keyword_id]), end, keyword_id))
+        return hits
+
+
+_REGEX_SPECIAL = set('.^$*+?{}[]()|\\')
+_ESCAPE_CLASSES = set('dDsSwWbBAZ0123456789')
+
+
+def _split_top_level(pattern: str, separator: str = '|') -> List[str]:
+    """Split a regex on a separator that is not nested in a group or class"""
+    parts, depth, in_class, start, i = [], 0, False, 0, 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            i += 2
+            continue
+        if in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(pattern[start:i])
+            start = i + 1
+        i += 1
+    parts.append(pattern[start:])
+    return parts
+
+
+def _class_end(pattern: str, start: int) -> int:
+    """Index just past the character class opening at `start`"""
+    i = start + 1
+    if i < len(pattern) and pattern[i] == '^':
+        i += 1
+    if i < len(pattern) and pattern[i] == ']':
+        i += 1
+    while i < len(pattern) and pattern[i] != ']':
+        i += 2 if pattern[i] == '\\' else 1
+    return i + 1
+
+
+def literal_anchors(pattern: str) -> Optional[List[str]]:
+    """
+    Literal strings of which at least one must occur in any match of `pattern`
+
+    Only top-level literal runs and top-level groups whose alternatives all have
+    anchors are considered; anything fancier returns None and the pattern is
+    treated as unanchored (always evaluated). Anchors are lower-cased because
+    the matchers scan lower-cased text.
+    """
+    alternatives = _split_top_level(pattern)
+    if len(alternatives) > 1:
+        anchor_sets = [literal_anchors(alternative) for alternative in alternatives]
+        if any(anchors is None for anchors in anchor_sets):
+            return None
+        return [anchor for anchors in anchor_sets for anchor in anchors]
+
+    candidates: List[List[str]] = []
+    run: List[str] = []
+
+    def close_run():
+        if run:
+            candidates.append([''.join(run).lower()])
+            run.clear()
+
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        token_end = i + 1
+        literal = None
+        group = None
+        if char == '\\' and i + 1 < len(pattern):
+            token_end = i + 2
+            if pattern[i + 1] not in _ESCAPE_CLASSES and pattern[i + 1].isascii() and not pattern[i + 1].isalpha():
+                literal = pattern[i + 1]
+        elif char == '[':
+            token_end = _class_end(pattern, i)
+        elif char == '(':
+            depth, j = 0, i
+            while j < len(pattern):
+                if pattern[j] == '\\':
+                    j += 2
+                    continue
+                depth += pattern[j] == '('
+                depth -= pattern[j] == ')'
+                if depth == 0:
+                    break
+                j += 1
+            token_end = j + 1
+            inner = pattern[i + 1:j]
+            if inner.startswith('?:'):
+                group = inner[2:]
+            elif not inner.startswith('?'):
+                group = inner
+        elif char not in _REGEX_SPECIAL:
+            literal = char
+
+        quantifier = pattern[token_end] if token_end < len(pattern) else ''
+        optional = quantifier in ('?', '*') or pattern.startswith('{0', token_end)
+        repeated = quantifier in ('+', '{')
+
+        if literal is not None and not optional:
+            run.append(literal)
+            if repeated:
+                close_run()
+        else:
+            close_run()
+            if group is not None and not optional:
+                anchors = literal_anchors(group)
+                if anchors:
+                    candidates.append(anchors)
+        i = token_end
+        # Skip the quantifier (and a lazy/possessive suffix) that closed this token
+        if quantifier in ('?', '*', '+'):
+            i += 1
+            if i < len(pattern) and pattern[i] in '?+':
+                i += 1
+        elif quantifier == '{':
+            i = pattern.find('}', i) + 1 or len(pattern)
+            if i < len(pattern) and pattern[i] in '?+':
+                i += 1
+    close_run()
+
+    candidates = [anchors for anchors in candidates if all(anchors)]
+    if not candidates:
+        return None
+    # Prefer the most selective anchor set: the one whose shortest member is longest
+    return max(candidates, key=lambda anchors: min(len(anchor) for anchor in anchors))
+
+
+class MultiPatternMatcher:
+    """
+    Scans text once for a mixed set of literal keywords and regexes
+
+    Keywords and the literal anchors of every regex share one Aho-Corasick
+    automaton. A regex is only run when one of its anchors occurred in the
+    text, so the per-segment cost tracks the number of candidate patterns,
+    not the size of the lexicon. Every hit carries the caller's tag.
+    """
+
+    def __init__(
+        self,
+        keywords: List[Tuple[str, Any]],
+        patterns: List[Tuple[str, Any]],
+        flags: int = 0
+    ):
+        literals = [keyword for keyword, _ in keywords]
+        self.flags = flags
+        self._sources = [(pattern, tag) for pattern, tag in patterns]
+        self._patterns = [(re.compile(pattern, flags), tag) for pattern, tag in patterns]
+        pattern_anchors = [literal_anchors(pattern) for pattern, _ in patterns]
+        for anchors in pattern_anchors:
+            literals.extend(anchors or [])
+        self.automaton = KeywordAutomaton(literals)
+
+        # automaton keyword_id -> keyword tags / candidate pattern indices
+        self._keyword_tags: List[List[Any]] = [[] for _ in self.automaton.keywords]
+        self._anchored: List[List[int]] = [[] for _ in self.automaton.keywords]
+        for keyword, tag in keywords:
+            keyword_id = self.automaton.keyword_id(keyword)
+            if keyword_id is not None:
+                self._keyword_tags[keyword_id].append(tag)
+        self._unanchored = []
+        for pattern_index, anchors in enumerate(pattern_anchors):
+            if anchors is None:
+                self._unanchored.append(pattern_index)
+                continue
+            for anchor in set(anchors):
+                self._anchored[self.automaton.keyword_id(anchor)].append(pattern_index)
+
+    def to_tables(self) -> Dict[str, Any]:
+        """JSON-safe matcher state; tags must be tuples of JSON scalars"""
+        return {
+            'automaton': self.automaton.to_tables(),
+            'flags': self.flags,
+            'patterns': self._sources,
+            'keyword_tags': self._keyword_tags,
+            'anchored': self._anchored,
+            'unanchored': self._unanchored
+        }
+
+    @classmethod
+    def from_tables(cls, tables: Dict[str, Any]) -> 'MultiPatternMatcher':
+        """
+        Restore a matcher saved with `to_tables`
+
+        Tags come back as tuples. Regexes were validated when the tables were
+        built, so each one is compiled on first use instead of up front.
+        """
+        matcher = cls.__new__(cls)
+        matcher.automaton = KeywordAutomaton.from_tables(tables['automaton'])
+        matcher.flags = tables['flags']
+        matcher._sources = [(pattern, tuple(tag)) for pattern, tag in tables['patterns']]
+        matcher._patterns = [(None, tag) for _, tag in matcher._sources]
+        matcher._keyword_tags = [[tuple(tag) for tag in tags] for tags in tables['keyword_tags']]
+        matcher._anchored = tables['anchored']
+        matcher._unanchored = tables['unanchored']
+        return matcher
+
+    def _regex(self, pattern_index: int) -> Tuple[Any, Any]:
+        regex, tag = self._patterns[pattern_index]
+        if regex is None:
+            regex = re.compile(self._sources[pattern_index][0], self.flags)
+            self._patterns[pattern_index] = (regex, tag)
+        return regex, tag
+
+    def scan(self, text: str) -> List[Tuple[int, int, Any]]:
+        """Every keyword occurrence and regex match in `text` as (start, end, tag)"""
+        hits = []
+        candidates = set(self._unanchored)
+        for start, end, keyword_id in self.automaton.find_all(text):
+            for tag in self._keyword_tags[keyword_id]:
+                hits.append((start, end, tag))
+            candidates.update(self._anchored[keyword_id])
+        for pattern_index in sorted(candidates):
+            regex, tag = self._regex(pattern_index)
+            for match in regex.finditer(text):
+                hits.append((match.start(), match.end(), tag))
+        return hits
+
+
+class TaxonomyMatcher:
+    """
+    Single-pass matcher for a test taxonomy
+
+    Every keyword, declaration phrase and pattern anchor across the taxonomy
+    goes into one MultiPatternMatcher, so scanning a segment costs one
+    automaton pass plus the few regexes whose anchors actually occurred,
+    regardless of how many tests the taxonomy holds.
+    """
+
+    def __init__(self, taxonomy: Dict[str, Dict[str, Any]], declaration_phrases: List[str]):
+        self.labels = list(taxonomy.keys())
+        self.keyword_counts = [len(config['keywords']) for config in taxonomy.values()]
+        self.declaration_phrases = list(declaration_phrases)
+
+        keywords = []
+        patterns = []
+        for test_index, config in enumerate(taxonomy.values()):
+            for term_index, keyword in enumerate(config['keywords']):
+                keywords.append((keyword, (KIND_KEYWORD, test_index, term_index)))
+            for pattern_index, pattern in enumerate(config['patterns']):
+                patterns.append((pattern, (KIND_PATTERN, test_index, pattern_index)))
+        for term_index, phrase in enumerate(self.declaration_phrases):
+            keywords.append((phrase, (KIND_DECLARATION, -1, term_index)))
+
+        self.matcher = MultiPatternMatcher(keywords, patterns, re.IGNORECASE)
+
+    def to_tables(self) -> Dict[str, Any]:
+        """JSON-safe precompiled state, restored by `from_tables`"""
+        return {
+            'labels': self.labels,
+            'keyword_counts': self.keyword_counts,
+            'declaration_phrases': self.declaration_phrases,
+            'matcher': self.matcher.to_tables()
+        }
+
+    @classmethod
+    def from_tables(cls, tables: Dict[str, Any]) -> 'TaxonomyMatcher':
+        matcher = cls.__new__(cls)
+        matcher.labels = list(tables['labels'])
+        matcher.keyword_counts = list(tables['keyword_counts'])
+        matcher.declaration_phrases = list(tables['declaration_phrases'])
+        matcher.matcher = MultiPatternMatcher.from_tables(tables['matcher'])
+        return matcher
+
+    def scan(self, text_lower: str) -> List[Tuple[int, int, str, int, int]]:
+        """
+        Scan lower-cased text once and return every hit with its position
+
+        Hits are (start, end, kind, owner_index, term_index) where owner_index
+        is the test index for keyword/pattern hits and -1 for declarations.
+        """
+        return [(start, end) + tag for start, end, tag in self.matcher.scan(text_lower)]
+
+    def summarize(self, hits: List[Tuple[int, int, str, int, int]]) -> Tuple[Dict[int, int], set, bool]:
+        """
+        Reduce hits to (keyword_matches per test, tests with a pattern hit, has_declaration)
+
+        keyword_matches counts distinct taxonomy keyword entries present, matching
+        the old `sum(1 for kw in keywords if kw in text)`.
+        """
+        keyword_terms = set()
+        pattern_tests = set()
+        has_declaration = False
+        for _, _, kind, test_index, term_index in hits:
+            if kind == KIND_KEYWORD:
+                keyword_terms.add((test_index, term_index))
+            elif kind == KIND_PATTERN:
+                pattern_tests.add(test_index)
+            else:
+                has_declaration = True
+        keyword_matches: Dict[int, int] = {}
+        for test_index, _ in keyword_terms:
+            keyword_matches[test_index] = keyword_matches.get(test_index, 0) + 1
+        return keyword_matches, pattern_tests, has_declaration
+
+    def score(self, text_lower: str) -> List[Tuple[int, float]]:
+        """
+        Confidence for every test with any signal, in taxonomy order
+
+        keyword ratio x 0.3, +0.7 for a pattern hit, +0.2 for a declaration
+        phrase when there is already some evidence (uncapped; callers clamp).
+        """
+        return self._confidences(*self.summarize(self.scan(text_lower)))
+
+    def score_with_offsets(self, text_lower: str) -> List[Tuple[int, float, int]]:
+        """
+        `score` plus where each test's evidence starts
+
+        Returns (test_index, confidence, offset) where offset is the start of the
+        test's earliest keyword or pattern hit in `text_lower`.
+        """
+        hits = self.scan(text_lower)
+        first_offsets: Dict[int, int] = {}
+        for start, _, kind, test_index, _ in hits:
+            if kind != KIND_DECLARATION and start < first_offsets.get(test_index, len(text_lower) + 1):
+                first_offsets[test_index] = start
+        return [
+            (test_index, confidence, first_offsets[test_index])
+            for test_index, confidence in self._confidences(*self.summarize(hits))
+        ]
+
+    def _confidences(
+        self,
+        keyword_matches: Dict[int, int],
+        pattern_tests: set,
+        has_declaration: bool
+    ) -> List[Tuple[int, float]]:
+        scored = []
+        for test_index in sorted(set(keyword_matches) | pattern_tests):
+            confidence = 0.0
+            matches = keyword_matches.get(test_index, 0)
+            if matches > 0:
+                confidence += 0.3 * min(matches / self.keyword_counts[test_index], 1.0)
+            if test_index in pattern_tests:
+                confidence += 0.7
+            if has_declaration and confidence > 0:
+                confidence += 0.2
+            scored.append((test_index, confidence))
+        return scored
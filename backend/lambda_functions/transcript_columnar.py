@@ -0,0 +1,279 @@
+"""
+Transcript Columnar - Compact binary TranscriptIndex format
+Written once after transcription and memory-mapped by every later stage, so
+the Transcribe JSON is parsed a single time per session
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+from transcript_index import TranscriptIndex
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# File layout:
+#   8 bytes   COLUMNAR_MAGIC
+#   4 bytes   little-endian uint32 header length
+#   header    UTF-8 JSON: {"format", "byteorder", "time_decimals",
+#                          "columns": {name: [typecode, offset, count]},
+#                          "vocabulary": [offset, bytes, count],
+#                          "speakers": [offset, bytes, count]}
+#   data      column blocks at 8-byte aligned offsets from the start of the file
+# Words and speaker labels are stored once each in a NUL-separated vocabulary;
+# the word and segment columns hold int32 codes into it.
+COLUMNAR_MAGIC = b'CMECOL01'
+COLUMNAR_FORMAT = 'cme-transcript-columnar/1'
+
+# Transcribe reports times in milliseconds; float32 keeps that exactly up to
+# about 4.5 hours, longer columns are stored as float64
+TIME_DECIMALS = 3
+TIME_COLUMNS = ('word_starts', 'word_ends', 'segment_starts', 'segment_ends')
+
+DEFAULT_DIRECTORY = '/tmp/cme-cache/transcripts'
+
+
+class ColumnarFormatError(ValueError):
+    """Raised when a buffer is not a readable columnar transcript"""
+    pass
+
+
+class _TimeColumn:
+    """Read-only float32 time column that yields the original millisecond values"""
+
+    def __init__(self, values: Sequence[float], decimals: int):
+        self._values = values
+        self._decimals = decimals
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [round(value, self._decimals) for value in self._values[i]]
+        return round(self._values[i], self._decimals)
+
+    def __iter__(self):
+        decimals = self._decimals
+        return (round(value, decimals) for value in self._values)
+
+
+class _CodedColumn:
+    """Read-only string column stored as int32 codes into a vocabulary"""
+
+    def __init__(self, codes: Sequence[int], vocabulary: List[str]):
+        self._codes = codes
+        self._vocabulary = vocabulary
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            vocabulary = self._vocabulary
+            return [vocabulary[code] for code in self._codes[i]]
+        return self._vocabulary[self._codes[i]]
+
+    def __iter__(self):
+        return map(self._vocabulary.__getitem__, self._codes)
+
+
+def _time_array(values: Sequence[float]) -> array:
+    """float32 when every value survives the round trip at TIME_DECIMALS, else float64"""
+    compact = array('f', values)
+    if all(round(stored, TIME_DECIMALS) == value for stored, value in zip(compact, values)):
+        return compact
+    return array('d', values)
+
+
+def _encode_strings(strings: Sequence[str]) -> Tuple[array, bytes, int]:
+    """int32 codes plus the NUL-joined vocabulary, in first-seen order"""
+    codes_by_string: Dict[str, int] = {}
+    codes = array('i', (codes_by_string.setdefault(value, len(codes_by_string)) for value in strings))
+    return codes, '\x00'.join(codes_by_string).encode('utf-8'), len(codes_by_string)
+
+
+def encode_columnar(index: TranscriptIndex) -> bytes:
+    """Serialize a TranscriptIndex to the columnar format"""
+    word_ids, vocabulary, vocabulary_count = _encode_strings(index.words)
+    speaker_ids, speakers, speaker_count = _encode_strings(index.segment_speakers)
+    columns = {name: _time_array(getattr(index, name)) for name in TIME_COLUMNS}
+    columns['word_ids'] = word_ids
+    columns['segment_speaker_ids'] = speaker_ids
+    columns['segment_word_lo'] = array('i', index.segment_word_lo)
+    columns['segment_word_hi'] = array('i', index.segment_word_hi)
+
+    blocks = [(name, column.tobytes()) for name, column in columns.items()]
+    blocks += [('vocabulary', vocabulary), ('speakers', speakers)]
+
+    # Offsets depend on the header length, so lay out the data relative to the
+    # end of the header and settle the header size by iterating once more
+    header_length = 0
+    while True:
+        position = len(COLUMNAR_MAGIC) + 4 + header_length
+        layout = {}
+        for name, data in blocks:
+            position += -position % 8
+            layout[name] = position
+            position += len(data)
+        header = json.dumps({
+            'format': COLUMNAR_FORMAT,
+            'byteorder': sys.byteorder,
+            'time_decimals': TIME_DECIMALS,
+            'columns': {
+                name: [column.typecode, layout[name], len(column)] for name, column in columns.items()
+            },
+            'vocabulary': [layout['vocabulary'], len(vocabulary), vocabulary_count],
+            'speakers': [layout['speakers'], len(speakers), speaker_count]
+        }).encode('utf-8')
+        if len(header) == header_length:
+            break
+        header_length = len(header)
+
+    out = bytearray(COLUMNAR_MAGIC + struct.pack('<I', header_length) + header)
+    for name, data in blocks:
+        out.extend(b'\x00' * (layout[name] - len(out)))
+        out.extend(data)
+    return bytes(out)
+
+
+def _decode_strings(buffer: memoryview, offset: int, length: int, count: int) -> List[str]:
+    if not count:
+        return []
+    return [sys.intern(value) for value in bytes(buffer[offset:offset + length]).decode('utf-8').split('\x00')]
+
+
+def decode_columnar(buffer: Any) -> TranscriptIndex:
+    """
+    Rebuild a TranscriptIndex over a columnar buffer without copying the columns
+
+    `buffer` may be bytes or an mmap; the index keeps a reference to it, so a
+    mapped file stays mapped for as long as the index is alive.
+    """
+    view = memoryview(buffer)
+    prefix = len(COLUMNAR_MAGIC) + 4
+    if len(view) < prefix or bytes(view[:len(COLUMNAR_MAGIC)]) != COLUMNAR_MAGIC:
+        raise ColumnarFormatError('Not a columnar transcript')
+    header_length = struct.unpack('<I', view[len(COLUMNAR_MAGIC):prefix])[0]
+    header = json.loads(bytes(view[prefix:prefix + header_length]).decode('utf-8'))
+    if header.get('format') != COLUMNAR_FORMAT:
+        raise ColumnarFormatError(f"Unsupported columnar transcript format {header.get('format')}")
+    if header.get('byteorder') != sys.byteorder:
+        raise ColumnarFormatError(f"Columnar transcript written on a {header.get('byteorder')}-endian host")
+
+    columns = {}
+    for name, (typecode, offset, count) in header['columns'].items():
+        columns[name] = view[offset:offset + count * array(typecode).itemsize].cast(typecode)
+    vocabulary = _decode_strings(view, *header['vocabulary'])
+    speakers = _decode_strings(view, *header['speakers'])
+
+    times = {
+        name: _TimeColumn(columns[name], header['time_decimals']) if columns[name].format == 'f' else columns[name]
+        for name in TIME_COLUMNS
+    }
+    return TranscriptIndex(
+        words=_CodedColumn(columns['word_ids'], vocabulary),
+        segment_speakers=_CodedColumn(columns['segment_speaker_ids'], speakers),
+        segment_word_lo=columns['segment_word_lo'],
+        segment_word_hi=columns['segment_word_hi'],
+        **times
+    )
+
+
+def write_columnar(index: TranscriptIndex, path: str) -> int:
+    """Atomically write the columnar form of `index` to `path`; returns its size in bytes"""
+    data = encode_columnar(index)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+    return len(data)
+
+
+def load_columnar(path: str) -> TranscriptIndex:
+    """Memory-map a columnar transcript file"""
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    index = decode_columnar(mapped)
+    logger.info(f"Mapped columnar transcript {path}: {len(index.words)} words, {len(index)} segments")
+    return index
+
+
+class ColumnarTranscriptStore:
+    """
+    Columnar transcripts in S3, mirrored in a local directory for mmap
+
+    Objects are read through the local copy, so repeated loads on a warm
+    Lambda container only map the file that is already in /tmp. The copy is
+    named after the object's ETag: a session that is transcribed again (same
+    key, new content) is downloaded afresh instead of served stale.
+    """
+
+    def __init__(self, s3_client: Any, bucket: str, directory: str = DEFAULT_DIRECTORY):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.directory = directory
+
+    def _key_name(self, key: str) -> str:
+        return hashlib.sha256(f'{self.bucket}/{key}'.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str, etag: str) -> str:
+        version = hashlib.sha256(etag.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.directory, f'{self._key_name(key)}-{version}.cmecol')
+
+    def _replace_local(self, key: str, temp_path: str, path: str) -> None:
+        """Move a finished copy into place and drop copies of earlier versions of `key`"""
+        os.replace(temp_path, path)
+        prefix = f'{self._key_name(key)}-'
+        for name in os.listdir(self.directory):
+            if name.startswith(prefix) and name.endswith('.cmecol') and os.path.join(self.directory, name) != path:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    def put(self, key: str, index: TranscriptIndex) -> int:
+        """Write `index` locally and upload it to `key`; returns the object size"""
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = os.path.join(self.directory, f'{self._key_name(key)}.{os.getpid()}.{threading.get_ident()}.tmp')
+        size = write_columnar(index, temp_path)
+        with open(temp_path, 'rb') as f:
+            response = self.s3_client.put_object(
+                Bucket=self.bucket, Key=key, Body=f.read(), ContentType='application/octet-stream'
+            )
+        if response.get('ETag'):
+            self._replace_local(key, temp_path, self._path(key, response['ETag']))
+        else:
+            os.remove(temp_path)
+        logger.info(f"Stored columnar transcript s3://{self.bucket}/{key} ({size} bytes)")
+        return size
+
+    def get(self, key: str) -> Optional[TranscriptIndex]:
+        """Map the local copy of the current version of `key`, downloading it first if needed; None if unavailable"""
+        try:
+            etag = self.s3_client.head_object(Bucket=self.bucket, Key=key)['ETag']
+            path = self._path(key, etag)
+            if not os.path.exists(path):
+                # IfMatch fails the read rather than caching a newer object under this ETag
+                body = self.s3_client.get_object(Bucket=self.bucket, Key=key, IfMatch=etag)['Body']
+                os.makedirs(self.directory, exist_ok=True)
+                temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+                with open(temp_path, 'wb') as f:
+                    for chunk in iter(lambda: body.read(1024 * 1024), b''):
+                        f.write(chunk)
+                self._replace_local(key, temp_path, path)
+            return load_columnar(path)
+        except Exception as e:
+            logger.error(f"Error loading columnar transcript s3://{self.bucket}/{key}: {str(e)}")
+            return None
@@ -0,0 +1,352 @@
+"""
+Transcript Index - Time-indexed word store for AWS Transcribe output
+Built once per invocation and shared by test detection, demeanor analysis
+and medical entity extraction
+"""
+
+import hashlib
+import logging
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Marker for the JSON-safe columnar form produced by TranscriptIndex.to_dict
+COMPACT_FORMAT = 'cme-transcript-index/1'
+
+
+class TranscriptIndex:
+    """
+    Columnar view of a Transcribe transcript
+
+    Pronunciation items are stored as parallel arrays sorted by start time so a
+    speaker segment's words are found with two bisects instead of a full scan.
+    Character offsets of every word in the space-joined transcript text are kept
+    so entity offsets can be mapped back to timestamps.
+    """
+
+    def __init__(
+        self,
+        word_starts: Sequence[float],
+        word_ends: Sequence[float],
+        words: Sequence[str],
+        segment_speakers: Sequence[str],
+        segment_starts: Sequence[float],
+        segment_ends: Sequence[float],
+        segment_word_lo: Optional[Sequence[int]] = None,
+        segment_word_hi: Optional[Sequence[int]] = None
+    ):
+        self.word_starts = word_starts
+        self.word_ends = word_ends
+        self.words = words
+        self.segment_speakers = segment_speakers
+        self.segment_starts = segment_starts
+        self.segment_ends = segment_ends
+
+        # Word range [lo, hi) covered by each segment (inclusive time bounds);
+        # stored formats pass the ranges they saved instead of re-bisecting
+        if segment_word_lo is None or segment_word_hi is None:
+            segment_word_lo = [bisect_left(word_starts, start) for start in segment_starts]
+            segment_word_hi = [bisect_right(word_starts, end) for end in segment_ends]
+        self.segment_word_lo = segment_word_lo
+        self.segment_word_hi = segment_word_hi
+
+        self._segment_texts: List[Optional[str]] = [None] * len(segment_starts)
+        self._word_offsets: Optional[List[int]] = None
+        self._text: Optional[str] = None
+        self._stable_segments = 0
+        self._advance_stable()
+
+    @classmethod
+    def from_transcript(cls, transcript: Dict[str, Any]) -> 'TranscriptIndex':
+        """Build an index from a parsed Transcribe JSON document"""
+        if isinstance(transcript, cls):
+            return transcript
+        if transcript and transcript.get('format') == COMPACT_FORMAT:
+            return cls.from_dict(transcript)
+
+        results = transcript.get('results', {}) if transcript else {}
+        items = results.get('items', [])
+        segments = results.get('speaker_labels', {}).get('segments', [])
+
+        words = []
+        for item in items:
+            if item.get('type') == 'pronunciation':
+                words.append((
+                    float(item.get('start_time', 0)),
+                    float(item.get('end_time', item.get('start_time', 0))),
+                    item.get('alternatives', [{}])[0].get('content', '')
+                ))
+        # Transcribe emits items in time order; the stable sort keeps that order
+        # and only does real work for hand-edited or merged transcripts
+        words.sort(key=lambda word: word[0])
+
+        index = cls(
+            word_starts=[word[0] for word in words],
+            word_ends=[word[1] for word in words],
+            words=[word[2] for word in words],
+            segment_speakers=[s.get('speaker_label', 'unknown') for s in segments],
+            segment_starts=[float(s.get('start_time', 0)) for s in segments],
+            segment_ends=[float(s.get('end_time', 0)) for s in segments]
+        )
+        logger.info(f"Indexed transcript: {len(index.words)} words, {len(index)} segments")
+        return index
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'TranscriptIndex':
+        """Rebuild an index from its `to_dict` form"""
+        return cls(
+            word_starts=data['word_starts'],
+            word_ends=data['word_ends'],
+            words=data['words'],
+            segment_speakers=data['segment_speakers'],
+            segment_starts=data['segment_starts'],
+            segment_ends=data['segment_ends']
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-safe columnar form, far smaller than the Transcribe document"""
+        return {
+            'format': COMPACT_FORMAT,
+            'words': list(self.words),
+            'word_starts': list(self.word_starts),
+            'word_ends': list(self.word_ends),
+            'segment_speakers': list(self.segment_speakers),
+            'segment_starts': list(self.segment_starts),
+            'segment_ends': list(self.segment_ends)
+        }
+
+    def content_hash(self) -> str:
+        """
+        SHA-256 over the words, timings and speaker segments
+
+        Independent of how the index was built (Transcribe JSON, stream parser
+        or compact dict), so it identifies the transcript content itself.
+        """
+        digest = hashlib.sha256()
+        for strings in (self.words, self.segment_speakers):
+            digest.update(str(len(strings)).encode('ascii') + b':')
+            digest.update('\x00'.join(strings).encode('utf-8'))
+        for column in (self.word_starts, self.word_ends, self.segment_starts, self.segment_ends):
+            digest.update(array('d', column).tobytes())
+        return digest.hexdigest()
+
+    def append(
+        self,
+        word_starts: Sequence[float],
+        word_ends: Sequence[float],
+        words: Sequence[str],
+        segment_speakers: Sequence[str],
+        segment_starts: Sequence[float],
+        segment_ends: Sequence[float]
+    ) -> None:
+        """
+        Add words and segments that follow what is already indexed
+
+        For transcripts that arrive in pieces. Words must come in start-time
+        order. Segments whose word range could still grow are re-bisected;
+        earlier ones are left untouched.
+        """
+        last_start = self.word_starts[-1] if len(self.word_starts) else float('-inf')
+        for start in word_starts:
+            if start < last_start:
+                raise ValueError('Appended words must be in start-time order after the indexed words')
+            last_start = start
+
+        self.word_starts.extend(word_starts)
+        self.word_ends.extend(word_ends)
+        self.words.extend(words)
+        self.segment_speakers.extend(segment_speakers)
+        self.segment_starts.extend(segment_starts)
+        self.segment_ends.extend(segment_ends)
+
+        n_segments = len(self.segment_starts)
+        self._segment_texts.extend([None] * (n_segments - len(self._segment_texts)))
+        for i in range(self._stable_segments, n_segments):
+            lo = bisect_left(self.word_starts, self.segment_starts[i])
+            hi = bisect_right(self.word_starts, self.segment_ends[i])
+            if i < len(self.segment_word_lo):
+                self.segment_word_lo[i] = lo
+                self.segment_word_hi[i] = hi
+            else:
+                self.segment_word_lo.append(lo)
+                self.segment_word_hi.append(hi)
+            self._segment_texts[i] = None
+        self._word_offsets = None
+        self._text = None
+        self._advance_stable()
+
+    def _advance_stable(self) -> None:
+        if not len(self.word_starts):
+            return
+        last_start = self.word_starts[-1]
+        while (self._stable_segments < len(self.segment_ends)
+               and self.segment_ends[self._stable_segments] < last_start):
+            self._stable_segments += 1
+
+    @property
+    def stable_segments(self) -> int:
+        """
+        Number of leading segments whose words are final
+
+        A segment is final once a word starting after its end has been indexed,
+        since words arrive in order; later segments may still gain words.
+        """
+        return self._stable_segments
+
+    def __len__(self) -> int:
+        return len(self.segment_starts)
+
+    def segment(self, i: int) -> Tuple[str, float, float]:
+        """Return (speaker_label, start_time, end_time) for segment i"""
+        return self.segment_speakers[i], self.segment_starts[i], self.segment_ends[i]
+
+    def segment_text(self, i: int) -> str:
+        """Space-joined words spoken within segment i (memoized)"""
+        text = self._segment_texts[i]
+        if text is None:
+            text = ' '.join(self.words[self.segment_word_lo[i]:self.segment_word_hi[i]])
+            self._segment_texts[i] = text
+        return text
+
+    def words_between(self, start_time: float, end_time: float) -> Tuple[int, int]:
+        """Word index range [lo, hi) with start_time <= word start <= end_time"""
+        return bisect_left(self.word_starts, start_time), bisect_right(self.word_starts, end_time)
+
+    def segments_for_speaker(self, speaker_label: str) -> List[int]:
+        """Indices of segments attributed to a speaker"""
+        return [i for i, speaker in enumerate(self.segment_speakers) if speaker == speaker_label]
+
+    @property
+    def word_offsets(self) -> List[int]:
+        """Character offset of each word in `text`"""
+        if self._word_offsets is None:
+            offsets = []
+            position = 0
+            for word in self.words:
+                offsets.append(position)
+                position += len(word) + 1
+            self._word_offsets = offsets
+        return self._word_offsets
+
+    @property
+    def text(self) -> str:
+        """Full transcript text, words joined by single spaces"""
+        if self._text is None:
+            self._text = ' '.join(self.words)
+        return self._text
+
+    def word_range_text(self, lo: int, hi: int) -> str:
+        """Text of words [lo, hi), identical to the matching slice of `text`"""
+        return ' '.join(self.words[lo:hi])
+
+    def segment_aligned_chunks(self, max_chars: int) -> List[Tuple[int, int]]:
+        """
+        Split the whole word store into word ranges of at most max_chars characters
+
+        Cuts are placed on segment starts where possible; a single segment longer
+        than the limit is split between words. Ranges are contiguous and cover
+        every word, so chunk offsets map back to `text` by adding word_offsets[lo].
+        """
+        n_words = len(self.words)
+        if not n_words:
+            return []
+        offsets = self.word_offsets
+        text_length = offsets[-1] + len(self.words[-1])
+
+        def span(lo: int, hi: int) -> int:
+            end = offsets[hi] - 1 if hi < n_words else text_length
+            return end - offsets[lo]
+
+        cuts = sorted({lo for lo in self.segment_word_lo if 0 < lo < n_words} | {n_words})
+        chunks = []
+        lo = 0
+        while lo < n_words:
+            position = bisect_right(cuts, lo)
+            hi = lo
+            while position < len(cuts) and span(lo, cuts[position]) <= max_chars:
+                hi = cuts[position]
+                position += 1
+            if hi == lo:
+                # Oversized segment: fall back to the longest run of whole words
+                hi = lo + 1
+                while hi < n_words and span(lo, hi + 1) <= max_chars:
+                    hi += 1
+            chunks.append((lo, hi))
+            lo = hi
+        return chunks
+
+    def speaker_windows(self, max_gap: float, max_chars: int) -> List[List[int]]:
+        """
+        Group consecutive segments of one speaker into detection windows
+
+        A window grows while the next segment has the same speaker, starts no
+        more than `max_gap` seconds after the previous one ends, and keeps the
+        joined text within `max_chars`. When only the character budget ends a
+        window, the next one starts with its last segment so a phrase split
+        across that boundary is still seen whole. Every segment lands in at most
+        two windows, so total scanning stays linear in the transcript length.
+        """
+        windows = []
+        first = 0
+        while first < len(self):
+            window, first = self.next_speaker_window(first, max_gap, max_chars)
+            windows.append(window)
+        return windows
+
+    def next_speaker_window(
+        self,
+        first: int,
+        max_gap: float,
+        max_chars: int,
+        available: Optional[int] = None
+    ) -> Optional[Tuple[List[int], int]]:
+        """
+        The `speaker_windows` window starting at segment `first`
+
+        Returns (window segment ids, first segment of the next window). With
+        `available`, only segments below it are known yet; None is returned if
+        the window could still grow into segments that have not arrived.
+        """
+        n_segments = len(self) if available is None else available
+        chars = len(self.segment_text(first))
+        last = first + 1
+        budget_cut = False
+        while True:
+            if last >= n_segments:
+                if available is not None:
+                    return None
+                break
+            if (self.segment_speakers[last] != self.segment_speakers[first]
+                    or self.segment_starts[last] - self.segment_ends[last - 1] > max_gap):
+                break
+            added = len(self.segment_text(last)) + 1
+            if chars + added > max_chars:
+                budget_cut = True
+                break
+            chars += added
+            last += 1
+        next_first = last - 1 if budget_cut and last - 1 > first else last
+        return list(range(first, last)), next_first
+
+    def window_words(self, segment_ids: Sequence[int]) -> List[int]:
+        """Word indices covered by consecutive segments, without repeating shared boundary words"""
+        word_ids: List[int] = []
+        previous_hi = 0
+        for i in segment_ids:
+            lo = max(self.segment_word_lo[i], previous_hi) if word_ids else self.segment_word_lo[i]
+            word_ids.extend(range(lo, self.segment_word_hi[i]))
+            previous_hi = max(previous_hi, self.segment_word_hi[i])
+        return word_ids
+
+    def word_at_offset(self, offset: int) -> int:
+        """Index of the word containing (or immediately preceding) a character offset"""
+        return max(bisect_right(self.word_offsets, offset) - 1, 0)
+
+    def time_at_offset(self, offset: int) -> float:
+        """Start time of the word containing a character offset of `text`"""
+        if not self.words:
+            return 0.0
+        return float(self.word_starts[self.word_at_offset(offset)])
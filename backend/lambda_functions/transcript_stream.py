@@ -0,0 +1,210 @@
+"""
+Transcript Stream - Incremental parser for AWS Transcribe JSON output
+Reads the S3 body (or any file-like object) in chunks and builds a
+TranscriptIndex directly, without materializing the nested JSON document
+"""
+
+import codecs
+import json
+import logging
+import sys
+from array import array
+from typing import Any, Callable, Optional
+
+from transcript_index import TranscriptIndex
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+DEFAULT_CHUNK_SIZE = 256 * 1024
+_WHITESPACE = ' \t\n\r'
+_decoder = json.JSONDecoder()
+
+
+class TranscriptStreamError(ValueError):
+    """Raised when the stream is not a well-formed Transcribe document"""
+    pass
+
+
+class _JsonStream:
+    """Minimal pull parser over a byte stream, one JSON value at a time"""
+
+    def __init__(self, stream: Any, chunk_size: int):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, min_growth: int = 1) -> bool:
+        """Append at least `min_growth` characters to the buffer; False at EOF"""
+        if self._eof:
+            return False
+        self._buf = self._buf[self._pos:]
+        self._pos = 0
+        target = len(self._buf) + min_growth
+        while len(self._buf) < target:
+            chunk = self._stream.read(self._chunk_size)
+            if not chunk:
+                self._buf += self._utf8.decode(b'', final=True)
+                self._eof = True
+                break
+            self._buf += self._utf8.decode(chunk)
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character, without consuming it"""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise TranscriptStreamError('Unexpected end of transcript stream')
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise TranscriptStreamError(f'Expected {char!r} in transcript stream, got {self.peek()!r}')
+        self._pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                result, end = _decoder.raw_decode(self._buf, self._pos)
+                # A value that ends exactly at the buffer edge may be a truncated number
+                if end < len(self._buf) or self._eof:
+                    self._pos = end
+                    return result
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise TranscriptStreamError('Malformed JSON in transcript stream')
+            # Grow geometrically so very large values (the full transcript string)
+            # are re-decoded O(log n) times rather than once per chunk
+            self._fill(max(len(self._buf) - self._pos, self._chunk_size))
+
+    def skip(self) -> None:
+        self.value()
+
+    def each_member(self, on_member: Callable[[str], None]) -> None:
+        """Walk an object, calling on_member(key) with the stream positioned at its value"""
+        self.expect('{')
+        if self.peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(':')
+            on_member(key)
+            if self.peek() == ',':
+                self._pos += 1
+                continue
+            self.expect('}')
+            return
+
+    def each_element(self, on_element: Callable[[Any], None]) -> None:
+        """Walk an array, decoding one element at a time"""
+        self.expect('[')
+        if self.peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            on_element(self.value())
+            if self.peek() == ',':
+                self._pos += 1
+                continue
+            self.expect(']')
+            return
+
+
+def parse_transcript_stream(stream: Any, chunk_size: int = DEFAULT_CHUNK_SIZE) -> TranscriptIndex:
+    """
+    Build a TranscriptIndex from a Transcribe JSON byte stream
+
+    Only `results.items` and `results.speaker_labels.segments` are kept, and
+    they go straight into compact arrays (float64 times, interned words and
+    speaker labels). Everything else, including the full transcript string,
+    is decoded and dropped one value at a time.
+
+    Args:
+        stream: Object with a `read(size)` method returning bytes
+            (botocore StreamingBody, urllib response, open file)
+        chunk_size: Bytes per read
+    """
+    parser = _JsonStream(stream, chunk_size)
+
+    word_starts = array('d')
+    word_ends = array('d')
+    words = []
+    segment_speakers = []
+    segment_starts = array('d')
+    segment_ends = array('d')
+    in_order = [True]
+
+    def on_item(item: Any) -> None:
+        if item.get('type') != 'pronunciation':
+            return
+        start = float(item.get('start_time', 0))
+        if word_starts and start < word_starts[-1]:
+            in_order[0] = False
+        word_starts.append(start)
+        word_ends.append(float(item.get('end_time', item.get('start_time', 0))))
+        words.append(sys.intern(item.get('alternatives', [{}])[0].get('content', '')))
+
+    def on_segment(segment: Any) -> None:
+        segment_speakers.append(sys.intern(segment.get('speaker_label', 'unknown')))
+        segment_starts.append(float(segment.get('start_time', 0)))
+        segment_ends.append(float(segment.get('end_time', 0)))
+
+    def on_speaker_labels(key: str) -> None:
+        if key == 'segments':
+            parser.each_element(on_segment)
+        else:
+            parser.skip()
+
+    def on_results(key: str) -> None:
+        if key == 'items':
+            parser.each_element(on_item)
+        elif key == 'speaker_labels' and parser.peek() == '{':
+            parser.each_member(on_speaker_labels)
+        else:
+            parser.skip()
+
+    def on_root(key: str) -> None:
+        if key == 'results' and parser.peek() == '{':
+            parser.each_member(on_results)
+        else:
+            parser.skip()
+
+    parser.each_member(on_root)
+
+    if not in_order[0]:
+        # Same stable ordering TranscriptIndex.from_transcript applies
+        order = sorted(range(len(words)), key=word_starts.__getitem__)
+        word_starts = array('d', (word_starts[i] for i in order))
+        word_ends = array('d', (word_ends[i] for i in order))
+        words = [words[i] for i in order]
+
+    index = TranscriptIndex(
+        word_starts=word_starts,
+        word_ends=word_ends,
+        words=words,
+        segment_speakers=segment_speakers,
+        segment_starts=segment_starts,
+        segment_ends=segment_ends
+    )
+    logger.info(f"Stream-parsed transcript: {len(words)} words, {len(index)} segments")
+    return index
+
+
+def open_transcript_uri(uri: str, s3_client: Optional[Any] = None) -> Any:
+    """Open an s3:// or https:// transcript URI as a readable byte stream"""
+    if uri.startswith('s3://'):
+        bucket, key = uri.replace('s3://', '').split('/', 1)
+        return s3_client.get_object(Bucket=bucket, Key=key)['Body']
+    if uri.startswith('https://'):
+        import urllib.request
+        return urllib.request.urlopen(uri)
+    raise TranscriptStreamError(f'Unknown transcript URI format: {uri}')
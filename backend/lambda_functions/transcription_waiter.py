@@ -4,19 +4,31 @@ Used by Step Functions to wait for transcription completion
 """
 
 import json
-import boto3
 import logging
 import os
 
+from aws_clients import lazy_client, lazy_resource
+from transcript_index import TranscriptIndex
+from transcript_stream import parse_transcript_stream, open_transcript_uri
+from transcript_columnar import ColumnarTranscriptStore
+
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-transcribe_client = boto3.client('transcribe')
-s3_client = boto3.client('s3')
-dynamodb = boto3.resource('dynamodb')
+transcribe_client = lazy_client('transcribe')
+s3_client = lazy_client('s3')
+dynamodb = lazy_resource('dynamodb')
 
 CME_SESSIONS_TABLE = os.environ.get('CME_SESSIONS_TABLE', 'cme-sessions')
 
+# Stream-parse transcripts into the compact columnar form instead of json.loads
+STREAM_TRANSCRIPTS = os.environ.get('CME_STREAM_TRANSCRIPTS', 'true').lower() == 'true'
+
+# Write the parsed transcript once in columnar form so later stages map it
+# instead of re-parsing the Transcribe JSON
+COLUMNAR_TRANSCRIPTS = os.environ.get('CME_COLUMNAR_TRANSCRIPTS', 'true').lower() == 'true'
+S3_BUCKET = os.environ.get('S3_BUCKET', '')
+
 
 class TranscriptionInProgressError(Exception):
     """Raised when transcription is still in progress"""
@@ -55,6 +67,7 @@ def handler(event, context):
             
             # Download and parse transcript
             transcript_data = download_transcript(transcript_uri)
+            columnar_transcript_key = store_columnar_transcript(session_id, transcript_data)
             
             # Update session with transcript URI
             sessions_table = dynamodb.Table(CME_SESSIONS_TABLE)
@@ -73,6 +86,7 @@ def handler(event, context):
                 'session_id': session_id,
                 'status': 'COMPLETED',
                 'transcript_uri': transcript_uri,
+                'columnar_transcript_key': columnar_transcript_key,
                 'transcript_data': transcript_data
             }
         
@@ -116,8 +130,20 @@ def handler(event, context):
 
 
 def download_transcript(transcript_uri: str) -> dict:
-    """Download and parse transcript JSON from S3"""
+    """
+    Download and parse transcript JSON from S3
+    
+    In streaming mode the body is parsed incrementally and the compact
+    TranscriptIndex form is returned instead of the raw Transcribe document.
+    """
     try:
+        if STREAM_TRANSCRIPTS:
+            stream = open_transcript_uri(transcript_uri, s3_client)
+            try:
+                return parse_transcript_stream(stream).to_dict()
+            finally:
+                stream.close()
+        
         # Parse S3 URI
         if transcript_uri.startswith('https://'):
             # It's an HTTPS URL - extract bucket and key
@@ -145,5 +171,23 @@ def download_transcript(transcript_uri: str) -> dict:
         return {}
 
 
+def store_columnar_transcript(session_id: str, transcript_data: dict) -> str:
+    """
+    Save the transcript in columnar form next to the session's other artifacts
+
+    Returns the S3 key, or '' when columnar storage is off or fails (the NLP
+    stage then falls back to the Transcribe JSON).
+    """
+    if not (COLUMNAR_TRANSCRIPTS and S3_BUCKET and transcript_data):
+        return ''
+    try:
+        key = f"cme-transcripts/{session_id}/transcript.cmecol"
+        ColumnarTranscriptStore(s3_client, S3_BUCKET).put(key, TranscriptIndex.from_transcript(transcript_data))
+        return key
+    except Exception as e:
+        logger.error(f"Error storing columnar transcript: {str(e)}")
+        return ''
+
+
 import time
 
@@ -0,0 +1,440 @@
+"""
+Video Segmenter - Session-level extraction of every test episode clip
+Reads the recording once (only the byte ranges of the episode windows when
+it is an MP4 with a moov index), merges overlapping episode windows into
+shared clips, cuts them with ffmpeg, uploads the clips in parallel and writes
+a segment manifest the per-clip analysis step reads
+
+In 'copy' mode windows are first snapped back to the preceding keyframe and
+stream-copied, with no decoding or encoding; only windows whose keyframe is
+further than SNAP_TOLERANCE_SECONDS away are re-encoded exactly
+"""
+
+import json
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from aws_clients import lazy_client
+from ranged_mp4 import open_reader
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# AWS clients, created on first use
+s3_client = lazy_client('s3')
+
+# Seconds of video kept before the first and after the last mention of a test
+PRE_ROLL_SECONDS = float(os.environ.get('CME_SEGMENT_PRE_ROLL_SECONDS', '30'))
+POST_ROLL_SECONDS = float(os.environ.get('CME_SEGMENT_POST_ROLL_SECONDS', '30'))
+
+# Fetch only the moov and the samples of the windows with ranged GETs into a
+# sparse local file instead of downloading the whole recording
+RANGED_READS = os.environ.get('CME_SEGMENT_RANGED_READS', 'true').lower() == 'true'
+
+# Longest shared clip overlapping test windows are merged into; a longer run
+# of back-to-back tests is split into several clips. 0 keeps one clip per test
+MAX_MERGED_SECONDS = float(os.environ.get('CME_SEGMENT_MAX_MERGED_SECONDS', '600'))
+
+# Outputs per ffmpeg invocation. Every output keeps its own x264 encoder for
+# the whole run (about 180 MB each at 720p). Overlapping windows share a pass
+# and one decode of their span; a window that starts after the previous ones
+# end opens a new, input-seeked pass, so the gaps between tests are never
+# decoded (nor, with ranged reads, fetched)
+MAX_OUTPUTS_PER_PASS = int(os.environ.get('CME_SEGMENT_MAX_OUTPUTS_PER_PASS', '8'))
+FFMPEG_TIMEOUT_SECONDS = int(os.environ.get('CME_FFMPEG_TIMEOUT_SECONDS', '840'))
+UPLOAD_WORKERS = int(os.environ.get('CME_SEGMENT_UPLOAD_WORKERS', '8'))
+
+# 'copy': keyframe-snapped stream copy, re-encoding only windows that would
+# drift more than SNAP_TOLERANCE_SECONDS; 'encode': always re-encode exactly
+SEGMENT_MODE = os.environ.get('CME_SEGMENT_MODE', 'copy')
+SNAP_TOLERANCE_SECONDS = float(os.environ.get('CME_SEGMENT_SNAP_TOLERANCE_SECONDS', '5.0'))
+FFPROBE_TIMEOUT_SECONDS = int(os.environ.get('CME_FFPROBE_TIMEOUT_SECONDS', '120'))
+
+# Added to a keyframe time when seeking to it: ffprobe prints rounded times and
+# a seek that lands just short of the keyframe starts a whole GOP earlier
+KEYFRAME_SEEK_EPSILON = 0.001
+
+# Lambda layer path first (see DEPLOYMENT.md), then the system install
+BINARY_DIRECTORIES = ('/opt/bin', '/usr/bin')
+
+SEGMENT_PREFIX = 'cme-segments'
+MANIFEST_FORMAT = 'cme-segment-manifest/2'
+
+
+def _find_binary(name: str) -> Optional[str]:
+    configured = os.environ.get(f'CME_{name.upper()}_PATH')
+    if configured:
+        return configured if os.path.exists(configured) else None
+    for directory in BINARY_DIRECTORIES:
+        candidate = os.path.join(directory, name)
+        if os.path.exists(candidate):
+            return candidate
+    return shutil.which(name)
+
+
+def find_ffmpeg() -> Optional[str]:
+    """Path of the ffmpeg binary: CME_FFMPEG_PATH, the layer or system install, then PATH"""
+    return _find_binary('ffmpeg')
+
+
+def find_ffprobe() -> Optional[str]:
+    """Path of the ffprobe binary: CME_FFPROBE_PATH, the layer or system install, then PATH"""
+    return _find_binary('ffprobe')
+
+
+def probe_keyframes(path: str) -> List[float]:
+    """
+    Sorted keyframe times (seconds) of the first video stream
+
+    Reads packet flags only, so the file is demuxed but never decoded.
+    Returns an empty list when ffprobe is missing or fails.
+    """
+    ffprobe = find_ffprobe()
+    if not ffprobe:
+        logger.warning("FFprobe not available, keyframe index unavailable")
+        return []
+    command = [
+        ffprobe, '-v', 'error', '-select_streams', 'v:0',
+        '-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0', path
+    ]
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, timeout=FFPROBE_TIMEOUT_SECONDS)
+        if result.returncode != 0:
+            logger.error(f"FFprobe error: {result.stderr}")
+            return []
+        keyframes = []
+        for line in result.stdout.splitlines():
+            pts_time, _, flags = line.partition(',')
+            if 'K' in flags and pts_time not in ('', 'N/A'):
+                keyframes.append(float(pts_time))
+        keyframes.sort()
+        return keyframes
+    except Exception as e:
+        logger.error(f"Error probing keyframes of {path}: {str(e)}")
+        return []
+
+
+def snap_to_keyframe(position: float, keyframes: List[float]) -> float:
+    """
+    The last keyframe at or before `position` (the first keyframe if none is)
+
+    Snapping back rather than to the nearest keyframe keeps the whole
+    requested window inside the stream-copied clip.
+    """
+    i = bisect_right(keyframes, position + KEYFRAME_SEEK_EPSILON) - 1
+    return keyframes[max(i, 0)]
+
+
+def build_copy_command(ffmpeg: str, input_path: str, start: float, duration: float, output_path: str) -> List[str]:
+    """Stream-copy `duration` seconds from the keyframe at `start`, with no re-encoding"""
+    return [
+        ffmpeg, '-hide_banner', '-nostdin', '-loglevel', 'error', '-y',
+        '-ss', f'{start + KEYFRAME_SEEK_EPSILON:.3f}',
+        '-i', input_path,
+        '-t', f'{duration:.3f}',
+        '-c', 'copy',
+        '-avoid_negative_ts', 'make_zero',
+        output_path
+    ]
+
+
+def snap_windows(windows: List[Dict[str, Any]], keyframes: List[float]) -> List[Dict[str, Any]]:
+    """
+    Move every window that can be stream-copied onto its keyframe
+
+    A snapped window starts at its keyframe and is lengthened by the drift so
+    it still ends where it did. Returns the windows that must be re-encoded.
+    """
+    reencode = []
+    for window in windows:
+        keyframe = snap_to_keyframe(window['start'], keyframes) if keyframes else None
+        drift = abs(window['start'] - keyframe) if keyframe is not None else None
+        if drift is None or drift > SNAP_TOLERANCE_SECONDS:
+            window['mode'] = 'encode'
+            reencode.append(window)
+            continue
+        window['mode'] = 'copy'
+        window['keyframe_drift'] = round(drift, 3)
+        window['duration'] += window['start'] - keyframe
+        window['start'] = keyframe
+    return reencode
+
+
+def plan_segments(
+    test_episodes: List[Dict[str, Any]],
+    session_id: str,
+    prefix: str = SEGMENT_PREFIX
+) -> List[Dict[str, Any]]:
+    """
+    Clip windows covering every test episode, in order of start time
+
+    Each episode's own window starts PRE_ROLL_SECONDS before the first mention
+    and lasts PRE_ROLL_SECONDS + POST_ROLL_SECONDS plus the episode span, the
+    same window the per-test extraction cuts. Overlapping (or touching) windows
+    are unioned into one shared clip of at most MAX_MERGED_SECONDS, so tests
+    declared close together are cut and analyzed once; a clip's 'tests' holds
+    each episode with its own window.
+    """
+    test_windows = []
+    for episode in test_episodes:
+        timestamp = float(episode.get('timestamp', 0))
+        episode_end = float(episode.get('episode_end', timestamp))
+        test_windows.append({
+            'start': max(0.0, timestamp - PRE_ROLL_SECONDS),
+            'duration': PRE_ROLL_SECONDS + POST_ROLL_SECONDS + (episode_end - timestamp),
+            'episode': episode
+        })
+    test_windows.sort(key=lambda window: window['start'])
+
+    windows: List[Dict[str, Any]] = []
+    for test_window in test_windows:
+        test_end = test_window['start'] + test_window['duration']
+        if windows:
+            window = windows[-1]
+            window_end = window['start'] + window['duration']
+            merged_end = max(window_end, test_end)
+            if test_window['start'] <= window_end and merged_end - window['start'] <= MAX_MERGED_SECONDS:
+                window['duration'] = merged_end - window['start']
+                window['tests'].append(test_window)
+                continue
+        windows.append({
+            'start': test_window['start'],
+            'duration': test_window['duration'],
+            'mode': 'encode',
+            'tests': [test_window]
+        })
+
+    for window in windows:
+        tests = window['tests']
+        label = tests[0]['episode'].get('label', 'unknown') if len(tests) == 1 else f'{len(tests)}_tests'
+        window['segment_id'] = f"segment_{int(window['start'])}_{int(window['duration'])}_{label}"
+        window['segment_key'] = f"{prefix}/{session_id}/{window['segment_id']}.mp4"
+    return windows
+
+
+def build_segment_command(
+    ffmpeg: str,
+    input_path: str,
+    windows: List[Dict[str, Any]],
+    output_dir: str
+) -> List[str]:
+    """
+    A single ffmpeg invocation writing one clip per window
+
+    The input is seeked once to the earliest window and decoded a single time;
+    every output trims its own window from that shared decode.
+    """
+    first_start = min(window['start'] for window in windows)
+    command = [ffmpeg, '-hide_banner', '-nostdin', '-loglevel', 'error', '-y']
+    if first_start > 0:
+        command += ['-ss', f'{first_start:.3f}']
+    command += ['-i', input_path]
+    for window in windows:
+        command += [
+            '-ss', f"{window['start'] - first_start:.3f}",
+            '-t', f"{window['duration']:.3f}",
+            '-c:v', 'libx264',
+            '-c:a', 'aac',
+            os.path.join(output_dir, f"{window['segment_id']}.mp4")
+        ]
+    return command
+
+
+def encode_batches(windows: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Split start-ordered windows into ffmpeg passes of overlapping windows, at most MAX_OUTPUTS_PER_PASS each"""
+    batches: List[List[Dict[str, Any]]] = []
+    batch_end = 0.0
+    for window in windows:
+        if not batches or len(batches[-1]) >= MAX_OUTPUTS_PER_PASS or window['start'] > batch_end:
+            batches.append([])
+        batches[-1].append(window)
+        batch_end = max(batch_end, window['start'] + window['duration'])
+    return batches
+
+
+def _upload_segment(window: Dict[str, Any], output_dir: str, s3_bucket: str) -> int:
+    """Upload one clip if ffmpeg wrote it; returns bytes uploaded"""
+    local_path = os.path.join(output_dir, f"{window['segment_id']}.mp4")
+    if not os.path.exists(local_path) or os.path.getsize(local_path) == 0:
+        logger.warning(f"No clip written for {window['segment_id']}")
+        return 0
+    try:
+        size = os.path.getsize(local_path)
+        s3_client.upload_file(local_path, s3_bucket, window['segment_key'])
+        window['uploaded'] = True
+        return size
+    except Exception as e:
+        logger.error(f"Error uploading segment {window['segment_key']}: {str(e)}")
+        return 0
+
+
+def segment_session(
+    session_id: str,
+    video_s3_key: str,
+    test_episodes: List[Dict[str, Any]],
+    s3_bucket: str
+) -> Dict[str, Any]:
+    """
+    Cut the clips of every test episode from one download of the recording
+
+    Returns the manifest (also stored in S3 next to the clips). Each entry in
+    manifest['segments'] is a clip with its segment_key (None when it could
+    not be cut, in which case the analysis step extracts it itself) and its
+    'tests': the episodes it covers, each with test_offset and test_duration,
+    its own window in seconds from the start of the clip.
+    """
+    windows = plan_segments(test_episodes, session_id)
+    manifest_key = f'{SEGMENT_PREFIX}/{session_id}/manifest.json'
+    stats = {
+        'segments': len(windows),
+        'tests': len(test_episodes),
+        'extracted': 0,
+        'stream_copied': 0,
+        'reencoded': 0,
+        'ffmpeg_runs': 0,
+        'ranged_reads': False,
+        'bytes_downloaded': 0,
+        'bytes_uploaded': 0,
+        'download_seconds': 0.0,
+        'ffmpeg_seconds': 0.0,
+        'upload_wait_seconds': 0.0
+    }
+
+    ffmpeg = find_ffmpeg()
+    if not windows:
+        logger.info(f"No test episodes to segment for session {session_id}")
+    elif not ffmpeg:
+        logger.warning("FFmpeg not available, leaving segment extraction to the analysis step")
+    else:
+        work_dir = tempfile.mkdtemp(prefix=f'cme-segments-{session_id}-')
+        try:
+            local_input = os.path.join(work_dir, 'input_video.mp4')
+            start = time.time()
+            reader = open_reader(s3_client, s3_bucket, video_s3_key) if RANGED_READS else None
+            if reader:
+                # Keyframes come from the moov; windows are snapped before fetching
+                keyframes = reader.keyframe_times()
+            else:
+                logger.info(f"Downloading video from s3://{s3_bucket}/{video_s3_key}")
+                s3_client.download_file(s3_bucket, video_s3_key, local_input)
+                stats['bytes_downloaded'] = os.path.getsize(local_input)
+                keyframes = probe_keyframes(local_input) if SEGMENT_MODE == 'copy' else []
+
+            reencode = snap_windows(windows, keyframes) if SEGMENT_MODE == 'copy' else windows
+            if reader:
+                stats['bytes_downloaded'] = reader.materialize(
+                    local_input, [(window['start'], window['start'] + window['duration']) for window in windows]
+                )
+                stats['ranged_reads'] = True
+            stats['download_seconds'] = round(time.time() - start, 3)
+
+            # Clips upload while later windows are still being cut
+            start = time.time()
+            with ThreadPoolExecutor(max_workers=min(UPLOAD_WORKERS, len(windows))) as executor:
+                uploads = []
+                for window in windows:
+                    if window['mode'] != 'copy':
+                        continue
+                    output_path = os.path.join(work_dir, f"{window['segment_id']}.mp4")
+                    command = build_copy_command(ffmpeg, local_input, window['start'], window['duration'], output_path)
+                    stats['ffmpeg_runs'] += 1
+                    result = subprocess.run(command, capture_output=True, text=True, timeout=FFMPEG_TIMEOUT_SECONDS)
+                    if result.returncode != 0:
+                        logger.error(f"FFmpeg error: {result.stderr}")
+                    uploads.append(executor.submit(_upload_segment, window, work_dir, s3_bucket))
+                for batch in encode_batches(reencode):
+                    command = build_segment_command(ffmpeg, local_input, batch, work_dir)
+                    stats['ffmpeg_runs'] += 1
+                    result = subprocess.run(command, capture_output=True, text=True, timeout=FFMPEG_TIMEOUT_SECONDS)
+                    if result.returncode != 0:
+                        logger.error(f"FFmpeg error: {result.stderr}")
+                    uploads += [executor.submit(_upload_segment, window, work_dir, s3_bucket) for window in batch]
+                stats['ffmpeg_seconds'] = round(time.time() - start, 3)
+                stats['bytes_uploaded'] = sum(upload.result() for upload in uploads)
+            stats['upload_wait_seconds'] = round(time.time() - start - stats['ffmpeg_seconds'], 3)
+        except Exception as e:
+            logger.error(f"Error segmenting session {session_id}: {str(e)}")
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    segments = []
+    for window in windows:
+        extracted = window.get('uploaded', False)
+        stats['extracted'] += extracted
+        if extracted:
+            stats['stream_copied' if window['mode'] == 'copy' else 'reencoded'] += 1
+        segments.append({
+            'segment_key': window['segment_key'] if extracted else None,
+            'segment_start': window['start'],
+            'segment_duration': window['duration'],
+            'segment_mode': window['mode'],
+            'keyframe_drift': window.get('keyframe_drift', 0.0),
+            'tests': [
+                {
+                    **test['episode'],
+                    'test_offset': round(test['start'] - window['start'], 3),
+                    'test_duration': test['duration']
+                }
+                for test in window['tests']
+            ]
+        })
+
+    manifest = {
+        'format': MANIFEST_FORMAT,
+        'session_id': session_id,
+        'video_s3_key': video_s3_key,
+        'manifest_key': manifest_key,
+        'segments': segments,
+        'stats': stats
+    }
+    try:
+        s3_client.put_object(
+            Bucket=s3_bucket, Key=manifest_key,
+            Body=json.dumps(manifest, default=str).encode('utf-8'), ContentType='application/json'
+        )
+    except Exception as e:
+        logger.error(f"Error storing segment manifest {manifest_key}: {str(e)}")
+
+    logger.info(
+        f"Segmented session {session_id}: {stats['extracted']}/{stats['segments']} clips "
+        f"for {stats['tests']} tests, "
+        f"{stats['stream_copied']} stream-copied, {stats['ffmpeg_runs']} ffmpeg runs, "
+        f"{stats['bytes_downloaded']} bytes downloaded"
+    )
+    return manifest
+
+
+def handler(event, context):
+    """
+    Lambda handler for Step Functions invocation
+    Segments every test episode of a session before the per-clip Map
+    """
+    try:
+        logger.info(f"Video Segmenter invoked: {json.dumps(event, default=str)}")
+
+        manifest = segment_session(
+            session_id=event['session_id'],
+            video_s3_key=event['video_s3_key'],
+            test_episodes=event.get('test_episodes') or [],
+            s3_bucket=os.environ.get('S3_BUCKET', 'default-bucket')
+        )
+
+        return {
+            'statusCode': 200,
+            'manifest_key': manifest['manifest_key'],
+            'segments': manifest['segments'],
+            'stats': manifest['stats']
+        }
+
+    except Exception as e:
+        logger.error(f"Error in video segmenter handler: {str(e)}")
+        import traceback
+        logger.error(traceback.format_exc())
+        raise e
@@ -198,7 +198,9 @@ class CMEAnalysisPlatformStack(Stack):
         lambda_role.add_to_policy(iam.PolicyStatement(
             actions=[
                 "comprehend:DetectSentiment",
-                "comprehend:DetectEntities"
+                "comprehend:BatchDetectSentiment",
+                "comprehend:DetectEntities",
+                "comprehendmedical:DetectEntitiesV2"
             ],
             resources=["*"]
         ))
@@ -236,6 +238,7 @@ class CMEAnalysisPlatformStack(Stack):
             memory_size=256,
             role=lambda_role,
             environment={
+                "S3_BUCKET": cme_bucket.bucket_name,
                 "CME_SESSIONS_TABLE": sessions_table.table_name
             }
         )
@@ -251,12 +254,29 @@ class CMEAnalysisPlatformStack(Stack):
             memory_size=2048,
             role=lambda_role,
             environment={
+                "S3_BUCKET": cme_bucket.bucket_name,
                 "CME_SESSIONS_TABLE": sessions_table.table_name,
                 "CME_STEPS_TABLE": steps_table.table_name,
                 "CME_DEMEANOR_TABLE": demeanor_table.table_name
             }
         )
 
+        # Video Segmenter Lambda: one download and ffmpeg pass per session
+        video_segmenter_lambda = lambda_.Function(
+            self, "CMEVideoSegmenter",
+            function_name="cme-video-segmenter",
+            runtime=lambda_.Runtime.PYTHON_3_11,
+            code=lambda_.Code.from_asset("../backend/lambda_functions"),
+            handler="video_segmenter.handler",
+            timeout=Duration.minutes(15),
+            memory_size=3008,
+            ephemeral_storage_size=Size.gibibytes(10),  # Full recording plus its clips
+            role=lambda_role,
+            environment={
+                "S3_BUCKET": cme_bucket.bucket_name
+            }
+        )
+
         # Video Processor Lambda
         video_lambda = lambda_.Function(
             self, "CMEVideoProcessor",
@@ -352,7 +372,11 @@ class CMEAnalysisPlatformStack(Stack):
             ),
             cloudwatch.GraphWidget(
                 title="Processing Time",
-                left=[nlp_lambda.metric_duration(), video_lambda.metric_duration()],
+                left=[
+                    nlp_lambda.metric_duration(),
+                    video_segmenter_lambda.metric_duration(),
+                    video_lambda.metric_duration()
+                ],
                 width=12
             )
         )
@@ -364,6 +388,7 @@ class CMEAnalysisPlatformStack(Stack):
             self,
             transcription_waiter_lambda,
             nlp_lambda,
+            video_segmenter_lambda,
             video_lambda,
             report_lambda,
             sessions_table
@@ -372,6 +397,7 @@ class CMEAnalysisPlatformStack(Stack):
         # Grant Step Function permissions to invoke Lambdas
         transcription_waiter_lambda.grant_invoke(state_machine)
         nlp_lambda.grant_invoke(state_machine)
+        video_segmenter_lambda.grant_invoke(state_machine)
         video_lambda.grant_invoke(state_machine)
         report_lambda.grant_invoke(state_machine)
         
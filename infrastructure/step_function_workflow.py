@@ -19,6 +19,7 @@ def create_cme_processing_workflow(
     scope: Construct,
     transcribe_waiter_lambda: lambda_.Function,
     nlp_processor_lambda: lambda_.Function,
+    video_segmenter_lambda: lambda_.Function,
     video_processor_lambda: lambda_.Function,
     report_generator_lambda: lambda_.Function,
     sessions_table
@@ -30,9 +31,10 @@ def create_cme_processing_workflow(
     1. Start Transcription Job
     2. Wait for Transcription to Complete
     3. Run NLP Analysis (test detection + demeanor)
-    4. Map over each detected test → Extract video segment + Analyze
-    5. Generate Report
-    6. Update Session Status
+    4. Segment the video once for every detected test (one download, one ffmpeg pass)
+    5. Map over each clip (overlapping test windows merged) → Analyze
+    6. Generate Report
+    7. Update Session Status
     """
     
     # Step 1: Start Transcription Job (already done by API handler)
@@ -64,39 +66,54 @@ def create_cme_processing_workflow(
         lambda_function=nlp_processor_lambda,
         payload=sfn.TaskInput.from_object({
             "session_id.$": "$.session_id",
-            "transcript_uri.$": "$.transcription_result.Payload.transcript_uri"
+            "transcript_uri.$": "$.transcription_result.Payload.transcript_uri",
+            "columnar_transcript_key.$": "$.transcription_result.Payload.columnar_transcript_key"
         }),
         result_path="$.nlp_result"
     )
     
-    # Step 4: Process Each Detected Test (Map State)
+    # Step 4: Cut every test episode's clip from a single download of the recording
+    segment_video = tasks.LambdaInvoke(
+        scope, "SegmentVideo",
+        lambda_function=video_segmenter_lambda,
+        payload=sfn.TaskInput.from_object({
+            "session_id.$": "$.session_id",
+            "video_s3_key.$": "$.video_s3_key",
+            "test_episodes.$": "$.nlp_result.Payload.test_episodes"
+        }),
+        result_path="$.segmentation_result"
+    )
+    
+    # Step 5: Analyze Each Segment (Map State)
     process_single_test = tasks.LambdaInvoke(
         scope, "ProcessSingleTest",
         lambda_function=video_processor_lambda,
         payload=sfn.TaskInput.from_object({
             "session_id.$": "$.session_id",
-            "declared_test.$": "$.test",
+            "segment.$": "$.segment",
             "video_s3_key.$": "$.video_s3_key"
         }),
         result_path="$.video_result"
     )
     
-    # Map over all detected tests
+    # Map over the segment manifest: one entry per clip, where test episodes
+    # whose ±30s windows overlap share a clip (and its Rekognition jobs) and
+    # each is judged on its own sub-range
     process_all_tests = sfn.Map(
         scope, "ProcessAllTests",
-        items_path="$.nlp_result.Payload.declared_tests",
+        items_path="$.segmentation_result.Payload.segments",
         parameters={
             "session_id.$": "$.session_id",
             "video_s3_key.$": "$.video_s3_key",
-            "test.$": "$$.Map.Item.Value"
+            "segment.$": "$$.Map.Item.Value"
         },
-        max_concurrency=3,  # Process up to 3 tests in parallel
+        max_concurrency=3,  # Process up to 3 clips in parallel
         result_path="$.all_test_results"
     )
     
     process_all_tests.iterator(process_single_test)
     
-    # Step 5: Generate Report
+    # Step 6: Generate Report
     generate_report = tasks.LambdaInvoke(
         scope, "GenerateReport",
         lambda_function=report_generator_lambda,
@@ -107,7 +124,7 @@ def create_cme_processing_workflow(
         result_path="$.report_result"
     )
     
-    # Step 6: Update Session Status to Completed
+    # Step 7: Update Session Status to Completed
     update_status = tasks.DynamoUpdateItem(
         scope, "UpdateSessionStatus",
         table=sessions_table,
@@ -168,6 +185,7 @@ def create_cme_processing_workflow(
     definition = (
         wait_for_transcription
         .next(run_nlp_analysis)
+        .next(segment_video)
         .next(process_all_tests)
         .next(generate_report)
         .next(update_status)